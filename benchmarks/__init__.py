@@ -0,0 +1 @@
+"""Synthetic ROM libraries and benchmarks for rom-deduper."""
@@ -0,0 +1,134 @@
+"""Hashing benchmark: the hashing engine against naive read() loops.
+
+Times SHA-1 over a set of files with each method and reports throughput and the peak
+memory Python allocated while hashing (traced in a separate, untimed pass):
+
+- read: `while chunk := f.read(CHUNK)`, a new bytes object per chunk
+- mmap: memoryview slices of a read-only memory map
+- readinto: rom_deduper.hashing.file_digest, one reusable buffer per thread
+- edges: partial digest of the first and last PARTIAL_BYTES only
+- pool: hash_files over a process pool with per-device limits
+
+Usage:
+    python -m benchmarks.hashing --files 4 --size-mb 1024
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from rom_deduper.hashing import CHUNK, EDGES, file_digest, hash_files
+
+METHODS = ("read", "mmap", "readinto", "edges", "pool")
+
+
+def naive_sha1(path: str) -> str:
+    """SHA-1 with a plain read() loop, as most scripts write it."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def mmap_sha1(path: str) -> str:
+    """SHA-1 over CHUNK slices of a read-only memory map."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                for offset in range(0, size, CHUNK):
+                    h.update(view[offset : offset + CHUNK])
+    return h.hexdigest()
+
+
+def _runners(workers: int) -> dict[str, Callable[[list[str]], dict[str, str]]]:
+    def each(fn: Callable[[str], str]) -> Callable[[list[str]], dict[str, str]]:
+        return lambda paths: {p: fn(p) for p in paths}
+
+    return {
+        "read": each(naive_sha1),
+        "mmap": each(mmap_sha1),
+        "readinto": each(file_digest),
+        "edges": each(lambda p: file_digest(p, span=EDGES)),
+        "pool": lambda paths: hash_files(paths, workers=workers),
+    }
+
+
+def measure_hashing(
+    paths: list[str], *, repeat: int = 3, workers: int = 4
+) -> dict[str, dict[str, float]]:
+    """method -> {"seconds": best of repeat, "peak_bytes": traced peak allocation}.
+
+    Raises AssertionError if a full-file method disagrees with the naive digests.
+    """
+    runners = _runners(workers)
+    expected = runners["read"](paths)
+    results: dict[str, dict[str, float]] = {}
+    for method in METHODS:
+        run = runners[method]
+        if method != "edges":
+            assert run(paths) == expected, f"{method} digests differ from read()"
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(paths)
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        run(paths)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[method] = {"seconds": best, "peak_bytes": peak}
+    return results
+
+
+def write_files(directory: Path, count: int, size: int) -> list[str]:
+    """count files of size random bytes, written a CHUNK at a time."""
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = directory / f"rom{i}.bin"
+        with open(path, "wb") as f:
+            for offset in range(0, size, CHUNK):
+                f.write(os.urandom(min(CHUNK, size - offset)))
+        paths.append(str(path))
+    return paths
+
+
+def main(args: list[str] | None = None) -> int:
+    """Entry point for python -m benchmarks.hashing."""
+    parser = argparse.ArgumentParser(description="Benchmark hashing methods")
+    parser.add_argument("--files", type=int, default=4, help="Files to generate")
+    parser.add_argument("--size-mb", type=int, default=256, help="Size of each file in MiB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per method")
+    parser.add_argument("--workers", type=int, default=4, help="Process pool size")
+    parser.add_argument("--root", type=Path, default=None, help="Reuse or create files here")
+    parsed = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory(prefix="rom-deduper-hashing-") as tmp:
+        root = parsed.root or Path(tmp)
+        paths = sorted(str(p) for p in root.glob("rom*.bin"))
+        if not paths:
+            paths = write_files(root, parsed.files, parsed.size_mb << 20)
+        total = sum(os.path.getsize(p) for p in paths)
+        results = measure_hashing(paths, repeat=parsed.repeat, workers=parsed.workers)
+
+    print(f"{len(paths)} files, {total >> 20} MiB")
+    print(f"{'method':>10} {'seconds':>9} {'MiB/s':>9} {'peak alloc':>12}")
+    for method in METHODS:
+        r = results[method]
+        rate = total / r["seconds"] / (1 << 20) if r["seconds"] else 0.0
+        print(f"{method:>10} {r['seconds']:>9.4f} {rate:>9.0f} {int(r['peak_bytes']) >> 10:>9} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
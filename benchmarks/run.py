@@ -0,0 +1,128 @@
+"""Standalone benchmark runner: time each pipeline stage on a synthetic library.
+
+Usage:
+    python -m benchmarks.run --files 10000
+    python -m benchmarks.run --files 10000 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --files 10000 --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from benchmarks.synth import generate_library
+from rom_deduper.actions import apply_removal, dry_run, restore
+from rom_deduper.config import Config
+from rom_deduper.grouper import group_entries
+from rom_deduper.ranker import rank_group, rank_groups
+from rom_deduper.scanner import scan
+
+STAGES = (
+    "scan",
+    "group_entries",
+    "rank_group",
+    "rank_groups",
+    "dry_run",
+    "apply_removal",
+    "restore",
+)
+
+
+def _best_of(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """Run fn repeat times; return (best seconds, last result)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmarks(roms_root: Path, *, repeat: int = 3) -> dict[str, float]:
+    """Time every stage against an existing tree. Apply and restore run once each,
+    in that order, so the tree is left as it was found."""
+    config = Config.default()
+    timings: dict[str, float] = {}
+    timings["scan"], entries = _best_of(lambda: scan(roms_root, config=config), repeat)
+    timings["group_entries"], groups = _best_of(lambda: group_entries(entries), repeat)
+    timings["rank_group"], _ = _best_of(
+        lambda: [rank_group(g, config=config) for g in groups], repeat
+    )
+    timings["rank_groups"], _ = _best_of(lambda: rank_groups(groups, config=config), repeat)
+    timings["dry_run"], report = _best_of(lambda: dry_run(roms_root, config=config), repeat)
+    timings["apply_removal"], _ = _best_of(lambda: apply_removal(roms_root, report), 1)
+    timings["restore"], _ = _best_of(lambda: restore(roms_root), 1)
+    return timings
+
+
+def compare(timings: dict[str, float], baseline: dict[str, Any], max_ratio: float) -> list[str]:
+    """Return stages slower than baseline by more than max_ratio."""
+    regressions = []
+    base = baseline.get("timings", {})
+    for stage, seconds in timings.items():
+        ref = base.get(stage)
+        if ref and seconds / ref > max_ratio:
+            regressions.append(f"{stage}: {seconds:.4f}s vs baseline {ref:.4f}s")
+    return regressions
+
+
+def main(args: list[str] | None = None) -> int:
+    """Entry point for python -m benchmarks.run."""
+    parser = argparse.ArgumentParser(description="Benchmark rom-deduper stages")
+    parser.add_argument("--files", type=int, default=1000, help="Files to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per read-only stage")
+    parser.add_argument(
+        "--chd-bytes", type=int, default=4096, help="Apparent size of sparse CHD files"
+    )
+    parser.add_argument("--root", type=Path, default=None, help="Reuse or create tree here")
+    parser.add_argument("--baseline", type=Path, default=None, help="Compare against JSON")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Write results JSON")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=1.5,
+        help="Fail when a stage is this many times slower than baseline",
+    )
+    parsed = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory(prefix="rom-deduper-bench-") as tmp:
+        root = parsed.root or Path(tmp) / "ROMs"
+        if not root.exists() or not any(root.iterdir()):
+            stats = generate_library(
+                root, parsed.files, seed=parsed.seed, chd_bytes=parsed.chd_bytes
+            )
+            print(f"Generated {stats.files} files ({stats.titles} titles) in {root}")
+        timings = run_benchmarks(root, repeat=parsed.repeat)
+
+    result = {
+        "files": parsed.files,
+        "seed": parsed.seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timings": timings,
+    }
+    for stage in STAGES:
+        print(f"{stage:>14}: {timings[stage]:.4f}s")
+    if parsed.save_baseline:
+        parsed.save_baseline.write_text(json.dumps(result, indent=2))
+    if parsed.baseline:
+        regressions = compare(
+            timings, json.loads(parsed.baseline.read_text()), parsed.max_regression
+        )
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Seek-proxy benchmark: how far scan, apply and restore jump around the disk.
+
+Wall-clock time on an SSD or page cache says nothing about head movement on an HDD, so
+this traces the inode touched by every stat (scan) and rename (apply, restore) and
+reports, per stage and ordering:
+
+- dir switches: consecutive operations in different directories
+- inode distance: sum of |inode delta| between consecutive operations; inode numbers
+  follow on-disk placement closely on ext4/XFS, so this approximates metadata seeks
+
+Usage:
+    python -m benchmarks.seeks --files 10000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from benchmarks.synth import generate_library
+from rom_deduper import scanner
+from rom_deduper.actions import apply_removal, dry_run, restore
+from rom_deduper.config import Config
+
+STAGES = ("scan", "apply_removal", "restore")
+ORDERS = ("default", "hdd")
+
+
+@dataclass
+class SeekTrace:
+    """(directory, inode) of each traced operation, in order."""
+
+    ops: list[tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def dir_switches(self) -> int:
+        return sum(1 for a, b in zip(self.ops, self.ops[1:]) if a[0] != b[0])
+
+    @property
+    def inode_distance(self) -> int:
+        return sum(abs(a[1] - b[1]) for a, b in zip(self.ops, self.ops[1:]))
+
+
+@contextmanager
+def _trace(target: Any, name: str, record: Callable[..., tuple[str, int]]) -> Iterator[SeekTrace]:
+    """Patch target.name to log record(*args) before each call."""
+    trace = SeekTrace()
+    original = getattr(target, name)
+
+    def traced(*args: Any, **kwargs: Any) -> Any:
+        trace.ops.append(record(*args))
+        return original(*args, **kwargs)
+
+    with patch.object(target, name, traced):
+        yield trace
+
+
+def _stat_op(entry: "os.DirEntry[str]") -> tuple[str, int]:
+    return (os.path.dirname(entry.path), entry.inode())
+
+
+def _rename_op(src: Path, _dest: Any) -> tuple[str, int]:
+    return (str(src.parent), os.lstat(src).st_ino)
+
+
+def measure_seeks(roms_root: Path) -> dict[str, dict[str, SeekTrace]]:
+    """Trace scan, apply and restore in default and HDD order. Each apply is followed by
+    its restore, so the tree is left as it was found."""
+    results: dict[str, dict[str, SeekTrace]] = {stage: {} for stage in STAGES}
+    for order in ORDERS:
+        config = Config.default()
+        config.hdd_order = order == "hdd"
+        with _trace(scanner, "_stat", _stat_op) as trace:
+            scanner.scan(roms_root, config=config)
+        results["scan"][order] = trace
+        report = dry_run(roms_root, config=config)
+        with _trace(Path, "rename", _rename_op) as trace:
+            apply_removal(roms_root, report, hdd_order=config.hdd_order)
+        results["apply_removal"][order] = trace
+        with _trace(Path, "rename", _rename_op) as trace:
+            restore(roms_root, hdd_order=config.hdd_order)
+        results["restore"][order] = trace
+    return results
+
+
+def _reduction(default: int, hdd: int) -> str:
+    return f"{100 * (default - hdd) / default:.0f}%" if default else "-"
+
+
+def main(args: list[str] | None = None) -> int:
+    """Entry point for python -m benchmarks.seeks."""
+    parser = argparse.ArgumentParser(description="Seek proxy for default vs HDD ordering")
+    parser.add_argument("--files", type=int, default=5000, help="Files to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--root", type=Path, default=None, help="Reuse or create tree here")
+    parsed = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory(prefix="rom-deduper-seeks-") as tmp:
+        root = parsed.root or Path(tmp) / "ROMs"
+        if not root.exists() or not any(root.iterdir()):
+            generate_library(root, parsed.files, seed=parsed.seed)
+        results = measure_seeks(root)
+
+    print(f"{'stage':>14} {'ops':>7} {'dir switches':>20} {'inode distance':>30}")
+    for stage in STAGES:
+        default, hdd = results[stage]["default"], results[stage]["hdd"]
+        switches = f"{default.dir_switches}->{hdd.dir_switches}"
+        distance = f"{default.inode_distance}->{hdd.inode_distance}"
+        print(
+            f"{stage:>14} {len(hdd.ops):>7} "
+            f"{switches:>13} {_reduction(default.dir_switches, hdd.dir_switches):>6} "
+            f"{distance:>23} {_reduction(default.inode_distance, hdd.inode_distance):>6}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
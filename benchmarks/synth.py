@@ -0,0 +1,155 @@
+"""Generate synthetic No-Intro/Redump-style ROM trees for benchmarks and scaling tests."""
+
+import random
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Disc-based consoles get .chd/.bin/.cue/.m3u and game folders; cartridge consoles get
+# loose files and zips. Extensions match what rom_deduper.scanner picks up.
+DISC_CONSOLES = ("psx", "segacd", "saturn")
+CART_CONSOLES = {
+    "snes": (".sfc", ".zip"),
+    "genesis": (".md", ".bin", ".zip"),
+    "nes": (".nes", ".zip"),
+    "gba": (".gba", ".zip"),
+    "gb": (".gb", ".zip"),
+}
+
+_WORDS = (
+    "Adventure Alien Battle Blade Castle Chrono Crystal Dragon Dream Fantasy Fighter "
+    "Final Fire Force Galaxy Ghost Hero Island Kingdom Knight Legend Lost Magic Metal "
+    "Mystic Night Ninja Power Quest Racing Rival Saga Shadow Sonic Soul Space Star "
+    "Street Strike Super Tactics Thunder Tower Warrior World Zero"
+).split()
+_ARTICLES = ("The ", "")
+_REGIONS = ("(USA)", "(Europe)", "(Japan)", "(World)", "(U)", "(E)", "(J)")
+_LANGUAGES = ("", "", "", " (En,Fr,De)", " (En,Ja)", " (En)")
+_REVISIONS = ("", "", "", " (Rev 1)", " (Rev 2)", " (v1.1)")
+_QUALITY = ("", "", "", " [!]", " [b]")
+
+
+@dataclass
+class SynthStats:
+    """Summary of a generated library."""
+
+    files: int = 0
+    bytes_apparent: int = 0
+    titles: int = 0
+    multi_disc_sets: int = 0
+    m3u_playlists: int = 0
+    game_folders: int = 0
+    zips: int = 0
+    consoles: dict[str, int] = field(default_factory=dict)
+
+
+def _title(rng: random.Random, index: int) -> str:
+    """Random but unique title; the index suffix keeps groups apart."""
+    words = " ".join(rng.sample(_WORDS, rng.randint(1, 3)))
+    return f"{rng.choice(_ARTICLES)}{words} {index}"
+
+
+def _write(path: Path, size: int, stats: SynthStats, *, sparse: bool = False) -> None:
+    """Write a file of `size` bytes. Sparse files only allocate metadata."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        if sparse:
+            f.truncate(size)
+        else:
+            f.write(b"\0" * size)
+    stats.files += 1
+    stats.bytes_apparent += size
+
+
+def _write_zip(path: Path, member: str, size: int, stats: SynthStats) -> None:
+    """Write a small stored zip containing one ROM member."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+        zf.writestr(member, b"\0" * size)
+    stats.files += 1
+    stats.bytes_apparent += path.stat().st_size
+    stats.zips += 1
+
+
+def _disc_variant(
+    console_dir: Path,
+    name: str,
+    rng: random.Random,
+    stats: SynthStats,
+    chd_bytes: int,
+    budget: int,
+) -> None:
+    """Write one release of a disc-based game in a randomly chosen layout."""
+    layout = rng.random()
+    if layout < 0.15 and budget >= 3:
+        # Multi-disc set with an .m3u playlist next to it
+        discs = min(rng.randint(2, 4), budget - 1)
+        names = [f"{name} (Disc {n}).chd" for n in range(1, discs + 1)]
+        for disc in names:
+            _write(console_dir / disc, chd_bytes, stats, sparse=True)
+        (console_dir / f"{name}.m3u").write_text("\n".join(names) + "\n")
+        stats.files += 1
+        stats.multi_disc_sets += 1
+        stats.m3u_playlists += 1
+    elif layout < 0.30 and budget >= 2:
+        # Game folder holding a .bin/.cue pair
+        folder = console_dir / name
+        _write(folder / f"{name}.bin", 64, stats)
+        (folder / f"{name}.cue").write_text(f'FILE "{name}.bin" BINARY\n')
+        stats.files += 1
+        stats.game_folders += 1
+    elif layout < 0.45 and budget >= 2:
+        # Loose .bin/.cue pair
+        _write(console_dir / f"{name}.bin", 64, stats)
+        (console_dir / f"{name}.cue").write_text(f'FILE "{name}.bin" BINARY\n')
+        stats.files += 1
+    else:
+        _write(console_dir / f"{name}.chd", chd_bytes, stats, sparse=True)
+
+
+def generate_library(
+    root: Path,
+    files: int = 1000,
+    *,
+    seed: int = 0,
+    chd_bytes: int = 4096,
+    max_variants: int = 4,
+) -> SynthStats:
+    """Generate a ROM tree under root with roughly `files` files.
+
+    Each title gets 1..max_variants releases (regions, revisions, quality tags), so
+    the tree has a realistic share of duplicate groups. CHDs are sparse files of
+    chd_bytes apparent size, so multi-GB images cost no disk space.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    stats = SynthStats()
+    consoles = list(DISC_CONSOLES) + list(CART_CONSOLES)
+    index = 0
+    while stats.files < files:
+        console = rng.choice(consoles)
+        console_dir = root / console
+        title = _title(rng, index)
+        index += 1
+        stats.titles += 1
+        before = stats.files
+        regions = rng.sample(_REGIONS, rng.randint(1, max_variants))
+        for region in regions:
+            budget = files - stats.files
+            if budget <= 0:
+                break
+            name = (
+                f"{title} {region}{rng.choice(_LANGUAGES)}"
+                f"{rng.choice(_REVISIONS)}{rng.choice(_QUALITY)}"
+            )
+            if console in DISC_CONSOLES:
+                _disc_variant(console_dir, name, rng, stats, chd_bytes, budget)
+                continue
+            ext = rng.choice(CART_CONSOLES[console])
+            if ext == ".zip":
+                _write_zip(console_dir / f"{name}.zip", f"{name}.bin", 32, stats)
+            else:
+                _write(console_dir / f"{name}{ext}", 32, stats)
+        stats.consoles[console] = stats.consoles.get(console, 0) + stats.files - before
+    return stats
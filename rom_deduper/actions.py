@@ -1,20 +1,29 @@
 """Dry-run, move to _duplicates_removed, trash, restore."""
 
-import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-
-import send2trash
-from rich.console import Console
-from rich.table import Table
+from typing import TYPE_CHECKING
 
 from rom_deduper.config import Config, load_config
-from rom_deduper.grouper import group_entries
-from rom_deduper.ranker import rank_group
+from rom_deduper.grouper import DiscSet, GameGroup, group_entries
+from rom_deduper.layout import disk_order
+from rom_deduper.policy import compile_policy
+from rom_deduper.progress import APPLY, PURGE, RESTORE, Progress
+from rom_deduper.ranker import RankResult, rank_groups
 from rom_deduper.scanner import ROMEntry, scan
 
+if TYPE_CHECKING:
+    from rom_deduper.cache import RankCache
+    from rom_deduper.fuzzy import FuzzyMerge
+    from rom_deduper.manifest import StagedFile
+    from rom_deduper.merkle import FolderMatch, HashCache
 
-@dataclass
+
+@dataclass(slots=True)
 class DryRunGroup:
     """One group in a dry-run report."""
 
@@ -23,6 +32,9 @@ class DryRunGroup:
     keeper: ROMEntry | None
     to_remove: list[ROMEntry] = field(default_factory=list)
     uncertain: bool = False
+    changed: bool = True  # Decision differs from the previous cached run
+    disc_sets: list[DiscSet] = field(default_factory=list)  # Whole multi-disc sets in to_remove
+    keeper_set: DiscSet | None = None  # The multi-disc set keeper heads, if any
 
 
 @dataclass
@@ -33,44 +45,86 @@ class DryRunReport:
     total_files: int = 0
     duplicate_groups: int = 0
     total_to_remove: int = 0
+    changed_groups: int = 0
+    fuzzy_merges: "list[FuzzyMerge]" = field(default_factory=list)
+    folder_matches: "list[FolderMatch]" = field(default_factory=list)
 
 
-def dry_run(roms_root: Path, config: Config | None = None) -> DryRunReport:
-    """Scan, group, rank; return report of what would be kept/removed."""
+def dry_run(
+    roms_root: Path,
+    config: Config | None = None,
+    *,
+    progress: Progress | None = None,
+    cache: "RankCache | None" = None,
+    fuzzy: float | None = None,
+    folder_hashes: "HashCache | None" = None,
+) -> DryRunReport:
+    """Scan, group, rank; return report of what would be kept/removed.
+    With a cache, unchanged groups reuse the previous run's decision. With fuzzy set, titles
+    at least that similar within a console are merged into one group before ranking. With
+    folder_hashes, game folders with identical contents are grouped whatever their names."""
     roms_root = Path(roms_root)
     if config is None:
         config = load_config(roms_root)
-    entries = scan(roms_root, config=config)
+    entries = scan(roms_root, config=config, progress=progress)
     groups = group_entries(entries)
+    folder_matches: list[FolderMatch] = []
+    if folder_hashes is not None:
+        from rom_deduper.merkle import merge_identical_folders
 
-    report_groups: list[DryRunGroup] = []
-    total_to_remove = 0
+        groups, folder_matches = merge_identical_folders(groups, roms_root, folder_hashes)
+    fuzzy_merges: list[FuzzyMerge] = []
+    if fuzzy is not None:
+        from rom_deduper.fuzzy import merge_fuzzy
+
+        groups, fuzzy_merges = merge_fuzzy(groups, threshold=fuzzy)
 
-    for group in groups:
-        result = rank_group(group, config=config)
+    if cache is not None:
+        results, changed = cache.rank(groups, roms_root, compile_policy(config), progress=progress)
+    else:
+        results = rank_groups(groups, config=config, progress=progress)
+        changed = [True] * len(groups)
+    report_groups = _dry_run_groups(groups, results, changed)
+
+    return DryRunReport(
+        groups=report_groups,
+        total_files=len(entries),
+        duplicate_groups=len(report_groups),
+        total_to_remove=sum(len(g.to_remove) for g in report_groups),
+        changed_groups=sum(g.changed for g in report_groups),
+        fuzzy_merges=fuzzy_merges,
+        folder_matches=folder_matches,
+    )
+
+
+def _dry_run_groups(
+    groups: list[GameGroup], results: list[RankResult], changed: list[bool]
+) -> list[DryRunGroup]:
+    """One DryRunGroup per ranked group with something to remove, orphan .m3u included."""
+    report_groups: list[DryRunGroup] = []
+    for group, result, group_changed in zip(groups, results, changed):
         if result.to_remove:
-            to_remove_expanded = _expand_to_remove_orphan_m3u(result.to_remove)
+            removed = {id(e) for e in result.to_remove}
             report_groups.append(
                 DryRunGroup(
                     console=group.console,
                     base_title=group.base_title,
                     keeper=result.keeper,
-                    to_remove=to_remove_expanded,
+                    to_remove=_expand_to_remove_orphan_m3u(result.to_remove),
                     uncertain=result.uncertain,
+                    changed=group_changed,
+                    disc_sets=[
+                        s for s in group.disc_sets if all(id(d) in removed for d in s.discs)
+                    ],
+                    keeper_set=next(
+                        (s for s in group.disc_sets if s.discs[0] is result.keeper), None
+                    ),
                 )
             )
-            total_to_remove += len(to_remove_expanded)
-
-    return DryRunReport(
-        groups=report_groups,
-        total_files=len(entries),
-        duplicate_groups=len(report_groups),
-        total_to_remove=total_to_remove,
-    )
+    return report_groups
 
 
 STAGING_DIR = "_duplicates_removed"
-MANIFEST_FILENAME = ".manifest.json"
 
 
 def _staging_path(roms_root: Path, entry: ROMEntry) -> Path:
@@ -79,19 +133,9 @@ def _staging_path(roms_root: Path, entry: ROMEntry) -> Path:
     return roms_root / STAGING_DIR / rel
 
 
-def _load_manifest(roms_root: Path) -> dict[str, str]:
-    """Load manifest: dest_rel -> orig_rel (both relative to roms_root)."""
-    path = roms_root / STAGING_DIR / MANIFEST_FILENAME
-    if not path.exists():
-        return {}
-    return json.loads(path.read_text())
-
-
-def _save_manifest(roms_root: Path, manifest: dict[str, str]) -> None:
-    """Save manifest."""
-    staging = roms_root / STAGING_DIR
-    staging.mkdir(parents=True, exist_ok=True)
-    (staging / MANIFEST_FILENAME).write_text(json.dumps(manifest, indent=2))
+def _rel(path: Path, roms_root: Path) -> str:
+    """path relative to roms_root, with forward slashes."""
+    return str(path.relative_to(roms_root)).replace("\\", "/")
 
 
 def _size_of_path(p: Path) -> int:
@@ -128,13 +172,15 @@ def _expand_to_remove_orphan_m3u(entries: list[ROMEntry]) -> list[ROMEntry]:
     """Add .m3u files to remove when they exclusively reference entries being removed (orphans)."""
     to_remove_paths = {e.path.resolve() for e in entries}
     expanded = list(entries)
+    # Set of paths already in expanded: keeps the membership check O(1) per entry
+    expanded_paths = {e.path for e in entries}
     for entry in entries:
         if entry.path.suffix.lower() not in (".chd", ".bin", ".cue"):
             continue
         m3u_path = entry.path.with_suffix(".m3u")
-        if not m3u_path.exists():
+        if m3u_path in expanded_paths:
             continue
-        if any(e.path == m3u_path for e in expanded):
+        if not m3u_path.exists():
             continue
         try:
             refs = [
@@ -146,104 +192,361 @@ def _expand_to_remove_orphan_m3u(entries: list[ROMEntry]) -> list[ROMEntry]:
             continue
         if refs and all(r in to_remove_paths for r in refs):
             expanded.append(ROMEntry(path=m3u_path, console=entry.console, extension=".m3u"))
+            expanded_paths.add(m3u_path)
             to_remove_paths.add(m3u_path.resolve())
     return expanded
 
 
+def _removal_batches(group: DryRunGroup) -> list[list[ROMEntry]]:
+    """Entries to remove, batched: each disc set together, every other entry alone."""
+    in_set = {id(d) for s in group.disc_sets for d in s.discs}
+    batches = [list(s.discs) for s in group.disc_sets]
+    batches.extend([e] for e in group.to_remove if id(e) not in in_set)
+    return batches
+
+
+def _entry_size(entry: ROMEntry) -> int:
+    """Bytes entry occupies: its scan-time size (a game folder's covers its whole tree), or
+    a stat/walk when none was recorded."""
+    return entry.size if entry.size >= 0 else _size_of_path(entry.path)
+
+
+def _select_for_budget(groups: list[DryRunGroup], free_bytes: int) -> list[DryRunGroup]:
+    """The groups that reclaim the most bytes, largest first, until free_bytes is reached.
+    Whole groups are taken so disc sets and orphan .m3u files stay together."""
+    reclaim = {id(g): sum(_entry_size(e) for e in g.to_remove) for g in groups}
+    selected: list[DryRunGroup] = []
+    total = 0
+    for g in sorted(groups, key=lambda g: reclaim[id(g)], reverse=True):
+        if total >= free_bytes:
+            break
+        selected.append(g)
+        total += reclaim[id(g)]
+    return selected
+
+
+def _stage_batch(roms_root: Path, batch: list[ROMEntry]) -> list[tuple[Path, Path, int]]:
+    """Move a batch into staging. Returns (src, dest, size) per moved entry.
+    If any move fails, the entries already moved are put back before the error propagates,
+    so a disc set is never left split between the library and staging."""
+    moved: list[tuple[Path, Path, int]] = []
+    try:
+        for entry in batch:
+            src = entry.path
+            if not src.exists():
+                continue
+            size = _entry_size(entry)
+            dest = _staging_path(roms_root, entry)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            src.rename(dest)
+            moved.append((src, dest, size))
+    except OSError:
+        for src, dest, _ in reversed(moved):
+            dest.rename(src)
+        raise
+    return moved
+
+
+def _trash_batch(batch: list[ROMEntry]) -> tuple[int, int]:
+    """Send a batch's remaining files to the OS trash. Returns (count, bytes)."""
+    import send2trash
+
+    present = [e for e in batch if e.path.exists()]
+    size = sum(_entry_size(e) for e in present)
+    for e in present:
+        send2trash.send2trash(str(e.path))
+    return (len(present), size)
+
+
+def _staged_rows(
+    roms_root: Path, group: DryRunGroup, moved: list[tuple[Path, Path, int]], run_id: str
+) -> list["StagedFile"]:
+    """Manifest rows for the (src, dest, size) entries _stage_batch moved."""
+    from rom_deduper.manifest import StagedFile
+
+    staged_at = time.time()
+    return [
+        StagedFile(
+            dest_rel=_rel(dest, roms_root),
+            orig_rel=_rel(src, roms_root),
+            bytes=size,
+            console=group.console,
+            base_title=group.base_title,
+            staged_at=staged_at,
+            run_id=run_id,
+        )
+        for src, dest, size in moved
+    ]
+
+
 def apply_removal(
     roms_root: Path,
     report: DryRunReport,
     *,
     hard: bool = False,
     skip_uncertain: bool = False,
+    free_bytes: int | None = None,
+    run_id: str | None = None,
+    hdd_order: bool = False,
+    progress: Progress | None = None,
 ) -> tuple[int, int]:
     """Apply removal: move to _duplicates_removed (or trash if hard).
+    Multi-disc sets are moved as one batch; staged files are recorded under run_id (a new one
+    if None). With free_bytes, only the groups reclaiming the most bytes (by scan-time
+    sizes) are processed, largest first, until that many bytes are freed. hdd_order runs
+    the batches directory by directory, in inode order (see layout.disk_order).
     Returns (count removed, bytes freed)."""
     roms_root = Path(roms_root)
     count = 0
     bytes_freed = 0
+    groups = [g for g in report.groups if not (skip_uncertain and g.uncertain)]
+    if free_bytes is not None:
+        groups = _select_for_budget(groups, free_bytes)
+    # Already expanded in dry_run report
+    work = [(g, batch) for g in groups for batch in _removal_batches(g)]
+    if hdd_order:
+        work = disk_order(work, lambda w: os.path.join(w[1][0].directory, w[1][0].name))
+    if progress is not None:
+        progress.start(APPLY, total=sum(len(g.to_remove) for g in groups))
     if hard:
-        for g in report.groups:
-            if skip_uncertain and g.uncertain:
-                continue
-            to_remove = g.to_remove  # Already expanded in dry_run report
-            for entry in to_remove:
-                if entry.path.exists():
-                    bytes_freed += _size_of_path(entry.path)
-                send2trash.send2trash(str(entry.path))
-                count += 1
+        for g, batch in work:
+            trashed, size = _trash_batch(batch)
+            bytes_freed += size
+            count += trashed
+            if progress is not None:
+                progress.advance(APPLY, files=len(batch), nbytes=size, console=g.console)
+        if progress is not None:
+            progress.finish(APPLY)
         return (count, bytes_freed)
 
-    manifest = _load_manifest(roms_root)
-    for g in report.groups:
-        if skip_uncertain and g.uncertain:
-            continue
-        to_remove = g.to_remove  # Already expanded in dry_run report
-        for entry in to_remove:
-            src = entry.path
-            if not src.exists():
-                continue
-            bytes_freed += _size_of_path(src)
-            dest = _staging_path(roms_root, entry)
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            src.rename(dest)
-            dest_rel = str(dest.relative_to(roms_root)).replace("\\", "/")
-            orig_rel = str(src.relative_to(roms_root)).replace("\\", "/")
-            manifest[dest_rel] = orig_rel
-            count += 1
-    if manifest:
-        _save_manifest(roms_root, manifest)
+    from rom_deduper.manifest import Manifest, new_run_id
+
+    run_id = run_id or new_run_id()
+    # Closing commits whatever was staged, even if a later move failed
+    with Manifest(roms_root / STAGING_DIR) as manifest:
+        for g, batch in work:
+            moved = _stage_batch(roms_root, batch)
+            manifest.add(_staged_rows(roms_root, g, moved, run_id))
+            size = sum(entry_size for _, _, entry_size in moved)
+            bytes_freed += size
+            count += len(moved)
+            if progress is not None:
+                progress.advance(APPLY, files=len(batch), nbytes=size, console=g.console)
+    if progress is not None:
+        progress.finish(APPLY)
     return (count, bytes_freed)
 
 
+RESTORE_BATCH = 256  # Restored rows dropped from the manifest per commit
+
+
 def restore(
     roms_root: Path,
     *,
     on_conflict: str = "skip",
+    console: str | None = None,
+    title: str | None = None,
+    run_id: str | None = None,
+    hdd_order: bool = False,
+    progress: Progress | None = None,
 ) -> int:
     """Restore files from _duplicates_removed to originals.
     on_conflict: 'skip' (default), 'overwrite', or 'remove'.
+    console, title (glob) and run_id select which manifest rows to restore; rows outside the
+    selection are not touched. Skipped files stay in the manifest; every other selected row is
+    dropped. hdd_order moves files directory by directory, in inode order.
     Returns count restored."""
+    from rom_deduper.manifest import Manifest
+
     roms_root = Path(roms_root)
-    manifest = _load_manifest(roms_root)
-    if not manifest:
+    staging = roms_root / STAGING_DIR
+    if not Manifest.exists(staging):
         return 0
     count = 0
-    had_skip = False
-    for dest_rel, orig_rel in list(manifest.items()):
-        dest = roms_root / dest_rel.replace("\\", "/")
-        orig = roms_root / orig_rel.replace("\\", "/")
-        if not dest.exists():
-            continue
-        if orig.exists():
-            if on_conflict == "skip":
-                had_skip = True
-                continue
-            if on_conflict == "overwrite":
-                orig.unlink()
-            elif on_conflict == "remove":
-                dest.unlink()
-                manifest.pop(dest_rel, None)
-                _save_manifest(roms_root, manifest)
-                continue
-        orig.parent.mkdir(parents=True, exist_ok=True)
-        dest.rename(orig)
-        count += 1
-    manifest_path = roms_root / STAGING_DIR / MANIFEST_FILENAME
-    if manifest_path.exists() and not had_skip:
-        manifest_path.unlink()
-    for p in sorted((roms_root / STAGING_DIR).rglob("*"), reverse=True):
-        if p.is_dir() and not any(p.iterdir()):
-            p.rmdir()
-    if (roms_root / STAGING_DIR).exists() and not any((roms_root / STAGING_DIR).iterdir()):
-        (roms_root / STAGING_DIR).rmdir()
+    done: list[str] = []  # Rows to drop: restored, removed, or missing from staging
+    touched: set[Path] = set()  # Staging directories files left, to prune afterwards
+    with Manifest(staging) as manifest:
+        if progress is not None:
+            total = manifest.count(console=console, title=title, run_id=run_id)
+            progress.start(RESTORE, total=total)
+        # Read the selection up front: rows are deleted and committed while restoring
+        rows = list(manifest.files(console=console, title=title, run_id=run_id))
+        if hdd_order:
+            rows = disk_order(rows, lambda r: os.path.join(roms_root, r.dest_rel))
+
+        def flush() -> None:
+            manifest.remove(done)
+            manifest.commit()
+            done.clear()
+
+        try:
+            for row in rows:
+                dest = roms_root / row.dest_rel
+                orig = roms_root / row.orig_rel
+                if progress is not None:
+                    progress.advance(RESTORE, nbytes=row.bytes, console=row.console)
+                if len(done) >= RESTORE_BATCH:
+                    flush()
+                if not dest.exists():
+                    done.append(row.dest_rel)
+                    continue
+                if orig.exists():
+                    if on_conflict == "skip":
+                        continue
+                    if on_conflict == "overwrite":
+                        orig.unlink()
+                    elif on_conflict == "remove":
+                        dest.unlink()
+                        done.append(row.dest_rel)
+                        touched.add(dest.parent)
+                        continue
+                orig.parent.mkdir(parents=True, exist_ok=True)
+                dest.rename(orig)
+                done.append(row.dest_rel)
+                touched.add(dest.parent)
+                count += 1
+        finally:
+            flush()
+            _prune_empty_dirs(touched, staging)
+    if progress is not None:
+        progress.finish(RESTORE)
     return count
 
 
+PURGE_BATCH = 256  # Staged files deleted per worker task
+PURGE_WORKERS = 8
+
+
+@dataclass(slots=True)
+class StagingStatus:
+    """What _duplicates_removed holds, from the manifest's running totals."""
+
+    files: int
+    bytes: int
+    consoles: list[tuple[str, int, int]]  # (console, files, bytes), largest first
+    oldest: float | None  # Staged-at Unix times
+    newest: float | None
+
+
+def staging_status(roms_root: Path) -> StagingStatus:
+    """Files and bytes held in staging, without walking the staging tree."""
+    from rom_deduper.manifest import Manifest
+
+    staging = Path(roms_root) / STAGING_DIR
+    if not Manifest.exists(staging):
+        return StagingStatus(files=0, bytes=0, consoles=[], oldest=None, newest=None)
+    with Manifest(staging) as manifest:
+        span = manifest.staged_span()
+        return StagingStatus(
+            files=len(manifest),
+            bytes=manifest.total_bytes(),
+            consoles=manifest.totals(),
+            oldest=span[0] if span else None,
+            newest=span[1] if span else None,
+        )
+
+
+def _delete_staged(
+    roms_root: Path, batch: list["StagedFile"]
+) -> tuple[list["StagedFile"], list["StagedFile"]]:
+    """Permanently delete a batch of staged files (or folders). Returns (gone, deleted):
+    every row now gone, and the subset this call actually deleted. A file that was
+    already missing is gone but not deleted; one that could not be deleted keeps its row."""
+    gone, deleted = [], []
+    for row in batch:
+        path = roms_root / row.dest_rel
+        try:
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+        except FileNotFoundError:
+            gone.append(row)
+            continue
+        except OSError:
+            continue
+        gone.append(row)
+        deleted.append(row)
+    return gone, deleted
+
+
+def _prune_empty_dirs(dirs: set[Path], stop: Path) -> None:
+    """Remove whichever of dirs and their ancestors below stop are empty, in one bottom-up
+    pass. Only those directories are visited; each gets one rmdir attempt, no listing."""
+    candidates: set[Path] = set()
+    for directory in dirs:
+        while directory not in candidates and stop in directory.parents:
+            candidates.add(directory)
+            directory = directory.parent
+    # Deepest first, so a parent is tried after every touched child had its chance
+    for directory in sorted(candidates, key=lambda d: len(d.parts), reverse=True):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass  # Not empty, or already gone
+
+
+def purge(
+    roms_root: Path,
+    *,
+    older_than: float,
+    now: float | None = None,
+    hdd_order: bool = False,
+    progress: Progress | None = None,
+) -> tuple[int, int]:
+    """Permanently delete files staged more than older_than seconds ago.
+    Expired rows are selected through the staged_at index and deleted in parallel batches;
+    each batch's rows are dropped (and committed) as it completes. hdd_order deletes in
+    directory and inode order on one worker. Returns the (count, bytes) actually deleted;
+    rows whose file is already missing are dropped without being counted."""
+    from rom_deduper.manifest import Manifest
+
+    roms_root = Path(roms_root)
+    staging = roms_root / STAGING_DIR
+    if not Manifest.exists(staging):
+        return (0, 0)
+    cutoff = (time.time() if now is None else now) - older_than
+    count = 0
+    bytes_freed = 0
+    with Manifest(staging) as manifest:
+        rows = list(manifest.files(staged_before=cutoff))
+        if hdd_order:
+            rows = disk_order(rows, lambda r: os.path.join(roms_root, r.dest_rel))
+        if progress is not None:
+            progress.start(PURGE, total=len(rows))
+        batches = [rows[i : i + PURGE_BATCH] for i in range(0, len(rows), PURGE_BATCH)]
+        touched: set[Path] = set()
+        # Concurrent deletes would interleave directories again on a spinning disk
+        with ThreadPoolExecutor(max_workers=1 if hdd_order else PURGE_WORKERS) as pool:
+            results = pool.map(lambda batch: _delete_staged(roms_root, batch), batches)
+            for batch, (gone, deleted) in zip(batches, results):
+                manifest.remove(row.dest_rel for row in gone)
+                manifest.commit()
+                # Rows whose file had already vanished free nothing now
+                size = sum(row.bytes for row in deleted)
+                touched.update((roms_root / row.dest_rel).parent for row in gone)
+                count += len(deleted)
+                bytes_freed += size
+                if progress is not None:
+                    progress.advance(PURGE, files=len(batch), nbytes=size)
+        _prune_empty_dirs(touched, staging)
+    if progress is not None:
+        progress.finish(PURGE)
+    return (count, bytes_freed)
+
+
 def format_dry_run_report(
-    report: DryRunReport, *, quiet: bool = False, debug: bool = False
+    report: DryRunReport,
+    *,
+    quiet: bool = False,
+    debug: bool = False,
+    changed_only: bool = False,
 ) -> None:
     """Format and print dry-run report. Uses Rich table when not quiet."""
+    from rich.console import Console
+    from rich.markup import escape
+    from rich.table import Table
+
     from rom_deduper.parser import parse_filename
 
     console = Console()
@@ -253,17 +556,33 @@ def format_dry_run_report(
         f"Duplicate groups: {report.duplicate_groups} | "
         f"Files to remove: {report.total_to_remove}"
     )
+    if changed_only:
+        summary += f"\nChanged since last scan: {report.changed_groups}"
     console.print(summary)
+    if report.fuzzy_merges:
+        console.print(f"\n[bold]Fuzzy merges: {len(report.fuzzy_merges)}[/bold]")
+        if not quiet:
+            for m in report.fuzzy_merges:
+                console.print(
+                    f"  [cyan]{m.console}[/cyan] {escape(m.merged)!r} -> {escape(m.into)!r} "
+                    f"({m.similarity:.2f})"
+                )
+    if report.folder_matches:
+        console.print(f"\n[bold]Identical folders: {len(report.folder_matches)}[/bold]")
+        if not quiet:
+            for fm in report.folder_matches:
+                names = ", ".join(repr(escape(n)) for n in fm.folders)
+                console.print(f"  [cyan]{fm.console}[/cyan] {names}")
     if debug and report.groups:
         console.print("\n[bold]Debug — grouping details:[/bold]")
         for g in report.groups:
             console.print(f"  [cyan]{g.console}[/cyan] [green]{g.base_title}[/green]")
             if g.keeper:
-                p = parse_filename(g.keeper.path.name)
-                console.print(f"    keeper: {g.keeper.path.name} (region={p.region})")
+                p = parse_filename(g.keeper.name)
+                console.print(f"    keeper: {g.keeper.name} (region={p.region})")
             for r in g.to_remove:
-                p = parse_filename(r.path.name)
-                console.print(f"    remove: {r.path.name} (region={p.region})")
+                p = parse_filename(r.name)
+                console.print(f"    remove: {r.name} (region={p.region})")
     if quiet:
         return
     if not report.groups:
@@ -274,8 +593,35 @@ def format_dry_run_report(
     table.add_column("Keeper", style="green")
     table.add_column("To Remove", style="red")
     for g in report.groups:
-        keeper_name = g.keeper.path.name if g.keeper else "?"
-        to_remove_names = ", ".join(r.path.name for r in g.to_remove)
+        keeper_name = g.keeper.name if g.keeper else "?"
+        to_remove_names = ", ".join(r.name for r in g.to_remove)
         uncertain = " (uncertain)" if g.uncertain else ""
         table.add_row(g.console, g.base_title + uncertain, keeper_name, to_remove_names)
     console.print(table)
+
+
+def format_staging_status(status: StagingStatus, *, quiet: bool = False) -> None:
+    """Print what staging holds: totals, then one row per console when not quiet."""
+    from datetime import datetime
+
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    summary = (
+        f"[bold]Staging Status[/bold]\nFiles: {status.files} | Size: {_format_bytes(status.bytes)}"
+    )
+    if status.oldest is not None and status.newest is not None:
+        oldest = datetime.fromtimestamp(status.oldest).strftime("%Y-%m-%d %H:%M")
+        newest = datetime.fromtimestamp(status.newest).strftime("%Y-%m-%d %H:%M")
+        summary += f" | Staged: {oldest} to {newest}"
+    console.print(summary)
+    if quiet or not status.consoles:
+        return
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("Console", style="cyan")
+    table.add_column("Files", justify="right")
+    table.add_column("Size", justify="right")
+    for name, files, nbytes in status.consoles:
+        table.add_row(name, str(files), _format_bytes(nbytes))
+    console.print(table)
@@ -0,0 +1,144 @@
+"""Persistent ranking cache: unchanged groups are served from the last run's decisions."""
+
+import hashlib
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from rom_deduper.grouper import GameGroup
+from rom_deduper.jsoncache import load_section, save_section
+from rom_deduper.policy import ScoringPolicy
+from rom_deduper.progress import RANK, Progress
+from rom_deduper.ranker import RankResult, rank_groups
+from rom_deduper.scanner import ROMEntry
+
+CACHE_FILENAME = ".rom-deduper-cache.json"
+CACHE_VERSION = 1
+
+
+@dataclass(slots=True)
+class CachedDecision:
+    """A group's fingerprint and the ranking decision made for it."""
+
+    fingerprint: str
+    keeper: str | None
+    to_remove: list[str]
+    uncertain: bool = False
+
+    def same_decision(self, other: "CachedDecision") -> bool:
+        """True when keeper, removals and uncertainty match (fingerprints may differ)."""
+        return (self.keeper, sorted(self.to_remove), self.uncertain) == (
+            other.keeper,
+            sorted(other.to_remove),
+            other.uncertain,
+        )
+
+
+def group_key(group: GameGroup) -> str:
+    """Cache key of a group: console and normalized title."""
+    return f"{group.console}/{group.base_title}"
+
+
+def _rel(entry: ROMEntry, root: str) -> str:
+    """Entry path relative to the ROMs root, with forward slashes."""
+    path = os.path.join(entry.directory, entry.name)
+    prefix = os.path.join(root, "")
+    rel = path[len(prefix) :] if path.startswith(prefix) else os.path.relpath(path, root)
+    return rel.replace("\\", "/")
+
+
+def fingerprint(group: GameGroup, root: str, policy_digest: str) -> str:
+    """Hash of member paths, sizes and mtimes plus the scoring policy digest."""
+    h = hashlib.sha1(policy_digest.encode())
+    for rel, size, mtime_ns in sorted((_rel(e, root), e.size, e.mtime_ns) for e in group.entries):
+        h.update(f"{rel}\0{size}\0{mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+class RankCache:
+    """Group fingerprints and RankResults from the previous run, stored as JSON."""
+
+    def __init__(self, path: Path, decisions: dict[str, CachedDecision] | None = None) -> None:
+        self.path = Path(path)
+        self.decisions: dict[str, CachedDecision] = decisions or {}
+
+    @classmethod
+    def load(cls, roms_root: Path) -> "RankCache":
+        """Load the cache for roms_root; empty if missing, unreadable or from another version."""
+        path = Path(roms_root) / CACHE_FILENAME
+        groups = load_section(path, CACHE_VERSION, "groups")
+        return cls(path, {k: CachedDecision(**v) for k, v in groups.items()})
+
+    def save(self) -> None:
+        """Write the cache."""
+        groups = {k: asdict(d) for k, d in self.decisions.items()}
+        save_section(self.path, CACHE_VERSION, "groups", groups)
+
+    def rank(
+        self,
+        groups: list[GameGroup],
+        roms_root: Path,
+        policy: ScoringPolicy,
+        *,
+        progress: Progress | None = None,
+    ) -> tuple[list[RankResult], list[bool]]:
+        """Rank groups, serving unchanged ones from the cache and batch-ranking the rest.
+
+        Returns one RankResult per group and, per group, whether its decision differs from
+        the previous run. The cache is updated to hold exactly the current groups.
+        """
+        root = os.fspath(roms_root)
+        results: list[RankResult | None] = [None] * len(groups)
+        prints: list[str] = [""] * len(groups)
+        misses: list[int] = []
+        if progress is not None:
+            progress.start(RANK, total=sum(len(g.entries) for g in groups))
+        for i, group in enumerate(groups):
+            if len(group.entries) == 1:
+                results[i] = RankResult(keeper=group.entries[0], to_remove=[])
+                continue
+            prints[i] = fingerprint(group, root, policy.digest)
+            cached = self.decisions.get(group_key(group))
+            if cached is not None and cached.fingerprint == prints[i]:
+                results[i] = _from_cache(group, cached, root)
+                if progress is not None:
+                    progress.advance(RANK, files=len(group.entries), console=group.console)
+            else:
+                misses.append(i)
+        ranked = rank_groups([groups[i] for i in misses], policy=policy)
+        for i, result in zip(misses, ranked):
+            results[i] = result
+            if progress is not None:
+                progress.advance(RANK, files=len(groups[i].entries), console=groups[i].console)
+        if progress is not None:
+            progress.finish(RANK)
+
+        final = [r for r in results if r is not None]  # every slot is filled by now
+        previous = self.decisions
+        self.decisions = {}
+        changed: list[bool] = []
+        for group, result, fp in zip(groups, final, prints):
+            if not fp:
+                changed.append(False)
+                continue
+            decision = CachedDecision(
+                fingerprint=fp,
+                keeper=_rel(result.keeper, root) if result.keeper else None,
+                to_remove=[_rel(e, root) for e in result.to_remove],
+                uncertain=result.uncertain,
+            )
+            key = group_key(group)
+            old = previous.get(key)
+            changed.append(old is None or not old.same_decision(decision))
+            self.decisions[key] = decision
+        return final, changed
+
+
+def _from_cache(group: GameGroup, cached: CachedDecision, root: str) -> RankResult:
+    """Rebuild a RankResult from a cached decision and the group's current entries."""
+    by_rel = {_rel(e, root): e for e in group.entries}
+    return RankResult(
+        keeper=by_rel.get(cached.keeper) if cached.keeper else None,
+        to_remove=[by_rel[rel] for rel in cached.to_remove],
+        uncertain=cached.uncertain,
+    )
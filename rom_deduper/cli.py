@@ -1,19 +1,94 @@
-"""CLI entry point."""
+"""CLI entry point.
+
+Only stdlib and config are imported at module load. The scan and rank pipeline, rich,
+send2trash and other heavy modules are imported by the subcommands that use them, keeping
+--help and small restores fast for cron jobs and launchers; a quiet restore never loads
+rich at all.
+"""
 
 import argparse
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from rich.console import Console
-
-from rom_deduper.actions import (
-    _format_bytes,
-    apply_removal,
-    dry_run,
-    format_dry_run_report,
-    restore,
-)
 from rom_deduper.config import load_config, load_config_from_file
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from rom_deduper.actions import DryRunReport
+    from rom_deduper.cache import RankCache
+    from rom_deduper.config import Config
+    from rom_deduper.merkle import HashCache
+    from rom_deduper.progress import RichProgress
+    from rom_deduper.verify import Dat
+
+
+def _add_fuzzy(parser: argparse.ArgumentParser) -> None:
+    """Add --fuzzy and --fuzzy-threshold to a subparser."""
+    parser.add_argument(
+        "--fuzzy",
+        action="store_true",
+        help="Also group near-identical titles (e.g. ':' vs ' -') within a console",
+    )
+    parser.add_argument(
+        "--fuzzy-threshold",
+        type=float,
+        default=None,
+        metavar="SIMILARITY",
+        help="Minimum title similarity for --fuzzy, 0-1 (default: 0.8)",
+    )
+
+
+def _add_hash_folders(parser: argparse.ArgumentParser) -> None:
+    """Add --hash-folders to a subparser."""
+    parser.add_argument(
+        "--hash-folders",
+        action="store_true",
+        help="Group game folders with identical contents, even under different names",
+    )
+
+
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+
+def _byte_size(text: str) -> int:
+    """Parse a size like 200G, 512M or 1.5T (binary units) into bytes (argparse type)."""
+    number = text.rstrip("bBiI")  # Accept 200G, 200GB and 200GiB alike
+    unit = number[-1:].lower() if number[-1:].isalpha() else ""
+    try:
+        value = float(number[: len(number) - len(unit)])
+    except ValueError:
+        value = float("nan")
+    if unit not in _SIZE_UNITS or not value > 0:
+        raise argparse.ArgumentTypeError(f"invalid size {text!r} (e.g. 200G, 512M)")
+    return int(value * _SIZE_UNITS[unit])
+
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def _duration(text: str) -> float:
+    """Parse an age like 30d, 12h or 2w into seconds (argparse type)."""
+    unit = _DURATION_UNITS.get(text[-1:].lower())
+    try:
+        value = float(text[:-1]) if unit else float("nan")
+    except ValueError:
+        value = float("nan")
+    if unit is None or not value >= 0:
+        raise argparse.ArgumentTypeError(f"invalid duration {text!r} (e.g. 30d, 12h, 2w)")
+    return value * unit
+
+
+def _add_hdd_order(parser: argparse.ArgumentParser) -> None:
+    """Add --hdd-order to a subparser."""
+    parser.add_argument(
+        "--hdd-order",
+        action="store_true",
+        help="Order file operations by directory and inode, for spinning disks",
+    )
+
 
 def _add_verbosity(parser: argparse.ArgumentParser) -> None:
     """Add -q, -v, and --debug to a subparser."""
@@ -23,6 +98,194 @@ def _add_verbosity(parser: argparse.ArgumentParser) -> None:
     group.add_argument("--debug", action="store_true", help="Parser and grouping details")
 
 
+def _save_cache(console: "Console", cache: "RankCache | HashCache | None", what: str) -> None:
+    """Write a cache if one was used; a failed write is a warning, not an error."""
+    if cache is None:
+        return
+    try:
+        cache.save()
+    except OSError as e:
+        console.print(f"[yellow]Warning: could not write {what}: {e}[/yellow]")
+
+
+def _make_console() -> "Console":
+    """A rich Console; rich is imported here so commands that print nothing never load it."""
+    from rich.console import Console
+
+    return Console()
+
+
+@contextmanager
+def _progress(console: "Console | None", quiet: bool) -> Iterator["RichProgress | None"]:
+    """Live per-stage progress bars on a terminal; None when quiet or output is redirected."""
+    if quiet or console is None or not console.is_terminal:
+        yield None
+        return
+    from rom_deduper.progress import RichProgress
+
+    with RichProgress(console) as progress:
+        yield progress
+
+
+def _cross(paths: list[Path], config_path: Path | None, quiet: bool, console: "Console") -> None:
+    """Run the cross command: compare every root, each with its own config and hash cache."""
+    from rom_deduper.cross import find_cross_duplicates, format_cross_report
+    from rom_deduper.merkle import HashCache
+
+    for path in paths:
+        if not path.is_dir():
+            console.print(f"[red]Error: not a directory: {path}[/red]")
+            raise SystemExit(1)
+    configs = [load_config(p, config_path=config_path) for p in paths]
+    caches = [HashCache.load(p) for p in paths]
+    status = console.status("Comparing files...") if not quiet and console.is_terminal else None
+    with status or nullcontext():
+        report = find_cross_duplicates(paths, configs, caches)
+    for cache in caches:
+        _save_cache(console, cache, "hash cache")
+    format_cross_report(report, quiet=quiet)
+
+
+def _load_dat(dat_path: Path | None, console: "Console") -> "Dat | None":
+    """Load --dat, exiting with an error if it cannot be read."""
+    from rom_deduper.verify import Dat
+
+    if dat_path is None:
+        return None
+    try:
+        return Dat.load(dat_path)
+    except (OSError, SyntaxError) as e:  # ET.ParseError is a SyntaxError
+        console.print(f"[red]Error: could not read DAT {dat_path}: {e}[/red]")
+        raise SystemExit(1) from e
+
+
+def _verify(report: "DryRunReport", dat_path: Path | None, quiet: bool, console: "Console") -> None:
+    """Check keepers before apply; corrupt ones are swapped for a verified alternate."""
+    from rom_deduper.verify import format_verify_report, verify_keepers
+
+    dat = _load_dat(dat_path, console)
+    status = console.status("Verifying keepers...") if not quiet and console.is_terminal else None
+    with status or nullcontext():
+        result = verify_keepers(report, dat=dat)
+    format_verify_report(result, quiet=quiet)
+
+
+def _apply_pipeline(
+    roms_path: Path,
+    config: "Config",
+    parsed: argparse.Namespace,
+    fuzzy: float | None,
+    folder_hashes: "HashCache | None",
+    run_id: str,
+    console: "Console",
+) -> tuple["DryRunReport", int, int]:
+    """Run apply --pipeline; returns (report, count removed, bytes freed)."""
+    from rom_deduper.pipeline import run_pipeline
+
+    quiet = parsed.quiet
+    dat = _load_dat(parsed.dat, console)
+    with _progress(console, quiet) as progress:
+        result = run_pipeline(
+            roms_path,
+            config,
+            hard=parsed.hard,
+            skip_uncertain=parsed.skip_uncertain,
+            fuzzy=fuzzy,
+            folder_hashes=folder_hashes,
+            verify=parsed.verify_keeper,
+            dat=dat,
+            run_id=run_id,
+            progress=progress,
+        )
+    _save_cache(console, folder_hashes, "folder hash cache")
+    if result.verify is not None:
+        from rom_deduper.verify import format_verify_report
+
+        format_verify_report(result.verify, quiet=quiet)
+    if parsed.verbose:
+        stages = ", ".join(f"{name} {s.busy:.2f}s" for name, s in result.stages.items())
+        console.print(
+            f"[dim]Pipeline: {stages} busy in {result.seconds:.2f}s "
+            f"(overlap x{result.overlap:.1f})[/dim]"
+        )
+    return result.report, result.removed, result.bytes_freed
+
+
+def _watch(
+    roms_path: Path, config: "Config", report_path: Path | None, quiet: bool, console: "Console"
+) -> None:
+    """Run the watch command until interrupted."""
+    from rom_deduper.inotify import available
+    from rom_deduper.watch import watch
+
+    if not available():
+        console.print("[red]Error: watch requires Linux inotify[/red]")
+        raise SystemExit(1)
+
+    def on_update(report: "DryRunReport", changed: int) -> None:
+        if not quiet:
+            console.print(
+                f"Groups re-ranked: {changed} | "
+                f"Duplicate groups: {report.duplicate_groups} | "
+                f"Files to remove: {report.total_to_remove}"
+            )
+
+    console.print(f"Watching {roms_path} (Ctrl-C to stop)")
+    try:
+        watch(roms_path, config, report_path, on_update=on_update)
+    except KeyboardInterrupt:
+        console.print("Stopped")
+
+
+def _restore(roms_path: Path, config: "Config", parsed: argparse.Namespace, quiet: bool) -> None:
+    """Run the restore command. A quiet restore prints plain text and never imports rich,
+    so a cron job with nothing staged stays cheap."""
+    from rom_deduper.actions import restore
+
+    console = None if quiet else _make_console()
+    with _progress(console, quiet) as progress:
+        count = restore(
+            roms_path,
+            on_conflict=parsed.on_conflict,
+            console=parsed.console,
+            title=parsed.title,
+            run_id=parsed.run,
+            hdd_order=config.hdd_order,
+            progress=progress,
+        )
+    if console is None:
+        print(f"Restored {count} file(s)")
+    else:
+        console.print(f"[green]Restored {count} file(s)[/green]")
+
+
+def _serve(
+    roms_path: Path, config: "Config", parsed: argparse.Namespace, console: "Console"
+) -> None:
+    """Run the serve command until interrupted."""
+    from rom_deduper.serve import make_server
+
+    try:
+        server = make_server(
+            roms_path,
+            config,
+            host=parsed.host,
+            port=parsed.port,
+            socket_path=parsed.socket,
+            verbose=parsed.verbose,
+        )
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Error: cannot serve: {e}[/red]")
+        raise SystemExit(1) from e
+    console.print(f"Serving {roms_path} on {server.url} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("Stopped")
+    finally:
+        server.server_close()
+
+
 def main(args: list[str] | None = None) -> None:
     """Entry point for rom-deduper."""
     parser = argparse.ArgumentParser(description="Find and remove duplicate ROMs")
@@ -45,6 +308,19 @@ def main(args: list[str] | None = None) -> None:
         help="Path to ROMs directory (default: from config roms_path)",
     )
     add_config_arg(scan_parser)
+    scan_parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Only report groups whose decision changed since the last scan",
+    )
+    scan_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-rank every group and do not read or write the ranking cache",
+    )
+    _add_fuzzy(scan_parser)
+    _add_hash_folders(scan_parser)
+    _add_hdd_order(scan_parser)
     _add_verbosity(scan_parser)
 
     apply_parser = subparsers.add_parser("apply", help="Remove duplicates")
@@ -66,6 +342,33 @@ def main(args: list[str] | None = None) -> None:
         action="store_true",
         help="Skip groups with uncertain ranking (manual review recommended)",
     )
+    apply_parser.add_argument(
+        "--free",
+        type=_byte_size,
+        default=None,
+        metavar="SIZE",
+        help="Stop once SIZE is freed (e.g. 200G), removing the largest savings first",
+    )
+    apply_parser.add_argument(
+        "--verify-keeper",
+        action="store_true",
+        help="CRC-check each keeper first (zip CRCs, or --dat); keep a verified alternate if bad",
+    )
+    apply_parser.add_argument(
+        "--dat",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help="Logiqx XML DAT (No-Intro/Redump) to verify keepers against (implies --verify-keeper)",
+    )
+    apply_parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Overlap scan, rank, verify and move across consoles (not with --free)",
+    )
+    _add_fuzzy(apply_parser)
+    _add_hash_folders(apply_parser)
+    _add_hdd_order(apply_parser)
     _add_verbosity(apply_parser)
 
     restore_parser = subparsers.add_parser("restore", help="Restore from _duplicates_removed")
@@ -82,16 +385,114 @@ def main(args: list[str] | None = None) -> None:
         default="skip",
         help="When original path exists: skip (default), overwrite, or remove from duplicates",
     )
+    restore_parser.add_argument("--console", help="Restore only files staged from this console")
+    restore_parser.add_argument(
+        "--title", metavar="GLOB", help='Restore only titles matching GLOB (e.g. "Final Fantasy*")'
+    )
+    restore_parser.add_argument(
+        "--run", metavar="ID", help="Restore only files staged by this apply run"
+    )
     add_config_arg(restore_parser)
+    _add_hdd_order(restore_parser)
     _add_verbosity(restore_parser)
 
+    status_parser = subparsers.add_parser(
+        "status", help="Show what _duplicates_removed holds, per console"
+    )
+    status_parser.add_argument(
+        "path",
+        type=Path,
+        nargs="?",
+        default=None,
+        help="Path to ROMs directory (default: from config roms_path)",
+    )
+    add_config_arg(status_parser)
+    _add_verbosity(status_parser)
+
+    purge_parser = subparsers.add_parser(
+        "purge", help="Permanently delete staged files older than a given age"
+    )
+    purge_parser.add_argument(
+        "path",
+        type=Path,
+        nargs="?",
+        default=None,
+        help="Path to ROMs directory (default: from config roms_path)",
+    )
+    purge_parser.add_argument(
+        "--older-than",
+        type=_duration,
+        required=True,
+        metavar="AGE",
+        help="Delete files staged more than AGE ago: 30d, 12h, 2w (units s, m, h, d, w)",
+    )
+    add_config_arg(purge_parser)
+    _add_hdd_order(purge_parser)
+    _add_verbosity(purge_parser)
+
+    cross_parser = subparsers.add_parser(
+        "cross", help="Report identical files across consoles and library roots"
+    )
+    cross_parser.add_argument(
+        "paths", type=Path, nargs="+", help="One or more ROMs directories to compare"
+    )
+    add_config_arg(cross_parser)
+    _add_verbosity(cross_parser)
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="Keep a duplicate report current as ROMs change (Linux)"
+    )
+    watch_parser.add_argument(
+        "path",
+        type=Path,
+        nargs="?",
+        default=None,
+        help="Path to ROMs directory (default: from config roms_path)",
+    )
+    watch_parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="Report file to keep current (default: roms_root/.rom-deduper-report.json)",
+    )
+    add_config_arg(watch_parser)
+    _add_verbosity(watch_parser)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Serve a warm index over a local JSON API (scan/report/apply/restore)"
+    )
+    serve_parser.add_argument(
+        "path",
+        type=Path,
+        nargs="?",
+        default=None,
+        help="Path to ROMs directory (default: from config roms_path)",
+    )
+    serve_parser.add_argument(
+        "--host", default="127.0.0.1", help="Loopback address to listen on (default: 127.0.0.1)"
+    )
+    serve_parser.add_argument(
+        "--port", type=int, default=8765, help="Port to listen on (default: 8765)"
+    )
+    serve_parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Listen on a Unix socket instead of TCP",
+    )
+    add_config_arg(serve_parser)
+    _add_verbosity(serve_parser)
+
     parsed = parser.parse_args(args)
 
     quiet = getattr(parsed, "quiet", False)
     verbose = getattr(parsed, "verbose", False)
     debug = getattr(parsed, "debug", False)
-    console = Console()
     config_path = getattr(parsed, "config", None)
+    if parsed.command == "cross":
+        _cross(parsed.paths, config_path, quiet, _make_console())
+        return
     if parsed.path is not None:
         config = load_config(parsed.path, config_path=config_path)
         roms_path = parsed.path
@@ -99,33 +500,127 @@ def main(args: list[str] | None = None) -> None:
         config = load_config_from_file(Path(config_path))
         roms_path = config.roms_path
         if roms_path is None:
-            console.print("[red]Error: path required when config has no roms_path[/red]")
+            _make_console().print("[red]Error: path required when config has no roms_path[/red]")
             raise SystemExit(1)
     else:
-        console.print("[red]Error: path required (or use --config with roms_path)[/red]")
+        _make_console().print("[red]Error: path required (or use --config with roms_path)[/red]")
+        raise SystemExit(1)
+
+    if getattr(parsed, "hdd_order", False):
+        config.hdd_order = True
+    if parsed.command == "restore":
+        _restore(roms_path, config, parsed, quiet)
+        return
+
+    console = _make_console()
+
+    fuzzy = None
+    if getattr(parsed, "fuzzy", False):
+        from rom_deduper.fuzzy import DEFAULT_THRESHOLD
+
+        fuzzy = DEFAULT_THRESHOLD if parsed.fuzzy_threshold is None else parsed.fuzzy_threshold
+    if fuzzy is not None and not 0 < fuzzy <= 1:
+        console.print("[red]Error: --fuzzy-threshold must be between 0 and 1[/red]")
+        raise SystemExit(1)
+    if getattr(parsed, "pipeline", False) and parsed.free is not None:
+        # Choosing the largest savings first needs every console ranked before any move
+        console.print("[red]Error: --pipeline cannot be combined with --free[/red]")
         raise SystemExit(1)
 
+    folder_hashes = None
+    if getattr(parsed, "hash_folders", False):
+        from rom_deduper.merkle import HashCache
+
+        folder_hashes = HashCache.load(roms_path)
+
     if parsed.command == "scan":
-        with console.status("[bold blue]Scanning ROMs...[/]"):
-            report = dry_run(roms_path, config=config)
-        format_dry_run_report(report, quiet=quiet, debug=debug)
+        from rom_deduper.actions import dry_run, format_dry_run_report
+        from rom_deduper.cache import RankCache
+
+        cache = None if parsed.no_cache else RankCache.load(roms_path)
+        with _progress(console, quiet) as progress:
+            report = dry_run(
+                roms_path,
+                config=config,
+                progress=progress,
+                cache=cache,
+                fuzzy=fuzzy,
+                folder_hashes=folder_hashes,
+            )
+        _save_cache(console, cache, "ranking cache")
+        _save_cache(console, folder_hashes, "folder hash cache")
+        if parsed.changed_only:
+            report.groups = [g for g in report.groups if g.changed]
+        format_dry_run_report(report, quiet=quiet, debug=debug, changed_only=parsed.changed_only)
     elif parsed.command == "apply":
-        with console.status("[bold blue]Scanning ROMs...[/]"):
-            report = dry_run(roms_path, config=config)
-        count, bytes_freed = apply_removal(
-            roms_path,
-            report,
-            hard=parsed.hard,
-            skip_uncertain=getattr(parsed, "skip_uncertain", False),
-        )
+        from rom_deduper.actions import _format_bytes, apply_removal, dry_run
+        from rom_deduper.manifest import new_run_id
+
+        run_id = new_run_id()
+        verify = parsed.verify_keeper or parsed.dat is not None
+        if parsed.pipeline:
+            report, count, bytes_freed = _apply_pipeline(
+                roms_path, config, parsed, fuzzy, folder_hashes, run_id, console
+            )
+        else:
+            with _progress(console, quiet) as progress:
+                report = dry_run(
+                    roms_path,
+                    config=config,
+                    progress=progress,
+                    fuzzy=fuzzy,
+                    folder_hashes=folder_hashes,
+                )
+            _save_cache(console, folder_hashes, "folder hash cache")
+            if verify:
+                _verify(report, parsed.dat, quiet, console)
+            with _progress(console, quiet) as progress:
+                count, bytes_freed = apply_removal(
+                    roms_path,
+                    report,
+                    hard=parsed.hard,
+                    skip_uncertain=getattr(parsed, "skip_uncertain", False),
+                    free_bytes=parsed.free,
+                    run_id=run_id,
+                    hdd_order=config.hdd_order,
+                    progress=progress,
+                )
         if verbose:
             for g in report.groups:
                 for r in g.to_remove:
-                    console.print(f"[dim]Removed:[/dim] {r.path.relative_to(roms_path)}")
+                    # Skipped groups (--skip-uncertain, --free) are still in place
+                    if not r.path.exists():
+                        console.print(f"[dim]Removed:[/dim] {r.path.relative_to(roms_path)}")
         msg = f"[green]Removed {count} duplicate(s)[/green]"
         if bytes_freed > 0:
             msg += f" — [green]{_format_bytes(bytes_freed)} saved[/green]"
+        if count and not parsed.hard:
+            msg += f" [dim](run {run_id})[/dim]"
         console.print(msg)
-    elif parsed.command == "restore":
-        count = restore(roms_path, on_conflict=parsed.on_conflict)
-        console.print(f"[green]Restored {count} file(s)[/green]")
+        if parsed.free is not None and bytes_freed < parsed.free:
+            console.print(
+                f"[yellow]Only {_format_bytes(bytes_freed)} of duplicates found; "
+                f"{_format_bytes(parsed.free)} requested[/yellow]"
+            )
+    elif parsed.command == "status":
+        from rom_deduper.actions import format_staging_status, staging_status
+
+        format_staging_status(staging_status(roms_path), quiet=quiet)
+    elif parsed.command == "purge":
+        from rom_deduper.actions import _format_bytes, purge
+
+        with _progress(console, quiet) as progress:
+            count, bytes_freed = purge(
+                roms_path,
+                older_than=parsed.older_than,
+                hdd_order=config.hdd_order,
+                progress=progress,
+            )
+        msg = f"[green]Purged {count} file(s)[/green]"
+        if bytes_freed > 0:
+            msg += f" — [green]{_format_bytes(bytes_freed)} freed[/green]"
+        console.print(msg)
+    elif parsed.command == "watch":
+        _watch(roms_path, config, parsed.report, quiet, console)
+    elif parsed.command == "serve":
+        _serve(roms_path, config, parsed, console)
@@ -1,8 +1,12 @@
 """Load config and region priority."""
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from rom_deduper.policy import ScoringPolicy
 
 DEFAULT_EXCLUDED_CONSOLES = {"daphne", "singe", "hypseus", "ports"}
 
@@ -15,6 +19,14 @@ class Config:
     translation_patterns: list[str]
     region_priority: list[str] | None
     roms_path: Path | None = None
+    format_preference: list[str] | None = None
+    console_overrides: dict[str, dict[str, Any]] = field(default_factory=dict)
+    console_aliases: dict[str, str] = field(default_factory=dict)  # lowercase alias -> console
+    ignore_globs: list[str] = field(default_factory=list)  # Skipped while walking consoles
+    hdd_order: bool = False  # Order scan, apply and restore I/O by directory and inode
+    pipeline_workers: dict[str, int] = field(default_factory=dict)  # apply --pipeline stages
+    # Compiled by policy.compile_policy; recompiled when the ranking settings change
+    _policy: "ScoringPolicy | None" = field(default=None, init=False, repr=False, compare=False)
 
     @classmethod
     def default(cls) -> "Config":
@@ -46,6 +58,18 @@ def load_config(roms_root: Path | None = None, config_path: Path | None = None)
         translation_patterns=data.get("translation_patterns") or [],
         region_priority=data.get("region_priority"),
         roms_path=Path(data["roms_path"]) if data.get("roms_path") else None,
+        format_preference=data.get("format_preference"),
+        console_overrides={
+            str(k).lower(): dict(v) for k, v in (data.get("console_overrides") or {}).items()
+        },
+        console_aliases={
+            str(k).lower(): str(v) for k, v in (data.get("console_aliases") or {}).items()
+        },
+        ignore_globs=[str(g) for g in data.get("ignore_globs") or []],
+        hdd_order=bool(data.get("hdd_order", False)),
+        pipeline_workers={
+            str(k).lower(): int(v) for k, v in (data.get("pipeline_workers") or {}).items()
+        },
     )
 
 
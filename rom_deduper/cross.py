@@ -0,0 +1,197 @@
+"""Cross-console and cross-root duplicate detection by content identity.
+
+Normal grouping never compares files in different console directories or library roots.
+This report indexes every ROM file by size, then a hash of its first and last bytes, then
+a full content hash, and lists identical files found in more than one (root, console
+directory) location.
+Each root is scanned and partially hashed by its own worker thread, so a slow mount does
+not hold up the others. Full hashes are read in one process pool pass whose per-device
+limits keep roots on different disks independent.
+"""
+
+import os
+from collections import defaultdict
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, TypeVar
+
+from rom_deduper.hashing import EDGES, PARTIAL_BYTES, file_digest
+from rom_deduper.merkle import HashCache, prefetch
+from rom_deduper.scanner import ROMEntry, scan
+
+if TYPE_CHECKING:
+    from rom_deduper.config import Config
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# (index of the root in the roots list, entry)
+Copy = tuple[int, ROMEntry]
+
+
+@dataclass(slots=True)
+class CrossDuplicate:
+    """Identical files found in more than one console or root."""
+
+    size: int
+    digest: str
+    copies: list[Copy] = field(default_factory=list)
+
+
+@dataclass
+class CrossReport:
+    """Result of a cross-location duplicate search."""
+
+    roots: list[Path]
+    duplicates: list[CrossDuplicate] = field(default_factory=list)
+    total_files: int = 0
+    hashed_files: int = 0  # Files whose full contents were read this run
+
+    @property
+    def reclaimable(self) -> int:
+        """Bytes freed by keeping one copy of each duplicate."""
+        return sum(d.size * (len(d.copies) - 1) for d in self.duplicates)
+
+
+def _per_root(fn: Callable[[int, T], R], work: Sequence[T]) -> list[R]:
+    """Run fn(root_index, work[root_index]) for every root, one thread per root."""
+    if len(work) <= 1:
+        return [fn(i, w) for i, w in enumerate(work)]
+    with ThreadPoolExecutor(max_workers=len(work)) as pool:
+        return list(pool.map(fn, range(len(work)), work))
+
+
+def _location(roots: list[Path], copy: Copy) -> tuple[int, str]:
+    """(root, console directory) of a copy. The directory, not entry.console, so console
+    directories merged by console_aliases still count as separate locations."""
+    root, entry = copy
+    rel = os.path.relpath(entry.directory, roots[root])
+    return (root, rel.split(os.sep, 1)[0])
+
+
+def _spans_locations(roots: list[Path], copies: list[Copy]) -> bool:
+    """True when copies sit in more than one (root, console directory) location."""
+    first = _location(roots, copies[0])
+    return any(_location(roots, c) != first for c in copies[1:])
+
+
+def _candidates(buckets: dict[tuple, list[Copy]], roots: list[Path]) -> list[tuple[tuple, Copy]]:
+    """(key, copy) for every copy in a bucket that spans more than one location."""
+    return [
+        (key, copy)
+        for key, copies in buckets.items()
+        if len(copies) > 1 and _spans_locations(roots, copies)
+        for copy in copies
+    ]
+
+
+def _refine(
+    buckets: dict[tuple, list[Copy]],
+    roots: list[Path],
+    digest: Callable[[int, ROMEntry], str],
+) -> dict[tuple, list[Copy]]:
+    """Split each multi-location bucket by digest, hashing each root's files in its own worker."""
+    work: list[list[tuple[tuple, ROMEntry]]] = [[] for _ in roots]
+    for key, (root, entry) in _candidates(buckets, roots):
+        work[root].append((key, entry))
+
+    def hash_root(root: int, items: list[tuple[tuple, ROMEntry]]) -> list[tuple[tuple, Copy]]:
+        out = []
+        for key, entry in items:
+            try:
+                out.append(((*key, digest(root, entry)), (root, entry)))
+            except OSError:
+                continue
+        return out
+
+    refined: dict[tuple, list[Copy]] = defaultdict(list)
+    for results in _per_root(hash_root, work):
+        for key, copy in results:
+            refined[key].append(copy)
+    return refined
+
+
+def find_cross_duplicates(
+    roots: Sequence[Path],
+    configs: Sequence["Config | None"] | None = None,
+    caches: Sequence[HashCache] | None = None,
+) -> CrossReport:
+    """Find files with identical contents in different consoles or roots.
+
+    configs and caches, when given, hold one Config and one HashCache per root. Full hashes
+    go through the cache, so unchanged files are not re-read on later runs.
+    """
+    roots = [Path(r) for r in roots]
+    configs = list(configs) if configs is not None else [None] * len(roots)
+    caches = list(caches) if caches is not None else [HashCache.load(r) for r in roots]
+    entries = _per_root(lambda i, root: scan(root, configs[i]), roots)
+    report = CrossReport(roots=roots, total_files=sum(len(e) for e in entries))
+    hashed_before = sum(c.hashed for c in caches)
+
+    by_size: dict[tuple, list[Copy]] = defaultdict(list)
+    for i, root_entries in enumerate(entries):
+        for entry in root_entries:
+            if entry.extension is None or entry.extension == ".m3u" or entry.size <= 0:
+                continue
+            by_size[(entry.size,)].append((i, entry))
+
+    def edges(_: int, entry: ROMEntry) -> str:
+        return file_digest(os.path.join(entry.directory, entry.name), span=EDGES)
+
+    def rel(root: int, entry: ROMEntry) -> tuple[str, str]:
+        path = os.path.join(entry.directory, entry.name)
+        return path, os.path.relpath(path, roots[root]).replace("\\", "/")
+
+    def full(root: int, entry: ROMEntry) -> str:
+        if entry.size <= 2 * PARTIAL_BYTES:
+            return ""  # The partial hash already covered the whole file
+        path, rel_path = rel(root, entry)
+        return caches[root].digest(path, rel_path, os.stat(path))
+
+    by_edges = _refine(by_size, roots, edges)
+    prefetch(
+        [
+            (caches[root], *rel(root, entry))
+            for _, (root, entry) in _candidates(by_edges, roots)
+            if entry.size > 2 * PARTIAL_BYTES
+        ]
+    )
+    by_content = _refine(by_edges, roots, full)
+    for (size, partial, digest), copies in sorted(by_content.items(), key=lambda kv: -kv[0][0]):
+        if len(copies) > 1 and _spans_locations(roots, copies):
+            report.duplicates.append(CrossDuplicate(size, digest or partial, copies))
+    report.hashed_files = sum(c.hashed for c in caches) - hashed_before
+    return report
+
+
+def format_cross_report(report: CrossReport, *, quiet: bool = False) -> None:
+    """Print a cross-location report: one row per set of identical files, largest first."""
+    from rich.console import Console
+    from rich.markup import escape
+    from rich.table import Table
+
+    from rom_deduper.actions import _format_bytes
+
+    console = Console()
+    console.print(
+        f"[bold]Cross-Location Report[/bold]\n"
+        f"Roots: {len(report.roots)} | "
+        f"Total files: {report.total_files} | "
+        f"Duplicate sets: {len(report.duplicates)} | "
+        f"Reclaimable: {_format_bytes(report.reclaimable)}"
+    )
+    if quiet or not report.duplicates:
+        return
+    multi_root = len(report.roots) > 1
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("Size", justify="right")
+    table.add_column("Copies", style="cyan")
+    for dup in report.duplicates:
+        lines = []
+        for root, entry in dup.copies:
+            rel = os.path.relpath(os.path.join(entry.directory, entry.name), report.roots[root])
+            lines.append(escape(f"{report.roots[root]}: {rel}" if multi_root else rel))
+        table.add_row(_format_bytes(dup.size), "\n".join(lines))
+    console.print(table)
@@ -0,0 +1,157 @@
+"""Fuzzy title grouping: merge near-miss titles with a character n-gram MinHash LSH index.
+
+Exact grouping keys on base_title_normalized, so "Castlevania - Symphony of the Night" and
+"Castlevania: Symphony of the Night" land in separate groups. This stage proposes merge
+candidates per console from locality-sensitive hash buckets (near-linear, no pairwise scan),
+then confirms each candidate with the exact n-gram Jaccard similarity.
+"""
+
+import random
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+
+from rom_deduper.grouper import GameGroup, UnionFind, merge_groups
+
+DEFAULT_THRESHOLD = 0.8
+NGRAM = 3
+BANDS = 8
+ROWS = 4  # BANDS * ROWS MinHash functions; J=0.8 pairs collide in some band ~98% of the time
+MAX_BUCKET = 64  # Oversized buckets are noise (very common n-grams); skip rather than go quadratic
+
+_MASK = (1 << 32) - 1
+_rng = random.Random(0x5EED)
+# (a * h + b) mod 2**32 with odd a permutes 32-bit hashes: one permutation per MinHash function
+_PERMUTATIONS = [(_rng.getrandbits(32) | 1, _rng.getrandbits(32)) for _ in range(BANDS * ROWS)]
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+# Numbers anywhere and a trailing roman numeral distinguish sequels: "Tekken 2" vs
+# "Tekken 3", "Final Fantasy VII" vs "Final Fantasy VIII". Only well-formed numerals in
+# the last position count, so words like "ill", "civic" or "lil" do not block a match.
+_NUMBER = re.compile(r"\b\d+\b")
+_TRAILING_NUMERAL = re.compile(
+    r"\b(?=[mdclxvi])m*(?:c[md]|d?c{0,3})(?:x[cl]|l?x{0,3})(?:i[xv]|v?i{0,3})$"
+)
+
+
+@dataclass(slots=True)
+class FuzzyMerge:
+    """One title folded into another by fuzzy grouping."""
+
+    console: str
+    into: str
+    merged: str
+    similarity: float
+
+
+def canonical_title(title: str) -> str:
+    """Lowercase, punctuation-free, single-spaced form of a normalized title."""
+    return " ".join(_NON_ALNUM.sub(" ", title.lower()).split())
+
+
+def _shingles(canonical: str) -> frozenset[str]:
+    """Character n-grams of the padded title."""
+    padded = f" {canonical} "
+    if len(padded) <= NGRAM:
+        return frozenset({padded})
+    return frozenset(padded[i : i + NGRAM] for i in range(len(padded) - NGRAM + 1))
+
+
+def _signature(shingles: frozenset[str]) -> list[int]:
+    """MinHash signature: per permutation, the minimum permuted shingle hash."""
+    hashes = [zlib.crc32(s.encode()) for s in shingles]
+    return [min((a * h + b) & _MASK for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    """Exact Jaccard similarity of two shingle sets."""
+    return len(a & b) / len(a | b)
+
+
+def _sequel_tokens(canonical: str) -> tuple[str, ...]:
+    numeral = _TRAILING_NUMERAL.search(canonical)
+    return (*_NUMBER.findall(canonical), numeral.group() if numeral else "")
+
+
+def _merge_console(
+    groups: list[GameGroup], threshold: float
+) -> tuple[list[GameGroup], list[FuzzyMerge]]:
+    """Fuzzy-merge the groups of one console."""
+    canon = [canonical_title(g.base_title) for g in groups]
+    shingles = [_shingles(c) for c in canon]
+    uf = UnionFind(len(groups))
+    similarity: dict[tuple[int, int], float] = {}
+
+    # Identical after dropping punctuation: merge without hashing
+    first_by_canon: dict[str, int] = {}
+    unique: list[int] = []
+    for i, c in enumerate(canon):
+        j = first_by_canon.setdefault(c, i)
+        if j == i:
+            unique.append(i)
+        elif uf.union(j, i):
+            similarity[(j, i)] = 1.0
+
+    buckets: dict[tuple[int, tuple[int, ...]], list[int]] = defaultdict(list)
+    for i in unique:
+        sig = _signature(shingles[i])
+        for band in range(BANDS):
+            buckets[(band, tuple(sig[band * ROWS : (band + 1) * ROWS]))].append(i)
+
+    seen: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        if len(members) < 2 or len(members) > MAX_BUCKET:
+            continue
+        for x, i in enumerate(members):
+            for j in members[x + 1 :]:
+                pair = (i, j) if i < j else (j, i)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                if _sequel_tokens(canon[i]) != _sequel_tokens(canon[j]):
+                    continue
+                score = _jaccard(shingles[i], shingles[j])
+                if score >= threshold and uf.union(i, j):
+                    similarity[pair] = score
+
+    merged_groups: list[GameGroup] = []
+    merges: list[FuzzyMerge] = []
+    for group, rep, members in merge_groups(groups, uf):
+        merged_groups.append(group)
+        for i in members:
+            if i == rep:
+                continue
+            score = similarity.get((min(i, rep), max(i, rep)))
+            if score is None:
+                score = _jaccard(shingles[i], shingles[rep])
+            merges.append(
+                FuzzyMerge(
+                    console=groups[rep].console,
+                    into=groups[rep].base_title,
+                    merged=groups[i].base_title,
+                    similarity=score,
+                )
+            )
+    return merged_groups, merges
+
+
+def merge_fuzzy(
+    groups: list[GameGroup], threshold: float = DEFAULT_THRESHOLD
+) -> tuple[list[GameGroup], list[FuzzyMerge]]:
+    """Merge groups whose titles are near-identical within the same console.
+
+    Returns the merged groups (sorted like group_entries output) and a record of each merge.
+    Titles whose numbers or roman numerals differ are never merged.
+    """
+    by_console: dict[str, list[GameGroup]] = defaultdict(list)
+    for g in groups:
+        by_console[g.console].append(g)
+    out: list[GameGroup] = []
+    merges: list[FuzzyMerge] = []
+    for console_groups in by_console.values():
+        merged, console_merges = _merge_console(console_groups, threshold)
+        out.extend(merged)
+        merges.extend(console_merges)
+    out.sort(key=lambda g: (g.console, g.base_title))
+    return out, merges
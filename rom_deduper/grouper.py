@@ -1,40 +1,164 @@
 """Group ROMs by game and associate m3u/bin/cue."""
 
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from rom_deduper.parser import parse_filename
+from rom_deduper.parser import ParseResult, parse_filename
 from rom_deduper.scanner import ROMEntry
 
+# (region, languages, extension, version, quality, translated): discs sharing all of these
+# are one release of a multi-disc game
+ReleaseVariant = tuple[str, str, str, str, str, bool]
 
-@dataclass
+
+@dataclass(slots=True)
+class DiscSet:
+    """One release of a multi-disc game: its variant and its discs in disc order."""
+
+    variant: ReleaseVariant
+    discs: list[ROMEntry] = field(default_factory=list)
+    numbers: list[int] = field(default_factory=list)  # Disc number of each entry in discs
+
+    def add(self, entry: ROMEntry, number: int) -> None:
+        """Insert a disc, keeping discs ordered by number."""
+        i = len(self.numbers)
+        while i > 0 and self.numbers[i - 1] > number:
+            i -= 1
+        self.discs.insert(i, entry)
+        self.numbers.insert(i, number)
+
+    def missing(self, expected: int | None = None) -> list[int]:
+        """Disc numbers absent from 1..expected (default: the highest disc present)."""
+        top = max(self.numbers, default=0) if expected is None else expected
+        present = set(self.numbers)
+        return [n for n in range(1, top + 1) if n not in present]
+
+    @property
+    def complete(self) -> bool:
+        """Discs 1..n all present for some n > 1. A lone Disc 1 is part of a larger set;
+        a release with fewer discs than another one is not incomplete for that."""
+        return max(self.numbers, default=0) > 1 and not self.missing()
+
+
+@dataclass(slots=True)
 class GameGroup:
     """A group of ROM entries representing the same game within a console."""
 
     console: str
     base_title: str
     entries: list[ROMEntry]
+    disc_sets: list[DiscSet] = field(default_factory=list)  # Multi-disc releases in entries
+
+    @property
+    def disc_count(self) -> int:
+        """Highest disc number of any release in the group; 0 when none is multi-disc."""
+        return max((max(s.numbers) for s in self.disc_sets), default=0)
+
+
+def release_variant(entry: ROMEntry, parsed: ParseResult) -> ReleaseVariant:
+    """Variant key shared by every disc of one release."""
+    return (
+        parsed.region or "",
+        ",".join(parsed.languages or ()),
+        (entry.extension or "").lower(),
+        parsed.version or "",
+        parsed.quality or "",
+        parsed.has_translation,
+    )
+
+
+def merge_disc_sets(sets: list[DiscSet]) -> list[DiscSet]:
+    """Combine sets with the same variant (e.g. after merging groups), keeping disc order."""
+    by_variant: dict[ReleaseVariant, DiscSet] = {}
+    for s in sets:
+        target = by_variant.get(s.variant)
+        if target is None:
+            by_variant[s.variant] = DiscSet(s.variant, list(s.discs), list(s.numbers))
+            continue
+        for entry, number in zip(s.discs, s.numbers):
+            target.add(entry, number)
+    return list(by_variant.values())
 
 
 def group_entries(entries: list[ROMEntry]) -> list[GameGroup]:
-    """Group ROM entries by (console, normalized base title)."""
+    """Group ROM entries by (console, normalized base title), with their multi-disc sets."""
     if not entries:
         return []
 
     # Group by (console, base_title_normalized)
     groups_map: dict[tuple[str, str], list[ROMEntry]] = defaultdict(list)
+    sets_map: dict[tuple[str, str], dict[ReleaseVariant, DiscSet]] = defaultdict(dict)
 
     for entry in entries:
-        parsed = parse_filename(entry.path.name)
+        parsed = parse_filename(entry.name)
         # For multi-disk, use base_title without Disc N for grouping
         key = (entry.console, parsed.base_title_normalized)
         groups_map[key].append(entry)
+        if parsed.disc_number is not None and (entry.extension or "").lower() != ".m3u":
+            variant = release_variant(entry, parsed)
+            sets = sets_map[key]
+            if variant not in sets:
+                sets[variant] = DiscSet(variant)
+            sets[variant].add(entry, parsed.disc_number)
 
     return [
         GameGroup(
             console=console,
             base_title=base_title,
             entries=group_entries_list,
+            disc_sets=list(sets_map.get((console, base_title), {}).values()),
         )
         for (console, base_title), group_entries_list in sorted(groups_map.items())
     ]
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1, for merging groups found to be the same game."""
+
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> bool:
+        """Join the sets of i and j. False if they were already one set."""
+        ri, rj = self.find(i), self.find(j)
+        if ri == rj:
+            return False
+        self.parent[max(ri, rj)] = min(ri, rj)
+        return True
+
+
+def merge_groups(groups: list[GameGroup], uf: UnionFind) -> list[tuple[GameGroup, int, list[int]]]:
+    """Combine the groups joined in uf, one result per set, in order of first member.
+
+    Returns (merged group, representative index, member indices). The merged group keeps
+    the console and title of its largest member (ties: the earliest); a set of one is
+    returned unchanged.
+    """
+    clusters: dict[int, list[int]] = defaultdict(list)
+    for i in range(len(groups)):
+        clusters[uf.find(i)].append(i)
+    out = []
+    for members in clusters.values():
+        rep = max(members, key=lambda i: (len(groups[i].entries), -i))
+        if len(members) == 1:
+            out.append((groups[rep], rep, members))
+            continue
+        out.append(
+            (
+                GameGroup(
+                    console=groups[rep].console,
+                    base_title=groups[rep].base_title,
+                    entries=[e for i in members for e in groups[i].entries],
+                    disc_sets=merge_disc_sets([s for i in members for s in groups[i].disc_sets]),
+                ),
+                rep,
+                members,
+            )
+        )
+    return out
@@ -0,0 +1,226 @@
+"""Content hashing for large ROM files: full and partial (head, head and tail) digests.
+
+Files are read unbuffered with readinto() into one reusable buffer per thread, and the
+digest is fed memoryview slices of it. Hashing a 4 GB CHD therefore allocates nothing
+per chunk. hash_files spreads files over a process pool and limits how many files are
+read at once from each device: one at a time on a spinning disk, so concurrent reads do
+not pull the heads back and forth between files.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import zlib
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from functools import partial
+from io import FileIO
+from multiprocessing.context import BaseContext
+from typing import Protocol
+
+from rom_deduper.layout import disk_order
+
+CHUNK = 1 << 20  # Bytes per readinto() call
+PARTIAL_BYTES = 64 * 1024  # Bytes hashed at each end for partial digests
+INLINE_BYTES = 32 << 20  # Below this much reading in total, hash in-process
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+FULL = "full"  # Whole file
+HEAD = "head"  # First PARTIAL_BYTES
+EDGES = "edges"  # First and last PARTIAL_BYTES
+
+_local = threading.local()
+
+
+class _Digest(Protocol):
+    def update(self, data: memoryview, /) -> None: ...
+
+    def hexdigest(self) -> str: ...
+
+
+class Crc32:
+    """zlib.crc32 behind the hashlib update/hexdigest interface."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def update(self, data: memoryview, /) -> None:
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self) -> str:
+        return f"{self.value:08x}"
+
+
+def _new(algorithm: str) -> _Digest:
+    return Crc32() if algorithm == "crc32" else hashlib.new(algorithm)
+
+
+def _buffer() -> memoryview:
+    """This thread's read buffer, reallocated only if CHUNK changed."""
+    view: memoryview | None = getattr(_local, "view", None)
+    if view is None or len(view) != CHUNK:
+        view = _local.view = memoryview(bytearray(CHUNK))
+    return view
+
+
+def _feed(digest: _Digest, f: FileIO, limit: int | None = None) -> int:
+    """Read f into digest until EOF or limit bytes; return the bytes read."""
+    view = _buffer()
+    total = 0
+    while limit is None or total < limit:
+        want = len(view) if limit is None else min(len(view), limit - total)
+        n = f.readinto(view[:want])
+        if not n:
+            break
+        digest.update(view[:n])
+        total += n
+    return total
+
+
+def span_bytes(size: int, span: str = FULL, nbytes: int = PARTIAL_BYTES) -> int:
+    """Bytes file_digest reads from a file of size bytes."""
+    if span == HEAD:
+        return min(size, nbytes)
+    if span == EDGES:
+        return min(size, 2 * nbytes)
+    return size
+
+
+def file_digest(
+    path: str, algorithm: str = "sha1", span: str = FULL, nbytes: int = PARTIAL_BYTES
+) -> str:
+    """Hex digest of a file, or of its first (HEAD) or first and last (EDGES) nbytes.
+
+    A partial span that covers the whole file gives the full digest.
+    """
+    digest = _new(algorithm)
+    with open(path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if span_bytes(size, span, nbytes) == size:
+            _feed(digest, f)
+        elif span == HEAD:
+            _feed(digest, f, nbytes)
+        else:
+            _feed(digest, f, nbytes)
+            f.seek(size - nbytes)
+            _feed(digest, f, nbytes)
+    return digest.hexdigest()
+
+
+def file_crc32(path: str) -> tuple[int, int]:
+    """(size, CRC32) of a file's contents."""
+    digest = Crc32()
+    with open(path, "rb", buffering=0) as f:
+        size = _feed(digest, f)
+    return (size, digest.value)
+
+
+def device_limit(dev: int, workers: int) -> int:
+    """Files read at once from device dev: 1 on a rotational disk, else workers.
+
+    Rotation comes from sysfs on Linux (a partition's own entry has no queue, so its
+    parent disk is tried too); devices that cannot be identified count as solid state.
+    """
+    if not hasattr(os, "major"):
+        return workers
+    base = f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}"
+    for path in (f"{base}/queue/rotational", f"{base}/../queue/rotational"):
+        try:
+            with open(path) as f:
+                return 1 if f.read().strip() == "1" else workers
+        except OSError:
+            continue
+    return workers
+
+
+def _mp_context() -> BaseContext:
+    """forkserver where available: workers fork from a clean server process, which is safe
+    even when hash_files is called from a thread (as the apply pipeline does)."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+
+
+def _hash_job(path: str, algorithm: str, span: str, nbytes: int) -> str | None:
+    """Process pool entry point; None when the file cannot be read."""
+    try:
+        return file_digest(path, algorithm, span, nbytes)
+    except OSError:
+        return None
+
+
+def run_per_device(
+    pool: Executor,
+    fn: Callable[[str], str | None],
+    queues: dict[int, deque[str]],
+    limits: dict[int, int],
+    slots: int,
+) -> Iterator[tuple[str, str | None]]:
+    """Yield (path, fn(path)) as jobs finish, with at most limits[dev] in flight per device
+    and slots overall. Work is only submitted when a slot is free, so the pool's own queue
+    never holds jobs that would get around a device's limit."""
+    running: dict[Future[str | None], tuple[int, str]] = {}
+    in_flight: dict[int, int] = defaultdict(int)
+
+    def fill() -> None:
+        for dev, queue in queues.items():
+            while queue and in_flight[dev] < limits[dev] and len(running) < slots:
+                path = queue.popleft()
+                running[pool.submit(fn, path)] = (dev, path)
+                in_flight[dev] += 1
+
+    fill()
+    while running:
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            dev, path = running.pop(future)
+            in_flight[dev] -= 1
+            yield path, future.result()
+        fill()
+
+
+def hash_files(
+    paths: Iterable[str],
+    *,
+    algorithm: str = "sha1",
+    span: str = FULL,
+    nbytes: int = PARTIAL_BYTES,
+    workers: int = DEFAULT_WORKERS,
+    per_device: int | None = None,
+) -> dict[str, str]:
+    """path -> hex digest for every readable file in paths.
+
+    Files are spread over a process pool of workers, at most per_device at a time from one
+    device (default: device_limit). Files on a rotational disk are read in directory and
+    inode order. Small batches are hashed in-process, where starting a pool would cost more
+    than it saves.
+    """
+    job = partial(_hash_job, algorithm=algorithm, span=span, nbytes=nbytes)
+    by_dev: dict[int, list[str]] = defaultdict(list)
+    total = 0
+    for path in dict.fromkeys(paths):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        by_dev[st.st_dev].append(path)
+        total += span_bytes(st.st_size, span, nbytes)
+    count = sum(len(dev_paths) for dev_paths in by_dev.values())
+    if workers <= 1 or count < 2 or total < INLINE_BYTES:
+        results: Iterable[tuple[str, str | None]] = (
+            (path, job(path)) for dev_paths in by_dev.values() for path in dev_paths
+        )
+        return {path: digest for path, digest in results if digest is not None}
+
+    limits = {dev: per_device or device_limit(dev, workers) for dev in by_dev}
+    queues = {
+        dev: deque(disk_order(dev_paths, str) if limits[dev] == 1 else dev_paths)
+        for dev, dev_paths in by_dev.items()
+    }
+    slots = min(workers, count)
+    with ProcessPoolExecutor(max_workers=slots, mp_context=_mp_context()) as pool:
+        results = run_per_device(pool, job, queues, limits, slots)
+        return {path: digest for path, digest in results if digest is not None}
@@ -0,0 +1,158 @@
+"""Minimal Linux inotify binding over ctypes (no third-party watcher service)."""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+from dataclasses import dataclass
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# Everything that can add, remove, rename or rewrite a ROM in a watched directory
+TREE_EVENTS = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+@dataclass(slots=True)
+class Event:
+    """One inotify event: the watched directory, the child name (may be empty) and mask."""
+
+    directory: str
+    name: str
+    mask: int
+
+    @property
+    def is_dir(self) -> bool:
+        return bool(self.mask & IN_ISDIR)
+
+
+def available() -> bool:
+    """True when inotify can be used on this platform."""
+    return sys.platform.startswith("linux") and _libc() is not None
+
+
+_LIBC: ctypes.CDLL | None = None
+
+
+def _libc() -> ctypes.CDLL | None:
+    global _LIBC
+    if _LIBC is None and sys.platform.startswith("linux"):
+        try:
+            _LIBC = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        except OSError:
+            return None
+    return _LIBC
+
+
+class Inotify:
+    """An inotify instance watching directories; use as a context manager."""
+
+    def __init__(self) -> None:
+        libc = _libc()
+        if libc is None:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = libc
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd = fd
+        self._paths: dict[int, str] = {}  # wd -> directory
+        self._wds: dict[str, int] = {}  # directory -> wd
+
+    def __enter__(self) -> "Inotify":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the inotify descriptor, dropping every watch."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def add_watch(self, directory: str, mask: int = TREE_EVENTS) -> int:
+        """Watch one directory (not recursive). Returns the watch descriptor."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), mask | IN_ONLYDIR)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), directory)
+        self._paths[wd] = directory
+        self._wds[directory] = wd
+        return wd
+
+    def remove_watch(self, directory: str) -> None:
+        """Stop watching directory; a no-op if it is not watched or already gone."""
+        wd = self._wds.pop(directory, None)
+        if wd is not None:
+            self._paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self.fd, wd)
+
+    @property
+    def watched(self) -> set[str]:
+        """Directories currently watched."""
+        return set(self._wds)
+
+    def read(self, timeout: float | None = None) -> list[Event]:
+        """Events available within timeout seconds (None: wait indefinitely)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        events: list[Event] = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            events.extend(self._parse(data))
+        return events
+
+    def _parse(self, data: bytes) -> list[Event]:
+        events = []
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            wd, mask, _cookie, length = _HEADER.unpack_from(data, offset)
+            offset += _HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                events.append(Event("", "", mask))
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                # The kernel dropped the watch (directory deleted or unmounted)
+                self._paths.pop(wd, None)
+                self._wds.pop(directory, None)
+            events.append(Event(directory, name, mask))
+        return events
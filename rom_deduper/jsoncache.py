@@ -0,0 +1,27 @@
+"""Versioned JSON cache files kept in the ROMs root (ranking decisions, file hashes).
+
+A cache file holds {"version": N, section: {...}}. A file that is missing, unreadable or
+written by another version loads as an empty section, so a stale cache only costs a
+recomputation.
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+
+def load_section(path: Path, version: int, section: str) -> dict[str, Any]:
+    """The section of a cache file; empty if missing, unreadable or from another version."""
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != version:
+        return {}
+    body = data.get(section)
+    return body if isinstance(body, dict) else {}
+
+
+def save_section(path: Path, version: int, section: str, body: dict[str, Any]) -> None:
+    """Write body as the file's only section, stamped with version."""
+    path.write_text(json.dumps({"version": version, section: body}, separators=(",", ":")))
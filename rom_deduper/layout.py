@@ -0,0 +1,49 @@
+"""Operation ordering for spinning disks: one directory at a time, by inode within it.
+
+On HDDs, stats and renames in name order jump around the inode table and between
+directories. Ordering by directory, then inode number, keeps the heads moving forward.
+Inode numbers come from directory listings (d_ino), so ordering costs one listing per
+directory and no per-file stat.
+"""
+
+import os
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def entry_inode(entry: "os.DirEntry[str]") -> int:
+    """Inode number of a directory entry (free on POSIX; may stat on Windows)."""
+    try:
+        return entry.inode()
+    except OSError:
+        return 0
+
+
+def inode_map(directory: str) -> dict[str, int]:
+    """name -> inode for one directory, from a single listing; empty if unreadable."""
+    try:
+        with os.scandir(directory) as it:
+            return {child.name: entry_inode(child) for child in it}
+    except OSError:
+        return {}
+
+
+def disk_order(items: Iterable[T], path_of: Callable[[T], str]) -> list[T]:
+    """items sorted by parent directory, then by inode within each directory.
+
+    Items whose file is missing sort last within their directory, in their original order.
+    """
+    by_dir: dict[str, list[tuple[int, str, T]]] = defaultdict(list)
+    for i, item in enumerate(items):
+        directory, name = os.path.split(path_of(item))
+        by_dir[directory].append((i, name, item))
+    ordered: list[T] = []
+    for directory in sorted(by_dir):
+        inodes = inode_map(directory)
+        members = by_dir[directory]
+        members.sort(key=lambda m: (m[1] not in inodes, inodes.get(m[1], 0), m[0]))
+        ordered.extend(item for _, _, item in members)
+    return ordered
@@ -0,0 +1,262 @@
+"""Staging manifest: one SQLite row per file moved to _duplicates_removed.
+
+Rows record where a file came from, its size, console and title, when it was staged and
+by which apply run, so restores and audits are indexed queries rather than full loads.
+A legacy .manifest.json (dest_rel -> orig_rel) is imported on first open.
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from rom_deduper.parser import _normalize_title, parse_filename
+
+MANIFEST_FILENAME = ".manifest.sqlite"
+LEGACY_MANIFEST_FILENAME = ".manifest.json"
+LEGACY_RUN_ID = "legacy"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS staged (
+    dest_rel TEXT PRIMARY KEY,
+    orig_rel TEXT NOT NULL,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    console TEXT NOT NULL DEFAULT '',
+    base_title TEXT NOT NULL DEFAULT '',
+    staged_at REAL NOT NULL,
+    run_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS staged_orig ON staged (orig_rel);
+CREATE INDEX IF NOT EXISTS staged_console_title ON staged (console, base_title);
+CREATE INDEX IF NOT EXISTS staged_title ON staged (base_title);
+CREATE INDEX IF NOT EXISTS staged_run ON staged (run_id);
+CREATE INDEX IF NOT EXISTS staged_at ON staged (staged_at);
+
+-- Running per-console totals, so status never scans the staged rows
+CREATE TABLE IF NOT EXISTS totals (
+    console TEXT PRIMARY KEY,
+    files INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS staged_insert AFTER INSERT ON staged BEGIN
+    INSERT INTO totals (console, files, bytes) VALUES (NEW.console, 1, NEW.bytes)
+    ON CONFLICT (console) DO UPDATE SET files = files + 1, bytes = bytes + excluded.bytes;
+END;
+CREATE TRIGGER IF NOT EXISTS staged_delete AFTER DELETE ON staged BEGIN
+    UPDATE totals SET files = files - 1, bytes = bytes - OLD.bytes WHERE console = OLD.console;
+    DELETE FROM totals WHERE console = OLD.console AND files = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS staged_update AFTER UPDATE OF bytes, console ON staged BEGIN
+    UPDATE totals SET files = files - 1, bytes = bytes - OLD.bytes WHERE console = OLD.console;
+    DELETE FROM totals WHERE console = OLD.console AND files = 0;
+    INSERT INTO totals (console, files, bytes) VALUES (NEW.console, 1, NEW.bytes)
+    ON CONFLICT (console) DO UPDATE SET files = files + 1, bytes = bytes + excluded.bytes;
+END;
+"""
+# Bumped when a schema change needs existing databases migrated (PRAGMA user_version)
+SCHEMA_VERSION = 1
+_COLUMNS = "dest_rel, orig_rel, bytes, console, base_title, staged_at, run_id"
+
+
+@dataclass(slots=True)
+class StagedFile:
+    """One manifest row. Paths are relative to the ROMs root, with forward slashes."""
+
+    dest_rel: str
+    orig_rel: str
+    bytes: int
+    console: str
+    base_title: str
+    staged_at: float  # Unix time
+    run_id: str
+
+
+def title_pattern(pattern: str) -> str:
+    """Normalize a title glob like the titles it matches ("The Legend*" -> "legend*, the")."""
+    return _normalize_title(pattern)
+
+
+def _where(
+    console: str | None,
+    title: str | None,
+    run_id: str | None,
+    staged_before: float | None = None,
+) -> tuple[str, list[str | float]]:
+    """SQL WHERE clause (may be empty) and parameters selecting rows by the given filters."""
+    clauses: list[str] = []
+    params: list[str | float] = []
+    if console is not None:
+        clauses.append("console = ?")
+        params.append(console)
+    if title is not None:
+        clauses.append("base_title GLOB ?")
+        params.append(title_pattern(title))
+    if run_id is not None:
+        clauses.append("run_id = ?")
+        params.append(run_id)
+    if staged_before is not None:
+        clauses.append("staged_at < ?")
+        params.append(staged_before)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def new_run_id() -> str:
+    """Sortable, human-readable id for one apply run."""
+    return f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(2)}"
+
+
+class Manifest:
+    """The staging manifest of one ROMs root. Use as a context manager; writes commit on exit."""
+
+    def __init__(self, staging_dir: Path) -> None:
+        self.staging_dir = Path(staging_dir)
+        self.path = self.staging_dir / MANIFEST_FILENAME
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(_SCHEMA)
+        self._migrate()
+        self._import_legacy()
+
+    @classmethod
+    def exists(cls, staging_dir: Path) -> bool:
+        """True if staging_dir holds a manifest (SQLite or legacy JSON)."""
+        staging_dir = Path(staging_dir)
+        return (staging_dir / MANIFEST_FILENAME).exists() or (
+            staging_dir / LEGACY_MANIFEST_FILENAME
+        ).exists()
+
+    def __enter__(self) -> "Manifest":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Commit and close. An empty manifest deletes its file, and the staging dir if bare."""
+        self._db.commit()
+        empty = len(self) == 0
+        self._db.close()
+        if empty:
+            self.path.unlink(missing_ok=True)
+            if not any(self.staging_dir.iterdir()):
+                self.staging_dir.rmdir()
+
+    def commit(self) -> None:
+        """Commit pending writes now (close also commits)."""
+        self._db.commit()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(files), 0) FROM totals").fetchone()[0]
+
+    def total_bytes(self) -> int:
+        """Bytes held in staging, per the manifest."""
+        return self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM totals").fetchone()[0]
+
+    def totals(self) -> list[tuple[str, int, int]]:
+        """(console, files, bytes) per console in staging, largest first."""
+        return self._db.execute(
+            "SELECT console, files, bytes FROM totals ORDER BY bytes DESC, console"
+        ).fetchall()
+
+    def staged_span(self) -> tuple[float, float] | None:
+        """Staging times of the oldest and newest staged files, or None when empty."""
+        oldest, newest = self._db.execute(
+            "SELECT MIN(staged_at), MAX(staged_at) FROM staged"
+        ).fetchone()
+        return None if oldest is None else (oldest, newest)
+
+    def add(self, rows: Iterable[StagedFile]) -> None:
+        """Record staged files; a row for an existing dest_rel replaces it."""
+        self._db.executemany(
+            f"INSERT INTO staged ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (dest_rel) DO UPDATE SET orig_rel = excluded.orig_rel, "
+            "bytes = excluded.bytes, console = excluded.console, "
+            "base_title = excluded.base_title, staged_at = excluded.staged_at, "
+            "run_id = excluded.run_id",
+            (
+                (r.dest_rel, r.orig_rel, r.bytes, r.console, r.base_title, r.staged_at, r.run_id)
+                for r in rows
+            ),
+        )
+
+    def remove(self, dest_rels: Iterable[str]) -> None:
+        """Forget staged files (restored or deleted)."""
+        self._db.executemany("DELETE FROM staged WHERE dest_rel = ?", ((d,) for d in dest_rels))
+
+    def count(
+        self,
+        *,
+        console: str | None = None,
+        title: str | None = None,
+        run_id: str | None = None,
+        staged_before: float | None = None,
+    ) -> int:
+        """Number of staged files matching the filters."""
+        where, params = _where(console, title, run_id, staged_before)
+        return self._db.execute(f"SELECT COUNT(*) FROM staged{where}", params).fetchone()[0]
+
+    def files(
+        self,
+        *,
+        console: str | None = None,
+        title: str | None = None,
+        run_id: str | None = None,
+        staged_before: float | None = None,
+    ) -> Iterator[StagedFile]:
+        """Staged files, oldest first. Filters are ANDed: console name, base-title glob
+        (matched against normalized titles, e.g. "final fantasy*"), apply run id and a
+        staged-at cutoff (Unix time)."""
+        where, params = _where(console, title, run_id, staged_before)
+        cursor = self._db.execute(
+            f"SELECT {_COLUMNS} FROM staged{where} ORDER BY staged_at, dest_rel", params
+        )
+        return (StagedFile(*row) for row in cursor)
+
+    def _migrate(self) -> None:
+        """Bring an older database up to SCHEMA_VERSION."""
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        with self._db:
+            # Databases from before the totals table: derive totals from the rows once
+            self._db.execute("DELETE FROM totals")
+            self._db.execute(
+                "INSERT INTO totals (console, files, bytes) "
+                "SELECT console, COUNT(*), SUM(bytes) FROM staged GROUP BY console"
+            )
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _import_legacy(self) -> None:
+        """Move rows from a legacy .manifest.json into the database, then delete the JSON."""
+        legacy = self.staging_dir / LEGACY_MANIFEST_FILENAME
+        if not legacy.exists():
+            return
+        data: dict[str, str] = json.loads(legacy.read_text())
+        roms_root = self.staging_dir.parent
+        staged_at = legacy.stat().st_mtime
+        rows = []
+        for dest_rel, orig_rel in data.items():
+            dest_rel = dest_rel.replace("\\", "/")
+            orig_rel = orig_rel.replace("\\", "/")
+            try:
+                size = os.stat(roms_root / dest_rel).st_size
+            except OSError:
+                size = 0
+            rows.append(
+                StagedFile(
+                    dest_rel=dest_rel,
+                    orig_rel=orig_rel,
+                    bytes=size,
+                    console=orig_rel.split("/", 1)[0],
+                    base_title=parse_filename(orig_rel.rsplit("/", 1)[-1]).base_title_normalized,
+                    staged_at=staged_at,
+                    run_id=LEGACY_RUN_ID,
+                )
+            )
+        with self._db:
+            self.add(rows)
+        legacy.unlink()
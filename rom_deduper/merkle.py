@@ -0,0 +1,209 @@
+"""Merkle content digests for game folders, with a per-file hash cache.
+
+A folder's digest hashes, in name order, each child's name and digest: a file's content
+hash or a subfolder's own Merkle digest. Two folders with the same digest hold the same
+files under the same relative names, whatever the folders themselves are called.
+"""
+
+import hashlib
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from rom_deduper.grouper import DiscSet, GameGroup
+from rom_deduper.hashing import DEFAULT_WORKERS, file_digest, hash_files
+from rom_deduper.jsoncache import load_section, save_section
+from rom_deduper.scanner import ROMEntry
+
+HASH_CACHE_FILENAME = ".rom-deduper-hashes.json"
+HASH_CACHE_VERSION = 1
+
+
+class HashCache:
+    """Per-file content hashes keyed by root-relative path, valid while size and mtime match."""
+
+    def __init__(self, path: Path, files: dict[str, list] | None = None) -> None:
+        self.path = Path(path)
+        self.files: dict[str, list] = files or {}  # rel -> [size, mtime_ns, sha1]
+        self.hashed = 0  # Files actually read this run
+
+    @classmethod
+    def load(cls, roms_root: Path) -> "HashCache":
+        """Load the cache for roms_root; empty if missing, unreadable or from another version."""
+        path = Path(roms_root) / HASH_CACHE_FILENAME
+        return cls(path, load_section(path, HASH_CACHE_VERSION, "files"))
+
+    def save(self) -> None:
+        """Write the cache."""
+        save_section(self.path, HASH_CACHE_VERSION, "files", self.files)
+
+    def cached(self, rel: str, st: os.stat_result) -> str | None:
+        """Cached hash of rel if its size and mtime still match."""
+        cached = self.files.get(rel)
+        if cached is not None and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        return None
+
+    def record(self, rel: str, st: os.stat_result, digest: str) -> None:
+        """Store a freshly read hash."""
+        self.hashed += 1
+        self.files[rel] = [st.st_size, st.st_mtime_ns, digest]
+
+    def digest(self, path: str, rel: str, st: os.stat_result) -> str:
+        """Content hash of path, re-read only if its size or mtime changed."""
+        digest = self.cached(rel, st)
+        if digest is None:
+            digest = file_digest(path)
+            self.record(rel, st, digest)
+        return digest
+
+
+def prefetch(files: list[tuple[HashCache, str, str]], *, workers: int = DEFAULT_WORKERS) -> None:
+    """Hash every (cache, path, rel) whose cached hash is stale in one hash_files pass.
+
+    Reads are spread over a process pool with per-device limits; later digest() calls for
+    these files are cache hits.
+    """
+    stale: dict[str, tuple[HashCache, str, os.stat_result]] = {}
+    for cache, path, rel in files:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if cache.cached(rel, st) is None:
+            stale[path] = (cache, rel, st)
+    for path, digest in hash_files(stale, workers=workers).items():
+        cache, rel, st = stale[path]
+        cache.record(rel, st, digest)
+
+
+def _folder_files(folder: str, roms_root: str) -> list[tuple[str, str]]:
+    """(path, root-relative path) of every file under folder, as folder_digest visits them."""
+    out = []
+    for parent, _, names in os.walk(folder):
+        for name in names:
+            path = os.path.join(parent, name)
+            out.append((path, os.path.relpath(path, roms_root).replace("\\", "/")))
+    return out
+
+
+@dataclass(slots=True)
+class FolderDigest:
+    """Merkle digest of a folder tree and the total bytes of the files in it."""
+
+    digest: str
+    size: int
+    files: int
+
+
+def folder_digest(folder: str, roms_root: str, cache: HashCache) -> FolderDigest:
+    """Merkle digest of folder. Unreadable children are left out."""
+    h = hashlib.sha1()
+    size = 0
+    files = 0
+    try:
+        with os.scandir(folder) as it:
+            children = sorted(it, key=lambda c: c.name)
+    except OSError:
+        children = []
+    for child in children:
+        try:
+            if child.is_dir(follow_symlinks=False):
+                sub = folder_digest(child.path, roms_root, cache)
+                h.update(f"d\0{child.name}\0{sub.digest}\n".encode())
+                size += sub.size
+                files += sub.files
+            elif child.is_file():
+                st = child.stat()
+                rel = os.path.relpath(child.path, roms_root).replace("\\", "/")
+                h.update(f"f\0{child.name}\0{cache.digest(child.path, rel, st)}\n".encode())
+                size += st.st_size
+                files += 1
+        except OSError:
+            continue
+    return FolderDigest(digest=h.hexdigest(), size=size, files=files)
+
+
+@dataclass(slots=True)
+class FolderMatch:
+    """Game folders in one console with identical contents."""
+
+    console: str
+    digest: str
+    folders: list[str]  # Folder names, in group order
+
+
+def _without(group: GameGroup, moved: set[int]) -> GameGroup:
+    """group minus the entries whose id() is in moved (and their discs in disc sets)."""
+    disc_sets = []
+    for disc_set in group.disc_sets:
+        kept = [(d, n) for d, n in zip(disc_set.discs, disc_set.numbers) if id(d) not in moved]
+        if kept:
+            disc_sets.append(DiscSet(disc_set.variant, [d for d, _ in kept], [n for _, n in kept]))
+    return GameGroup(
+        console=group.console,
+        base_title=group.base_title,
+        entries=[e for e in group.entries if id(e) not in moved],
+        disc_sets=disc_sets,
+    )
+
+
+def merge_identical_folders(
+    groups: list[GameGroup], roms_root: Path, cache: HashCache
+) -> tuple[list[GameGroup], list[FolderMatch]]:
+    """Digest every game folder and group identical folders found in different groups.
+
+    Stale file hashes are read up front in one prefetch pass. Folder entries get their
+    recursive size from the digest walk. Each set of identical folders that spans more
+    than one group is moved into a group of its own; the other entries of those groups
+    stay where they were. That group takes the title of a group it emptied, or else the
+    first folder's title with a digest suffix, so titles stay unique. Returns the groups
+    (sorted like group_entries output) and one FolderMatch per such set.
+    """
+    root = os.fspath(roms_root)
+    game_folders = [
+        os.path.join(entry.directory, entry.name)
+        for group in groups
+        for entry in group.entries
+        if entry.extension is None
+    ]
+    prefetch([(cache, *file) for f in game_folders for file in _folder_files(f, root)])
+    by_digest: dict[tuple[str, str], list[tuple[int, ROMEntry]]] = defaultdict(list)
+    for i, group in enumerate(groups):
+        for entry in group.entries:
+            if entry.extension is not None:
+                continue
+            d = folder_digest(os.path.join(entry.directory, entry.name), root, cache)
+            if not d.files:
+                continue
+            entry.size = d.size
+            by_digest[(group.console, d.digest)].append((i, entry))
+
+    moved: set[int] = set()
+    matched: list[tuple[str, str, list[tuple[int, ROMEntry]]]] = []
+    for (console, digest), folders in by_digest.items():
+        if len({i for i, _ in folders}) < 2:
+            continue  # Identical folders within one group are already ranked together
+        moved.update(id(entry) for _, entry in folders)
+        matched.append((console, digest, folders))
+    if not matched:
+        return groups, []
+
+    remaining = [
+        _without(g, moved) if any(id(e) in moved for e in g.entries) else g for g in groups
+    ]
+    merged = [g for g in remaining if g.entries]
+    matches: list[FolderMatch] = []
+    taken: set[int] = set()  # Emptied groups whose title is in use
+    for console, digest, folders in matched:
+        emptied = [i for i, _ in folders if not remaining[i].entries and i not in taken]
+        if emptied:
+            taken.add(emptied[0])
+            title = groups[emptied[0]].base_title
+        else:
+            title = f"{groups[folders[0][0]].base_title} [{digest[:8]}]"
+        merged.append(GameGroup(console=console, base_title=title, entries=[e for _, e in folders]))
+        matches.append(FolderMatch(console, digest, [entry.name for _, entry in folders]))
+    merged.sort(key=lambda g: (g.console, g.base_title))
+    return merged, matches
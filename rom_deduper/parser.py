@@ -1,6 +1,7 @@
 """Parse ROM filenames for title, region, and language."""
 
 import re
+from collections.abc import Sequence
 from dataclasses import dataclass
 
 
@@ -61,7 +62,9 @@ def _normalize_title(title: str) -> str:
 
 
 def parse_filename(
-    filename: str, *, extra_translation_patterns: list[str] | None = None
+    filename: str,
+    *,
+    extra_translation_patterns: Sequence[str | re.Pattern[str]] | None = None,
 ) -> ParseResult:
     """Parse a ROM filename and extract metadata."""
     # Remove extension
@@ -113,9 +116,9 @@ def parse_filename(
             stem = stem.strip(" -")
 
     # Check for translation: (En) with Japan, or explicit (Translation)/(T-*)
-    translation_patterns = list(TRANSLATION_PATTERNS)
+    translation_patterns: list[str | re.Pattern[str]] = list(TRANSLATION_PATTERNS)
     if extra_translation_patterns:
-        translation_patterns = translation_patterns + extra_translation_patterns
+        translation_patterns.extend(extra_translation_patterns)
     has_translation = False
     for pattern in translation_patterns:
         if re.search(pattern, stem):
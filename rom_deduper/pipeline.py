@@ -0,0 +1,398 @@
+"""Overlapped apply: scan, rank, verify and move stages joined by bounded queues.
+
+dry_run then apply_removal finishes each stage for the whole library before the next one
+starts. Here each console directory flows through the stages on its own, so one console's
+duplicates can be moved while the next is ranked and a third is scanned. When consoles sit
+on different devices (an SSD and a NAS mount), their I/O overlaps.
+
+Each stage is a set of asyncio workers that run blocking filesystem work on threads. The
+queues between stages hold at most queue_size consoles, so a fast scanner cannot run far
+ahead of a slow mover. Manifest writes and progress callbacks stay on the event loop
+thread.
+"""
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from rom_deduper.actions import (
+    STAGING_DIR,
+    DryRunGroup,
+    DryRunReport,
+    _dry_run_groups,
+    _removal_batches,
+    _stage_batch,
+    _staged_rows,
+    _trash_batch,
+)
+from rom_deduper.config import Config, load_config
+from rom_deduper.grouper import group_entries
+from rom_deduper.layout import disk_order
+from rom_deduper.policy import compile_policy
+from rom_deduper.progress import APPLY, RANK, SCAN, VERIFY, Progress
+from rom_deduper.ranker import rank_groups
+from rom_deduper.scanner import IgnoreGlobs, ROMEntry, _scan_console, console_dirs
+
+if TYPE_CHECKING:
+    from rom_deduper.fuzzy import FuzzyMerge
+    from rom_deduper.manifest import Manifest
+    from rom_deduper.merkle import FolderMatch, HashCache
+    from rom_deduper.verify import Dat, VerifyReport
+
+STAGES = (SCAN, RANK, VERIFY, APPLY)
+DEFAULT_STAGE_WORKERS = {SCAN: 4, RANK: 2, VERIFY: 2, APPLY: 2}
+QUEUE_SIZE = 4  # Consoles waiting between two stages
+
+T = TypeVar("T")
+_DONE: Any = None  # End-of-stream marker; one per downstream worker
+
+
+@dataclass(slots=True)
+class StageTiming:
+    """Consoles one stage handled and the seconds its workers spent on them."""
+
+    items: int = 0
+    busy: float = 0.0  # Summed over workers, so it can exceed wall time
+
+
+@dataclass(slots=True)
+class PipelineResult:
+    """Report, removal totals and per-stage timing of one pipelined apply."""
+
+    report: DryRunReport
+    removed: int = 0
+    bytes_freed: int = 0
+    verify: "VerifyReport | None" = None
+    stages: dict[str, StageTiming] = field(default_factory=dict)
+    seconds: float = 0.0  # Wall clock
+
+    @property
+    def overlap(self) -> float:
+        """Stage busy time over wall time: 1.0 is sequential, higher means stages overlapped."""
+        busy = sum(s.busy for s in self.stages.values())
+        return busy / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass(slots=True)
+class _Console:
+    """One console on its way through the stages: every directory aliased to it."""
+
+    console: str
+    paths: list[str]
+    entries: list[ROMEntry] = field(default_factory=list)
+    groups: list[DryRunGroup] = field(default_factory=list)
+
+
+def stage_workers(config: Config) -> dict[str, int]:
+    """Workers per stage: DEFAULT_STAGE_WORKERS overridden by config.pipeline_workers."""
+    workers = dict(DEFAULT_STAGE_WORKERS)
+    for stage, n in config.pipeline_workers.items():
+        if stage in workers:
+            workers[stage] = max(1, n)
+    return workers
+
+
+class _Pipeline:
+    """State shared by the stage workers of one run."""
+
+    def __init__(
+        self,
+        roms_root: Path,
+        config: Config,
+        executor: ThreadPoolExecutor,
+        *,
+        hard: bool,
+        skip_uncertain: bool,
+        fuzzy: float | None,
+        folder_hashes: "HashCache | None",
+        dat: "Dat | None",
+        run_id: str | None,
+        progress: Progress | None,
+    ) -> None:
+        self.roms_root = roms_root
+        self.config = config
+        self.executor = executor
+        self.hard = hard
+        self.skip_uncertain = skip_uncertain
+        self.fuzzy = fuzzy
+        self.folder_hashes = folder_hashes
+        self.dat = dat
+        self.run_id = run_id
+        self.progress = progress
+        self.ignore = IgnoreGlobs.compile(config.ignore_globs)
+        self.manifest: Manifest | None = None
+        self.consoles: list[_Console] = []
+        self.fuzzy_merges: list[FuzzyMerge] = []
+        self.folder_matches: list[FolderMatch] = []
+        self.verify_report: VerifyReport | None = None
+        self.removed = 0
+        self.bytes_freed = 0
+        self.timings = {stage: StageTiming() for stage in STAGES}
+        self.error: BaseException | None = None  # First failure; stops new work
+        self._hash_lock = threading.Lock()  # HashCache is not thread-safe
+
+    async def offload(self, stage: str, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn on a thread, charging its time to stage."""
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.timings[stage].busy += time.perf_counter() - start
+
+    def advance(self, stage: str, files: int, nbytes: int = 0, console: str | None = None) -> None:
+        if self.progress is not None:
+            self.progress.advance(stage, files=files, nbytes=nbytes, console=console)
+
+    # Blocking stage bodies, run on threads
+
+    def scan_console(self, item: _Console) -> None:
+        for path in item.paths:
+            _scan_console(
+                path, item.console, item.entries, None, self.ignore, self.config.hdd_order
+            )
+
+    def rank_console(self, item: _Console) -> tuple[list["FuzzyMerge"], list["FolderMatch"]]:
+        groups = group_entries(item.entries)
+        folder_matches: list[FolderMatch] = []
+        if self.folder_hashes is not None:
+            from rom_deduper.merkle import merge_identical_folders
+
+            with self._hash_lock:
+                groups, folder_matches = merge_identical_folders(
+                    groups, self.roms_root, self.folder_hashes
+                )
+        fuzzy_merges: list[FuzzyMerge] = []
+        if self.fuzzy is not None:
+            from rom_deduper.fuzzy import merge_fuzzy
+
+            groups, fuzzy_merges = merge_fuzzy(groups, threshold=self.fuzzy)
+        results = rank_groups(groups, config=self.config)
+        item.groups = _dry_run_groups(groups, results, [True] * len(groups))
+        return fuzzy_merges, folder_matches
+
+    def verify_console(self, item: _Console) -> "VerifyReport":
+        from rom_deduper.verify import verify_keepers
+
+        report = DryRunReport(groups=item.groups)
+        result = verify_keepers(report, dat=self.dat)
+        item.groups = report.groups
+        return result
+
+    # Async steps: each takes one console and returns it for the next stage, or None
+
+    async def scan(self, item: _Console) -> _Console | None:
+        await self.offload(SCAN, self.scan_console, item)
+        self.consoles.append(item)
+        self.advance(
+            SCAN, len(item.entries), sum(max(e.size, 0) for e in item.entries), item.console
+        )
+        return item if item.entries else None
+
+    async def rank(self, item: _Console) -> _Console | None:
+        fuzzy_merges, folder_matches = await self.offload(RANK, self.rank_console, item)
+        self.fuzzy_merges.extend(fuzzy_merges)
+        self.folder_matches.extend(folder_matches)
+        self.advance(RANK, len(item.entries), console=item.console)
+        return item if item.groups else None
+
+    async def verify_keepers(self, item: _Console) -> _Console | None:
+        from rom_deduper.verify import VerifyReport, WorkerStats
+
+        result = await self.offload(VERIFY, self.verify_console, item)
+        if self.verify_report is None:
+            self.verify_report = VerifyReport()
+        self.verify_report.checks.extend(result.checks)
+        # Each console's check runs its own pool, so worker names repeat across consoles
+        by_name = {w.worker: w for w in self.verify_report.workers}
+        for w in result.workers:
+            total = by_name.setdefault(w.worker, WorkerStats(w.worker))
+            total.files += w.files
+            total.bytes += w.bytes
+            total.seconds += w.seconds
+        self.verify_report.workers = sorted(by_name.values(), key=lambda w: w.worker)
+        self.advance(VERIFY, len(result.checks), console=item.console)
+        return item if item.groups else None
+
+    async def apply(self, item: _Console) -> _Console | None:
+        groups = [g for g in item.groups if not (self.skip_uncertain and g.uncertain)]
+        work = [(g, batch) for g in groups for batch in _removal_batches(g)]
+        if self.config.hdd_order:
+            work = disk_order(work, lambda w: str(w[1][0].path))
+        for g, batch in work:
+            if self.error is not None:
+                return None
+            if self.hard:
+                count, size = await self.offload(APPLY, _trash_batch, batch)
+            else:
+                assert self.manifest is not None and self.run_id is not None
+                moved = await self.offload(APPLY, _stage_batch, self.roms_root, batch)
+                self.manifest.add(_staged_rows(self.roms_root, g, moved, self.run_id))
+                count, size = len(moved), sum(s for _, _, s in moved)
+            self.removed += count
+            self.bytes_freed += size
+            self.advance(APPLY, len(batch), size, g.console)
+        return None
+
+    async def feed(self, first: "asyncio.Queue[_Console]", workers: int) -> None:
+        """Queue every console for the first stage, then end the stream. Directories
+        aliased to one console travel together, so their entries are grouped as one."""
+        try:
+            paths: dict[str, list[str]] = {}
+            for path, console in await self.offload(
+                SCAN, console_dirs, self.roms_root, self.config
+            ):
+                paths.setdefault(console, []).append(path)
+            for console, console_paths in paths.items():
+                await first.put(_Console(console=console, paths=console_paths))
+        finally:
+            for _ in range(workers):
+                await first.put(_DONE)
+
+    async def run_stage(
+        self,
+        stage: str,
+        step: Callable[[_Console], Awaitable[_Console | None]],
+        inbox: "asyncio.Queue[_Console]",
+        outbox: "asyncio.Queue[_Console] | None",
+        workers: int,
+        downstream: int,
+    ) -> None:
+        """Pass inbox items through step on workers, forwarding results, then end outbox.
+
+        After any stage fails, items are drained without being processed so every stage
+        still reaches its end marker and the run winds down."""
+
+        async def worker() -> None:
+            while (item := await inbox.get()) is not _DONE:
+                if self.error is not None:
+                    continue
+                try:
+                    result = await step(item)
+                except Exception as e:
+                    self.error = self.error or e
+                    continue
+                self.timings[stage].items += 1
+                if outbox is not None and result is not None:
+                    await outbox.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        if self.progress is not None:
+            self.progress.finish(stage)
+        if outbox is not None:
+            for _ in range(downstream):
+                await outbox.put(_DONE)
+
+    def report(self) -> DryRunReport:
+        groups = sorted(
+            (g for c in self.consoles for g in c.groups), key=lambda g: (g.console, g.base_title)
+        )
+        return DryRunReport(
+            groups=groups,
+            total_files=sum(len(c.entries) for c in self.consoles),
+            duplicate_groups=len(groups),
+            total_to_remove=sum(len(g.to_remove) for g in groups),
+            changed_groups=len(groups),
+            fuzzy_merges=self.fuzzy_merges,
+            folder_matches=self.folder_matches,
+        )
+
+
+async def apply_pipeline(
+    roms_root: Path,
+    config: Config | None = None,
+    *,
+    hard: bool = False,
+    skip_uncertain: bool = False,
+    fuzzy: float | None = None,
+    folder_hashes: "HashCache | None" = None,
+    verify: bool = False,
+    dat: "Dat | None" = None,
+    run_id: str | None = None,
+    workers: dict[str, int] | None = None,
+    queue_size: int = QUEUE_SIZE,
+    progress: Progress | None = None,
+) -> PipelineResult:
+    """Scan, rank, optionally verify keepers, and remove duplicates, one console at a time
+    per stage with the stages running concurrently.
+
+    Removes the same files as dry_run followed by (verify_keepers and) apply_removal.
+    workers maps stage name to worker count (default: stage_workers(config)); queue_size
+    bounds each queue between stages. If a stage fails, no new work is started, work in
+    flight finishes and is recorded in the manifest, and the first error is raised.
+    """
+    started = time.perf_counter()
+    roms_root = Path(roms_root)
+    if config is None:
+        config = load_config(roms_root)
+    compile_policy(config)  # Compile once here rather than racing in rank workers
+    workers = {**stage_workers(config), **(workers or {})}
+    verify = verify or dat is not None
+    if not hard:
+        from rom_deduper.manifest import new_run_id
+
+        run_id = run_id or new_run_id()
+    stages = [SCAN, RANK, VERIFY, APPLY] if verify else [SCAN, RANK, APPLY]
+    counts = [max(1, workers[stage]) for stage in stages]
+    queues: list[asyncio.Queue[_Console]] = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+    with ThreadPoolExecutor(max_workers=sum(counts), thread_name_prefix="pipeline") as executor:
+        run = _Pipeline(
+            roms_root,
+            config,
+            executor,
+            hard=hard,
+            skip_uncertain=skip_uncertain,
+            fuzzy=fuzzy,
+            folder_hashes=folder_hashes,
+            dat=dat,
+            run_id=run_id,
+            progress=progress,
+        )
+        if progress is not None:
+            for stage in stages:
+                progress.start(stage)
+        steps = {SCAN: run.scan, RANK: run.rank, VERIFY: run.verify_keepers, APPLY: run.apply}
+        if hard:
+            manifest_context: Any = nullcontext()
+        else:
+            from rom_deduper.manifest import Manifest
+
+            manifest_context = Manifest(roms_root / STAGING_DIR)
+        # Closing the manifest commits whatever was staged, even if a later move failed
+        with manifest_context as manifest:
+            run.manifest = manifest
+            await asyncio.gather(
+                run.feed(queues[0], counts[0]),
+                *(
+                    run.run_stage(
+                        stage,
+                        steps[stage],
+                        queues[i],
+                        queues[i + 1] if i + 1 < len(stages) else None,
+                        counts[i],
+                        counts[i + 1] if i + 1 < len(stages) else 0,
+                    )
+                    for i, stage in enumerate(stages)
+                ),
+            )
+    if run.error is not None:
+        raise run.error
+
+    return PipelineResult(
+        report=run.report(),
+        removed=run.removed,
+        bytes_freed=run.bytes_freed,
+        verify=run.verify_report,
+        stages={stage: run.timings[stage] for stage in stages},
+        seconds=time.perf_counter() - started,
+    )
+
+
+def run_pipeline(roms_root: Path, config: Config | None = None, **kwargs: Any) -> PipelineResult:
+    """Synchronous apply_pipeline for callers outside an event loop."""
+    return asyncio.run(apply_pipeline(roms_root, config, **kwargs))
@@ -0,0 +1,178 @@
+"""Scoring policy: ranking rules compiled once per Config into lookup tables."""
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from rom_deduper.parser import ParseResult, parse_filename
+
+if TYPE_CHECKING:
+    from rom_deduper.config import Config
+    from rom_deduper.scanner import ROMEntry
+
+# Region priority: higher = better. USA/U highest.
+REGION_SCORE = {
+    "USA": 100,
+    "U": 100,
+    "World": 90,
+    "USA, Europe": 85,
+    "Japan, USA": 85,
+    "Europe": 70,
+    "E": 70,
+    "Australia": 65,
+    "Brazil": 60,
+    "Asia": 50,
+    "Japan": 40,
+    "J": 40,
+    "China": 30,
+    "Korea": 30,
+    "Hong Kong": 25,
+}
+
+# Format preference: .chd > .bin/.cue, .md > .bin
+PREFERRED_EXTENSIONS = {".chd", ".md", ".zip", ".sfc", ".nes", ".gb", ".gba"}
+SECONDARY_EXTENSIONS = {".cue"}  # .cue preferred over .bin when paired
+
+DEFAULT_FORMAT_SCORE = {
+    **{ext: 100 for ext in PREFERRED_EXTENSIONS},
+    **{ext: 80 for ext in SECONDARY_EXTENSIONS},
+    ".bin": 50,
+}
+UNLISTED_FORMAT_SCORE = 70
+
+# Quality: ! = 100, b = 0, else 50
+QUALITY_SCORE = {"!": 100, "b": 0}
+DEFAULT_QUALITY_SCORE = 50
+
+# Region bonuses: Japan with a translation, Europe with English
+_JAPAN = frozenset({"J", "Japan"})
+_EUROPE = frozenset({"Europe", "E"})
+TRANSLATION_BONUS = 30
+EUROPE_ENGLISH_BONUS = 10
+
+
+def _region_score_from_priority(priority: list[str]) -> dict[str, int]:
+    """Build region score map from ordered list. First=highest."""
+    if not priority:
+        return {}
+    return {r: 100 - i * 10 for i, r in enumerate(priority)}
+
+
+def _format_score_from_preference(preference: list[str]) -> dict[str, int]:
+    """Build format score map from ordered extension list. First=highest, unlisted=0."""
+    exts = [e.lower() if e.startswith(".") else f".{e.lower()}" for e in preference]
+    return {ext: len(exts) - i for i, ext in enumerate(exts)}
+
+
+@dataclass(slots=True)
+class ScoringPolicy:
+    """Compiled ranking rules. Build with compile_policy; score with key."""
+
+    region_scores: dict[str, int]
+    format_scores: dict[str, int]
+    unlisted_format_score: int
+    translation_patterns: list[re.Pattern[str]]
+    overrides: dict[str, "ScoringPolicy"] = field(default_factory=dict)
+    digest: str = ""  # Hash of the settings this policy was compiled from
+
+    def for_console(self, console: str) -> "ScoringPolicy":
+        """Policy for one console: its override if configured, else this policy."""
+        return self.overrides.get(console.lower(), self)
+
+    def parse(self, name: str) -> ParseResult:
+        """Parse a filename with this policy's translation patterns."""
+        return parse_filename(name, extra_translation_patterns=self.translation_patterns)
+
+    def key(self, entry: "ROMEntry", parsed: ParseResult) -> tuple[int, int, int, int, int]:
+        """Score entry for ranking. Higher is better.
+        Returns (region, format, quality, version, size)."""
+        region = parsed.region
+        region_score = self.region_scores.get(region or "", 0)
+        if region in _JAPAN and parsed.has_translation:
+            region_score += TRANSLATION_BONUS
+        elif region in _EUROPE and parsed.languages and "En" in parsed.languages:
+            region_score += EUROPE_ENGLISH_BONUS
+
+        format_score = self.format_scores.get(
+            (entry.extension or "").lower(), self.unlisted_format_score
+        )
+        quality_score = QUALITY_SCORE.get(parsed.quality or "", DEFAULT_QUALITY_SCORE)
+
+        # Version: prefer newer
+        version_score = 0
+        if parsed.version:
+            try:
+                version_score = int(parsed.version.split(".")[0])
+            except ValueError:
+                version_score = 0
+
+        # File size: recorded at scan time, or stat'd for hand-built entries
+        size = entry.size
+        if size < 0:
+            try:
+                size = os.stat(os.path.join(entry.directory, entry.name)).st_size
+            except OSError:
+                size = 0
+
+        return (region_score, format_score, quality_score, version_score, size)
+
+
+def _build(
+    region_priority: list[str] | None,
+    format_preference: list[str] | None,
+    translation_patterns: list[str],
+) -> ScoringPolicy:
+    """Compile one policy from raw settings."""
+    region_scores = dict(REGION_SCORE)
+    if region_priority:
+        region_scores.update(_region_score_from_priority(region_priority))
+    if format_preference:
+        format_scores = _format_score_from_preference(format_preference)
+        unlisted = 0
+    else:
+        format_scores = dict(DEFAULT_FORMAT_SCORE)
+        unlisted = UNLISTED_FORMAT_SCORE
+    return ScoringPolicy(
+        region_scores=region_scores,
+        format_scores=format_scores,
+        unlisted_format_score=unlisted,
+        translation_patterns=[re.compile(p) for p in translation_patterns],
+    )
+
+
+def _digest(*settings: object) -> str:
+    """Stable hash of ranking settings, for cache invalidation."""
+    blob = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+_DEFAULT_POLICY = _build(None, None, [])
+_DEFAULT_POLICY.digest = _digest(None, None, [], {})
+
+
+def compile_policy(config: "Config | None") -> ScoringPolicy:
+    """Compile the scoring policy for config. The result is cached on config and reused
+    while the ranking settings hash the same, so later edits to them take effect."""
+    if config is None:
+        return _DEFAULT_POLICY
+    digest = _digest(
+        config.region_priority,
+        config.format_preference,
+        config.translation_patterns,
+        config.console_overrides,
+    )
+    if config._policy is not None and config._policy.digest == digest:
+        return config._policy
+    policy = _build(config.region_priority, config.format_preference, config.translation_patterns)
+    for console, override in config.console_overrides.items():
+        policy.overrides[console.lower()] = _build(
+            override.get("region_priority", config.region_priority),
+            override.get("format_preference", config.format_preference),
+            config.translation_patterns + list(override.get("translation_patterns", [])),
+        )
+    policy.digest = digest
+    config._policy = policy
+    return policy
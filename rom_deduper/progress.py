@@ -0,0 +1,152 @@
+"""Per-stage progress callbacks for scan, rank, verify, apply, restore and purge."""
+
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+SCAN = "scan"
+RANK = "rank"
+VERIFY = "verify"
+APPLY = "apply"
+RESTORE = "restore"
+PURGE = "purge"
+
+
+@dataclass
+class StageStats:
+    """Running totals for one stage."""
+
+    stage: str
+    total: int | None = None
+    files: int = 0
+    bytes: int = 0
+    console: str | None = None
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the stage started (frozen once finished)."""
+        end = self.finished if self.finished is not None else time.monotonic()
+        return max(end - self.started, 1e-9)
+
+    @property
+    def files_per_sec(self) -> float:
+        """Files processed per second."""
+        return self.files / self.elapsed
+
+    @property
+    def bytes_per_sec(self) -> float:
+        """Bytes processed per second."""
+        return self.bytes / self.elapsed
+
+    @property
+    def eta(self) -> float | None:
+        """Estimated seconds remaining, or None when the total is unknown."""
+        if self.total is None or self.files == 0:
+            return None
+        return max(self.total - self.files, 0) / self.files_per_sec
+
+
+class Progress:
+    """Progress callback. Pipeline functions call start/advance/finish per stage.
+
+    The base class keeps StageStats per stage and does nothing else; frontends subclass
+    it and override on_start/on_update/on_finish.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageStats] = {}
+
+    def start(self, stage: str, total: int | None = None) -> None:
+        """Begin a stage. total is the expected file count, if known."""
+        stats = StageStats(stage=stage, total=total)
+        self.stages[stage] = stats
+        self.on_start(stats)
+
+    def advance(
+        self, stage: str, *, files: int = 1, nbytes: int = 0, console: str | None = None
+    ) -> None:
+        """Record files (and bytes) processed; console is the one currently being worked on."""
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats(stage=stage)
+        stats.files += files
+        stats.bytes += nbytes
+        if console is not None:
+            stats.console = console
+        self.on_update(stats)
+
+    def finish(self, stage: str) -> None:
+        """End a stage, freezing its elapsed time."""
+        stats = self.stages.get(stage)
+        if stats is None:
+            return
+        stats.finished = time.monotonic()
+        self.on_finish(stats)
+
+    def on_start(self, stats: StageStats) -> None:
+        """Hook: a stage started."""
+
+    def on_update(self, stats: StageStats) -> None:
+        """Hook: a stage advanced."""
+
+    def on_finish(self, stats: StageStats) -> None:
+        """Hook: a stage finished."""
+
+
+class RichProgress(Progress):
+    """Rich progress bars: one task per stage with files/sec, bytes/sec, console and ETA.
+
+    Use as a context manager; rich is imported only when this class is instantiated.
+    """
+
+    def __init__(self, console: "Console | None" = None, *, transient: bool = True) -> None:
+        super().__init__()
+        from rich.progress import BarColumn, MofNCompleteColumn, TextColumn, TimeRemainingColumn
+        from rich.progress import Progress as _RichProgress
+
+        self._bars = _RichProgress(
+            TextColumn("[bold blue]{task.description}"),
+            TextColumn("[cyan]{task.fields[console]}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TextColumn("{task.fields[rate]}"),
+            TimeRemainingColumn(),
+            console=console,
+            transient=transient,
+        )
+        self._tasks: dict[str, Any] = {}
+
+    def __enter__(self) -> "RichProgress":
+        """Start rendering."""
+        self._bars.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        """Stop rendering."""
+        self._bars.stop()
+
+    def on_start(self, stats: StageStats) -> None:
+        self._tasks[stats.stage] = self._bars.add_task(
+            stats.stage.capitalize(), total=stats.total, console="", rate=""
+        )
+
+    def on_update(self, stats: StageStats) -> None:
+        task = self._tasks.get(stats.stage)
+        if task is None:
+            return
+        from rom_deduper.actions import _format_bytes
+
+        rate = f"{stats.files_per_sec:,.0f} files/s"
+        if stats.bytes:
+            rate += f" {_format_bytes(int(stats.bytes_per_sec))}/s"
+        self._bars.update(task, completed=stats.files, console=stats.console or "", rate=rate)
+
+    def on_finish(self, stats: StageStats) -> None:
+        task = self._tasks.get(stats.stage)
+        if task is not None:
+            self._bars.update(task, total=stats.files, completed=stats.files)
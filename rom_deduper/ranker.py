@@ -1,40 +1,24 @@
 """Apply region/language priority rules to select keepers."""
 
+import functools
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
-
-from rom_deduper.grouper import GameGroup
-from rom_deduper.parser import parse_filename
+from typing import TYPE_CHECKING, Any
+
+from rom_deduper.grouper import DiscSet, GameGroup
+from rom_deduper.policy import PREFERRED_EXTENSIONS as PREFERRED_EXTENSIONS
+from rom_deduper.policy import REGION_SCORE as REGION_SCORE
+from rom_deduper.policy import SECONDARY_EXTENSIONS as SECONDARY_EXTENSIONS
+from rom_deduper.policy import ScoringPolicy, compile_policy
+from rom_deduper.progress import RANK, Progress
 from rom_deduper.scanner import ROMEntry
 
 if TYPE_CHECKING:
     from rom_deduper.config import Config
 
-# Region priority: higher = better. USA/U highest.
-REGION_SCORE = {
-    "USA": 100,
-    "U": 100,
-    "World": 90,
-    "USA, Europe": 85,
-    "Japan, USA": 85,
-    "Europe": 70,
-    "E": 70,
-    "Australia": 65,
-    "Brazil": 60,
-    "Asia": 50,
-    "Japan": 40,
-    "J": 40,
-    "China": 30,
-    "Korea": 30,
-    "Hong Kong": 25,
-}
-
-# Format preference: .chd > .bin/.cue, .md > .bin
-PREFERRED_EXTENSIONS = {".chd", ".md", ".zip", ".sfc", ".nes", ".gb", ".gba"}
-SECONDARY_EXTENSIONS = {".cue"}  # .cue preferred over .bin when paired
-
-
-@dataclass
+
+@dataclass(slots=True)
 class RankResult:
     """Result of ranking a game group."""
 
@@ -43,116 +27,156 @@ class RankResult:
     uncertain: bool = False
 
 
-def _score_entry(
-    entry: ROMEntry,
-    *,
-    region_score_map: dict[str, int] | None = None,
-    translation_patterns: list[str] | None = None,
-) -> tuple[int, int, int, int, int]:
-    """Score entry for ranking. Higher is better.
-    Returns (region, format, quality, version, size)."""
-    parsed = parse_filename(entry.path.name, extra_translation_patterns=translation_patterns)
-    score_map = region_score_map or REGION_SCORE
-    region_score = score_map.get(parsed.region or "", 0)
-
-    # Translation bonus for Japan
-    if parsed.region in ("J", "Japan") and parsed.has_translation:
-        region_score += 30
-
-    # Europe with En
-    if parsed.region in ("Europe", "E") and parsed.languages and "En" in parsed.languages:
-        region_score += 10
-
-    # Format score
-    ext = (entry.extension or "").lower()
-    if ext in PREFERRED_EXTENSIONS:
-        format_score = 100
-    elif ext in SECONDARY_EXTENSIONS:
-        format_score = 80
-    elif ext == ".bin":
-        format_score = 50
-    else:
-        format_score = 70
-
-    # Quality: ! = 100, b = 0, else 50
-    quality_score = 50
-    if parsed.quality == "!":
-        quality_score = 100
-    elif parsed.quality == "b":
-        quality_score = 0
-
-    # Version: prefer newer
-    version_score = 0
-    if parsed.version:
-        try:
-            version_score = int(parsed.version.split(".")[0])
-        except (ValueError, AttributeError):
-            version_score = 0
-
-    # File size (use 0 as placeholder, we'll use actual size)
+@functools.cache
+def _numpy() -> Any:
+    """Return numpy if installed, else None. Imported on first use to keep startup fast."""
     try:
-        size = entry.path.stat().st_size
-    except OSError:
-        size = 0
-
-    return (region_score, format_score, quality_score, version_score, size)
-
-
-def _region_score_from_priority(priority: list[str]) -> dict[str, int]:
-    """Build region score map from ordered list. First=highest."""
-    if not priority:
-        return {}
-    return {r: 100 - i * 10 for i, r in enumerate(priority)}
-
-
-def _set_key(entry: ROMEntry, score: tuple[int, int, int, int, int]) -> tuple:
-    """Key for multi-disc siblings: (region, format, quality, version). Disc number excluded."""
-    return (score[0], score[1], score[2], score[3])
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# Feature columns, in lexicographic priority order. Higher is better in each.
+# Rows are ranking units: a whole multi-disc set, or a single entry. "complete" is 0 for a
+# set with a gap below its highest disc, or a lone Disc 1, so a full set beats a partial one.
+_FEATURES = ("complete", "region", "format", "quality", "version", "size")
+
+
+@dataclass(slots=True)
+class _FeatureTable:
+    """Columnar features for every unit of every multi-entry group, in group order."""
+
+    columns: list[array]
+    heads: array  # index in group.entries of the unit's entry (first disc for a set)
+    m3u: array  # 1 for .m3u playlists
+    sets: dict[int, DiscSet]  # row -> disc set, for set units
+    bounds: list[tuple[int, int]]  # [start, end) rows per group; empty for single-entry groups
+
+    def key(self, row: int) -> tuple[int, ...]:
+        """Full ranking key of one row."""
+        return tuple(col[row] for col in self.columns)
+
+    def members(self, group: GameGroup, row: int) -> list[ROMEntry]:
+        """Entries of one unit: every disc of a set, else the single entry."""
+        disc_set = self.sets.get(row)
+        return list(disc_set.discs) if disc_set is not None else [group.entries[self.heads[row]]]
+
+
+def _build_features(
+    groups: list[GameGroup],
+    policy: ScoringPolicy,
+    progress: Progress | None,
+) -> _FeatureTable:
+    """One pass over all entries: parse once, score once, append one row per unit."""
+    table = _FeatureTable(
+        columns=[array("q") for _ in _FEATURES],
+        heads=array("q"),
+        m3u=array("b"),
+        sets={},
+        bounds=[],
+    )
+    for group in groups:
+        start = len(table.heads)
+        if len(group.entries) > 1:
+            console_policy = policy.for_console(group.console)
+            keys = {
+                id(e): console_policy.key(e, console_policy.parse(e.name)) for e in group.entries
+            }
+            in_set = {id(d) for s in group.disc_sets for d in s.discs}
+            index = {id(e): i for i, e in enumerate(group.entries)}
+            for disc_set in group.disc_sets:
+                # Discs share their variant, so the first disc scores the release
+                head = disc_set.discs[0]
+                score = keys[id(head)][:-1]
+                size = sum(keys[id(d)][-1] for d in disc_set.discs)
+                complete = disc_set.complete
+                table.sets[len(table.heads)] = disc_set
+                for col, value in zip(table.columns, (complete, *score, size)):
+                    col.append(value)
+                table.heads.append(index[id(head)])
+                table.m3u.append(False)
+            for i, entry in enumerate(group.entries):
+                if id(entry) in in_set:
+                    continue
+                for col, value in zip(table.columns, (1, *keys[id(entry)])):
+                    col.append(value)
+                table.heads.append(i)
+                table.m3u.append((entry.extension or "").lower() == ".m3u")
+        table.bounds.append((start, len(table.heads)))
+        if progress is not None:
+            progress.advance(RANK, files=len(group.entries), console=group.console)
+    return table
+
+
+def _grouped_order(table: _FeatureTable) -> list[Sequence[int]]:
+    """Rows of each group sorted best-first; ties keep scan order.
+
+    With numpy this is a single lexsort over all groups (group id as the primary key);
+    otherwise a per-group sort over the same columns.
+    """
+    np = _numpy()
+    if np is None or not table.heads:
+        return [
+            sorted(range(start, end), key=table.key, reverse=True) for start, end in table.bounds
+        ]
+    n = len(table.heads)
+    lengths = np.array([end - start for start, end in table.bounds], dtype=np.int64)
+    group_ids = np.repeat(np.arange(len(table.bounds)), lengths)
+    keys = [-np.frombuffer(col, dtype=np.int64) for col in reversed(table.columns)]
+    order = np.lexsort((np.arange(n), *keys, group_ids)).tolist()
+    # Groups occupy contiguous row ranges, so each group's sorted rows sit at the same range
+    return [order[start:end] for start, end in table.bounds]
+
+
+def rank_groups(
+    groups: list[GameGroup],
+    config: "Config | None" = None,
+    *,
+    policy: ScoringPolicy | None = None,
+    progress: Progress | None = None,
+) -> list[RankResult]:
+    """Rank every group in one batch. Returns one RankResult per group, in order.
+
+    Features for all entries are extracted into columns in a single pass, then keeper
+    selection and tie detection run over all groups at once. The scoring policy is
+    compiled from config unless given.
+    """
+    if policy is None:
+        policy = compile_policy(config)
+    if progress is not None:
+        progress.start(RANK, total=sum(len(g.entries) for g in groups))
+    table = _build_features(groups, policy, progress)
+    orders = _grouped_order(table)
+
+    results = []
+    for group, ranked in zip(groups, orders):
+        if not ranked:
+            results.append(RankResult(keeper=group.entries[0], to_remove=[]))
+            continue
+        keeper_row = ranked[0]
+
+        # Never treat .m3u as a duplicate — they're playlists that reference ROMs.
+        # A multi-disc set is one unit: its discs are kept or removed together.
+        to_remove = []
+        for row in ranked[1:]:
+            if not table.m3u[row]:
+                to_remove.extend(table.members(group, row))
+
+        # Check for tie (same score)
+        uncertain = len(ranked) > 1 and table.key(ranked[1]) == table.key(keeper_row)
+        results.append(
+            RankResult(
+                keeper=group.entries[table.heads[keeper_row]],
+                to_remove=to_remove,
+                uncertain=uncertain,
+            )
+        )
+    if progress is not None:
+        progress.finish(RANK)
+    return results
 
 
 def rank_group(group: GameGroup, config: "Config | None" = None) -> RankResult:
     """Rank entries in a group and select keeper. Returns keeper and to_remove list."""
-    if len(group.entries) == 1:
-        return RankResult(keeper=group.entries[0], to_remove=[])
-
-    region_map = dict(REGION_SCORE)
-    if config and config.region_priority:
-        region_map.update(_region_score_from_priority(config.region_priority))
-
-    translation_patterns = config.translation_patterns if config else None
-
-    scored = [
-        (
-            entry,
-            _score_entry(
-                entry,
-                region_score_map=region_map,
-                translation_patterns=translation_patterns,
-            ),
-        )
-        for entry in group.entries
-    ]
-    scored.sort(key=lambda x: x[1], reverse=True)
-
-    keeper = scored[0][0]
-    keeper_score = scored[0][1]
-    keeper_key = _set_key(keeper, keeper_score)
-
-    # Never treat .m3u as a duplicate — they're playlists that reference ROMs, not ROMs themselves
-    # Never remove sibling discs — Disc 1 and Disc 2 of same game/region are not duplicates
-    keeper_parsed = parse_filename(keeper.path.name)
-    to_remove = []
-    for e, s in scored[1:]:
-        if (e.extension or "").lower() == ".m3u":
-            continue
-        e_parsed = parse_filename(e.path.name)
-        # Same set (region/format/quality) and has disc_number = sibling disc, keep it
-        if keeper_parsed.disc_number is not None or e_parsed.disc_number is not None:
-            if _set_key(e, s) == keeper_key:
-                continue  # Sibling disc of keeper, never remove
-        to_remove.append(e)
-
-    # Check for tie (same score)
-    uncertain = len(scored) > 1 and scored[0][1] == scored[1][1]
-
-    return RankResult(keeper=keeper, to_remove=to_remove, uncertain=uncertain)
+    return rank_groups([group], config=config)[0]
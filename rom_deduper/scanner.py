@@ -1,9 +1,17 @@
 """Scan ROM directories for files and folders."""
 
+import fnmatch
+import os
+import re
+import sys
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+from rom_deduper.layout import entry_inode
+from rom_deduper.progress import SCAN, Progress
+
 if TYPE_CHECKING:
     from rom_deduper.config import Config
 
@@ -20,62 +28,314 @@ ROM_EXTENSIONS = {
     ".gba",
 }
 
+# Canonical (interned) extension strings, so entries share one object per extension
+_EXTENSIONS = {ext: sys.intern(ext) for ext in ROM_EXTENSIONS}
+
 EXCLUDED_CONSOLES = {"daphne", "singe", "hypseus", "ports"}
 EXCLUDED_PREFIXES = (".", "_")  # Skip .venv, .git, _duplicates_removed, etc.
 
 
-@dataclass
+@dataclass(slots=True, init=False)
 class ROMEntry:
-    """A ROM file or folder entry."""
+    """A ROM file or folder entry.
+
+    Slotted, with interned directory and console strings shared by every entry in the
+    same folder. The full Path is built on access instead of stored per entry.
+    """
 
-    path: Path
+    directory: str
+    name: str
     console: str
-    extension: str | None = None  # None for folders
+    extension: str | None  # None for folders
+    size: int  # bytes at scan time; -1 when not recorded
+    mtime_ns: int  # modification time at scan time; -1 when not recorded
+
+    def __init__(
+        self,
+        path: Path | str,
+        console: str,
+        extension: str | None = None,
+        size: int = -1,
+        mtime_ns: int = -1,
+    ) -> None:
+        directory, name = os.path.split(os.fspath(path))
+        self.directory = sys.intern(directory)
+        self.name = name
+        self.console = sys.intern(console)
+        self.extension = sys.intern(extension) if extension else extension
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @classmethod
+    def from_parts(
+        cls,
+        directory: str,
+        name: str,
+        console: str,
+        extension: str | None = None,
+        size: int = -1,
+        mtime_ns: int = -1,
+    ) -> "ROMEntry":
+        """Build from already-interned directory and console strings (scanner fast path)."""
+        entry = cls.__new__(cls)
+        entry.directory = directory
+        entry.name = name
+        entry.console = console
+        entry.extension = extension
+        entry.size = size
+        entry.mtime_ns = mtime_ns
+        return entry
+
+    @property
+    def path(self) -> Path:
+        """Full path to the file or folder."""
+        return Path(self.directory, self.name)
+
+
+@dataclass(slots=True)
+class IgnoreGlobs:
+    """Ignore globs compiled into one regex for bare names and one for relative paths.
+
+    A glob without "/" matches a file or directory name at any depth ("media", "*.txt");
+    a glob with "/" matches the path relative to the console directory ("*/manuals").
+    Matching is case-insensitive.
+    """
+
+    names: re.Pattern[str] | None
+    paths: re.Pattern[str] | None
+
+    @classmethod
+    def compile(cls, globs: Sequence[str]) -> "IgnoreGlobs | None":
+        """Compile globs; None when there are none."""
+        name_globs = [g.strip("/").lower() for g in globs if "/" not in g.strip("/")]
+        path_globs = [g.strip("/").lower() for g in globs if "/" in g.strip("/")]
+        if not name_globs and not path_globs:
+            return None
+        return cls(names=_union(name_globs), paths=_union(path_globs))
 
+    def matches(self, rel: str, name: str) -> bool:
+        """True if the entry at rel (relative to the console directory) is ignored."""
+        if self.names is not None and self.names.match(name.lower()):
+            return True
+        return self.paths is not None and bool(self.paths.match(rel.replace(os.sep, "/").lower()))
 
-def scan(roms_root: Path, config: "Config | None" = None) -> list[ROMEntry]:
-    """Scan ROMs directory for ROM files, excluding daphne/singe/hypseus or config."""
+
+def _union(globs: list[str]) -> re.Pattern[str] | None:
+    """One regex matching any of globs."""
+    if not globs:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(g)})" for g in globs))
+
+
+def _stat(f: "os.DirEntry[str]") -> tuple[int, int]:
+    """(size, mtime_ns) of a directory entry; zeros if it vanished mid-scan."""
+    try:
+        st = f.stat()
+    except OSError:
+        return (0, 0)
+    return (st.st_size, st.st_mtime_ns)
+
+
+def scan_directory(
+    directory: str,
+    console_dir: str,
+    console: str,
+    ignore: IgnoreGlobs | None = None,
+    by_inode: bool = False,
+    nested: bool = False,
+) -> tuple[list[ROMEntry], list[str], int, int, int]:
+    """List one directory of a console tree, without descending.
+
+    Returns (entries, subdirectories, files listed, bytes, newest mtime). In the console
+    directory itself each ROM file is an entry. A subdirectory that directly contains ROM
+    files is a game folder: it yields a single entry with extension None. Files and
+    subdirectories matching ignore are left out.
+
+    In a game folder, or a directory below one (nested), every file is statted: bytes is
+    their total and newest mtime the latest of theirs and the directory's own, which the
+    caller rolls up into the folder entry (see folder_totals). Elsewhere only ROM files
+    are statted and newest mtime is 0.
+
+    by_inode stats files in inode order and returns subdirectories in inode order (for
+    spinning disks); entries are the same either way.
+    """
+    files: list[os.DirEntry[str]] = []
+    subdirs: list[os.DirEntry[str]] = []
     entries: list[ROMEntry] = []
-    roms_root = Path(roms_root)
-    excluded = config.exclude_consoles if config else EXCLUDED_CONSOLES
+    prefix = len(os.path.join(console_dir, ""))
+    try:
+        with os.scandir(directory) as it:
+            for child in it:
+                if ignore is not None and ignore.matches(child.path[prefix:], child.name):
+                    continue
+                if child.is_dir(follow_symlinks=False):
+                    subdirs.append(child)
+                elif child.is_file():
+                    files.append(child)
+    except OSError:
+        return entries, [], 0, 0, 0
+    files.sort(key=lambda f: f.name)
+    rom_files = [
+        (f, suffix)
+        for f in files
+        if (suffix := os.path.splitext(f.name)[1].lower()) in ROM_EXTENSIONS
+    ]
+    folder_mode = directory != console_dir
+    whole = folder_mode and (nested or bool(rom_files))  # Stat every file, not just ROMs
+    stat = _stat
+    if by_inode and (rom_files or whole):
+        # Stat up front in inode order; the loops below then read the results by name
+        to_stat = files if whole else [f for f, _ in rom_files]
+        stats = {f.name: _stat(f) for f in sorted(to_stat, key=entry_inode)}
 
-    if not roms_root.is_dir():
-        return entries
+        def stat(f: "os.DirEntry[str]") -> tuple[int, int]:
+            return stats[f.name]
 
-    for console_dir in sorted(roms_root.iterdir()):
-        if not console_dir.is_dir():
-            continue
-        if console_dir.name.lower() in excluded:
+    nbytes = 0
+    newest = 0
+    if whole:
+        try:
+            newest = os.stat(directory).st_mtime_ns
+        except OSError:
+            pass
+        for f in files:
+            size, mtime = stat(f)
+            nbytes += size
+            newest = max(newest, mtime)
+        if rom_files:
+            parent, folder = os.path.split(directory)
+            entries.append(
+                ROMEntry.from_parts(sys.intern(parent), folder, console, None, nbytes, newest)
+            )
+    elif rom_files:
+        interned_dir = sys.intern(directory)
+        for f, suffix in rom_files:
+            size, mtime_ns = stat(f)
+            nbytes += size
+            entries.append(
+                ROMEntry.from_parts(
+                    interned_dir, f.name, console, _EXTENSIONS[suffix], size, mtime_ns
+                )
+            )
+    if by_inode:
+        subdirs.sort(key=entry_inode)
+        return entries, [d.path for d in subdirs], len(files), nbytes, newest
+    return entries, sorted(d.path for d in subdirs), len(files), nbytes, newest
+
+
+def folder_totals(
+    directory: str,
+    listing: Callable[[str], tuple[Sequence[str], int, int]],
+    is_folder: Callable[[str], bool],
+) -> tuple[int, int]:
+    """(bytes, newest mtime) of a game folder's whole tree, from each directory's
+    (subdirectories, bytes, newest mtime) listing. A nested game folder is an entry of its
+    own and is not counted."""
+    subdirs, nbytes, newest = listing(directory)
+    stack = [d for d in subdirs if not is_folder(d)]
+    while stack:
+        subdirs, size, mtime = listing(stack.pop())
+        nbytes += size
+        newest = max(newest, mtime)
+        stack.extend(d for d in subdirs if not is_folder(d))
+    return nbytes, newest
+
+
+def _scan_console(
+    console_dir: str,
+    console: str,
+    entries: list[ROMEntry],
+    progress: Progress | None = None,
+    ignore: IgnoreGlobs | None = None,
+    by_inode: bool = False,
+) -> None:
+    """Walk one console directory depth-first, listing each directory exactly once.
+
+    by_inode visits subdirectories in inode order, then emits entries in the usual name
+    order, so results do not depend on disk layout. Game folder entries get the totals of
+    their whole tree once the walk is done."""
+    console = sys.intern(console)
+    listed: dict[str, tuple[list[ROMEntry], list[str]]] = {}
+    folders: dict[str, ROMEntry] = {}  # Game folder directory -> its entry
+    tree: dict[str, tuple[list[str], int, int]] = {}  # In and below game folders
+    stack = [(console_dir, False)]
+    while stack:
+        directory, nested = stack.pop()
+        found, subdirs, nfiles, nbytes, newest = scan_directory(
+            directory, console_dir, console, ignore, by_inode, nested
+        )
+        if by_inode:
+            listed[directory] = (found, subdirs)
+        else:
+            entries.extend(found)
+        if found and directory != console_dir:
+            folders[directory] = found[0]
+        if nested or directory in folders:
+            tree[directory] = (subdirs, nbytes, newest)
+        if progress is not None:
+            progress.advance(SCAN, files=nfiles, nbytes=nbytes, console=console)
+        below = nested or directory in folders
+        stack.extend((sub, below) for sub in reversed(subdirs))
+    for directory, entry in folders.items():
+        entry.size, entry.mtime_ns = folder_totals(
+            directory, tree.__getitem__, folders.__contains__
+        )
+    stack_dirs = [console_dir] if by_inode else []
+    while stack_dirs:
+        found, subdirs = listed.pop(stack_dirs.pop())
+        entries.extend(found)
+        stack_dirs.extend(sorted(subdirs, reverse=True))
+
+
+def console_dirs(roms_root: Path, config: "Config | None" = None) -> list[tuple[str, str]]:
+    """(path, console) of every console directory to scan, in name order.
+
+    Skips excluded consoles and names starting with "." or "_"; applies console_aliases.
+    """
+    excluded = config.exclude_consoles if config else EXCLUDED_CONSOLES
+    aliases = config.console_aliases if config else {}
+    try:
+        with os.scandir(roms_root) as it:
+            children = sorted(
+                (child.name, child.path) for child in it if child.is_dir(follow_symlinks=True)
+            )
+    except OSError:
+        return []
+    out = []
+    for name, path in children:
+        console = aliases.get(name.lower(), name)
+        if name.lower() in excluded or console.lower() in excluded:
             continue
-        if console_dir.name.startswith(EXCLUDED_PREFIXES):
+        if name.startswith(EXCLUDED_PREFIXES):
             continue
+        out.append((path, console))
+    return out
 
-        console = console_dir.name
-        game_folders: set[Path] = set()
-        for path in console_dir.rglob("*"):
-            if path.is_dir():
-                continue
-            suffix = path.suffix.lower()
-            if suffix not in ROM_EXTENSIONS:
-                continue
-            parent = path.parent
-            if parent != console_dir and parent.name not in (".", ".."):
-                has_roms = any(
-                    p.suffix.lower() in ROM_EXTENSIONS for p in parent.iterdir() if p.is_file()
-                )
-                if has_roms:
-                    game_folders.add(parent)
-        added_from_folders: set[Path] = set()
-        for path in console_dir.rglob("*"):
-            if path.is_dir():
-                continue
-            if path.parent in game_folders:
-                if path.parent not in added_from_folders:
-                    entries.append(ROMEntry(path=path.parent, console=console, extension=None))
-                    added_from_folders.add(path.parent)
-                continue
-            suffix = path.suffix.lower()
-            if suffix in ROM_EXTENSIONS:
-                entries.append(ROMEntry(path=path, console=console, extension=suffix or None))
+
+def scan(
+    roms_root: Path,
+    config: "Config | None" = None,
+    *,
+    progress: Progress | None = None,
+) -> list[ROMEntry]:
+    """Scan ROMs directory for ROM files, excluding daphne/singe/hypseus or config.
+
+    Console directories named in config.console_aliases are reported under their canonical
+    console, so e.g. megadrive/ and genesis/ group together. With config.hdd_order, files
+    are statted and directories visited in inode order."""
+    entries: list[ROMEntry] = []
+    roms_root = Path(roms_root)
+    ignore = IgnoreGlobs.compile(config.ignore_globs) if config else None
+
+    if not roms_root.is_dir():
+        return entries
+
+    if progress is not None:
+        progress.start(SCAN)
+    by_inode = config.hdd_order if config else False
+    for path, console in console_dirs(roms_root, config):
+        _scan_console(path, console, entries, progress, ignore, by_inode)
+    if progress is not None:
+        progress.finish(SCAN)
 
     return entries
@@ -0,0 +1,329 @@
+"""Server mode: a warm LiveIndex behind a local JSON API over HTTP or a Unix socket.
+
+Each `rom-deduper scan` starts Python, walks the library, parses every name and ranks
+every group. The server does that once and keeps the entries, parsed titles and rank
+results in memory. A refresh stats the known directories, re-lists only those whose
+mtime moved, and re-ranks only the groups they touched, so answers take milliseconds.
+
+Endpoints (JSON in and out):
+
+- GET  /report    current report, no disk access (?console=NAME to filter)
+- POST /scan      incremental refresh, then the report
+- POST /refresh   {"directories": [...]} re-lists those; {"full": true} rescans; {} finds
+                  stale directories by mtime
+- POST /apply     {"skip_uncertain", "free_bytes", "hard"}: refresh, apply, refresh
+- POST /restore   {"console", "title", "run_id", "on_conflict"}, then refresh
+- GET  /status    staging totals from the manifest
+
+Requests are handled one at a time against the index. There is no authentication, so the
+server binds only to a loopback address or a Unix socket. A web page can still reach a
+loopback port, so requests carrying an Origin header, POSTs that are not
+application/json, and (over TCP) a Host other than the server's own are refused.
+"""
+
+import ipaddress
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections.abc import Callable
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Protocol, cast
+from urllib.parse import parse_qs, urlsplit
+
+from rom_deduper.actions import apply_removal, restore, staging_status
+from rom_deduper.config import Config
+from rom_deduper.watch import LiveIndex, report_json
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY = 1 << 20
+JSON_TYPE = "application/json"
+
+
+class RequestError(Exception):
+    """A request the server refuses; reported to the client with status."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class ServerState:
+    """The warm index for one ROMs root and the lock that serializes requests on it."""
+
+    def __init__(self, roms_root: Path, config: Config) -> None:
+        self.roms_root = Path(roms_root)
+        self.config = config
+        self.index = LiveIndex(self.roms_root, config)
+        self.lock = threading.Lock()
+        self.built = False
+
+    def refresh(self, directories: list[str] | None = None, *, full: bool = False) -> dict:
+        """Bring the index up to date. Returns how many directories were re-listed and
+        groups re-ranked. directories are relative to the ROMs root and must stay in it."""
+        if full or not self.built:
+            self.index.build()
+            self.built = True
+            relisted = len(self.index.directories)
+        else:
+            if directories is None:
+                directories = self.index.stale_directories()
+            else:
+                directories = [self._directory(d) for d in directories]
+            self.index.refresh(directories)
+            relisted = len(directories)
+        return {"relisted": relisted, "reranked": self.index.update()}
+
+    def _directory(self, directory: str) -> str:
+        """directory joined to the ROMs root and normalized; outside the root is refused."""
+        root = os.path.normpath(self.index.root)
+        path = os.path.normpath(os.path.join(root, directory))
+        if os.path.commonpath([root, path]) != root:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"not under the ROMs root: {directory!r}")
+        return path
+
+    # Routes: each takes the query string dict and JSON body and returns JSON data
+
+    def get_report(self, query: dict[str, list[str]], _body: dict) -> dict:
+        data = report_json(self.index.report(), self.roms_root)
+        consoles = {c.lower() for c in query.get("console", [])}
+        if consoles:
+            data["groups"] = [g for g in data["groups"] if g["console"].lower() in consoles]
+        return data
+
+    def post_scan(self, query: dict[str, list[str]], body: dict) -> dict:
+        refreshed = self.refresh()
+        return {"refresh": refreshed, **self.get_report(query, body)}
+
+    def post_refresh(self, _query: dict[str, list[str]], body: dict) -> dict:
+        directories = body.get("directories")
+        if directories is not None and not (
+            isinstance(directories, list) and all(isinstance(d, str) for d in directories)
+        ):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "directories must be a list of paths")
+        return self.refresh(directories, full=bool(body.get("full", False)))
+
+    def post_apply(self, _query: dict[str, list[str]], body: dict) -> dict:
+        from rom_deduper.manifest import new_run_id
+
+        free_bytes = body.get("free_bytes")
+        if free_bytes is not None and (
+            not isinstance(free_bytes, int) or isinstance(free_bytes, bool) or free_bytes < 0
+        ):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "free_bytes must be a byte count")
+        before = self.refresh()
+        run_id = new_run_id()
+        removed, bytes_freed = apply_removal(
+            self.roms_root,
+            self.index.report(),
+            hard=bool(body.get("hard", False)),
+            skip_uncertain=bool(body.get("skip_uncertain", False)),
+            free_bytes=free_bytes,
+            run_id=run_id,
+            hdd_order=self.config.hdd_order,
+        )
+        return {
+            "removed": removed,
+            "bytes_freed": bytes_freed,
+            "run_id": run_id if removed and not body.get("hard") else None,
+            "refresh": {"before": before, "after": self.refresh()},
+        }
+
+    def post_restore(self, _query: dict[str, list[str]], body: dict) -> dict:
+        on_conflict = body.get("on_conflict", "skip")
+        if on_conflict not in ("skip", "overwrite", "remove"):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"bad on_conflict: {on_conflict!r}")
+        restored = restore(
+            self.roms_root,
+            on_conflict=on_conflict,
+            console=body.get("console"),
+            title=body.get("title"),
+            run_id=body.get("run_id"),
+            hdd_order=self.config.hdd_order,
+        )
+        return {"restored": restored, "refresh": self.refresh()}
+
+    def get_status(self, _query: dict[str, list[str]], _body: dict) -> dict:
+        status = staging_status(self.roms_root)
+        return {
+            "files": status.files,
+            "bytes": status.bytes,
+            "consoles": [
+                {"console": console, "files": files, "bytes": size}
+                for console, files, size in status.consoles
+            ],
+            "oldest": status.oldest,
+            "newest": status.newest,
+        }
+
+    def routes(self) -> dict[tuple[str, str], Callable[[dict[str, list[str]], dict], dict]]:
+        return {
+            ("GET", "/report"): self.get_report,
+            ("POST", "/scan"): self.post_scan,
+            ("POST", "/refresh"): self.post_refresh,
+            ("POST", "/apply"): self.post_apply,
+            ("POST", "/restore"): self.post_restore,
+            ("GET", "/status"): self.get_status,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        start = time.perf_counter()
+        state = cast(_StateServer, self.server).state
+        url = urlsplit(self.path)
+        data: dict[str, Any]
+        try:
+            self._check_request(method)
+            route = state.routes().get((method, url.path))
+            if route is None:
+                raise RequestError(HTTPStatus.NOT_FOUND, f"no route {method} {url.path}")
+            body = self._body()
+            with state.lock:
+                data = route(parse_qs(url.query), body)
+            status = HTTPStatus.OK
+        except RequestError as e:
+            status, data = e.status, {"error": str(e)}
+        except Exception as e:  # A failed request must not take the server down
+            status, data = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+        data["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", JSON_TYPE)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _check_request(self, method: str) -> None:
+        """Refuse what a web page could send: any cross-origin request, a POST a form can
+        make without a preflight, or a Host a DNS rebinding attack would carry."""
+        if self.headers.get("Origin") is not None:
+            raise RequestError(HTTPStatus.FORBIDDEN, "cross-origin requests are not allowed")
+        hosts = cast(_StateServer, self.server).allowed_hosts
+        if hosts is not None and self.headers.get("Host", "").lower() not in hosts:
+            raise RequestError(HTTPStatus.FORBIDDEN, "unexpected Host header")
+        if method == "POST":
+            content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type != JSON_TYPE:
+                raise RequestError(
+                    HTTPStatus.UNSUPPORTED_MEDIA_TYPE, f"Content-Type must be {JSON_TYPE}"
+                )
+
+    def _body(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"invalid JSON: {e}") from e
+        if not isinstance(body, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "request body must be a JSON object")
+        return body
+
+    def address_string(self) -> str:
+        # Unix socket peers have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if cast(_StateServer, self.server).verbose:
+            super().log_message(format, *args)
+
+
+class _StateServer(Protocol):
+    """What the handler needs from either server class."""
+
+    state: ServerState
+    verbose: bool
+    allowed_hosts: frozenset[str] | None  # Host header values accepted; None skips the check
+
+    @property
+    def url(self) -> str: ...
+
+
+def is_loopback(host: str) -> bool:
+    """Whether host names this machine only: localhost or a loopback address."""
+    if host.lower() == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], state: ServerState, verbose: bool) -> None:
+        self.state = state
+        self.verbose = verbose
+        self.host = address[0]
+        super().__init__(address, _Handler)
+        self.allowed_hosts = frozenset(
+            f"{name}:{self.server_port}" for name in ("localhost", "127.0.0.1", self.host.lower())
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.server_port}"
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, state: ServerState, verbose: bool) -> None:
+        self.state = state
+        self.verbose = verbose
+        self.allowed_hosts = None  # Only local processes can reach the socket
+        self.path = path
+        super().__init__(path, _Handler)
+
+    @property
+    def url(self) -> str:
+        return f"unix:{self.path}"
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def make_server(
+    roms_root: Path,
+    config: Config,
+    *,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Path | None = None,
+    verbose: bool = False,
+) -> "_HTTPServer | _UnixHTTPServer":
+    """Build the index and bind the server (a Unix socket if socket_path is given).
+    Raises ValueError for a host that is not a loopback address."""
+    if socket_path is None and not is_loopback(host):
+        raise ValueError(f"{host} is not a loopback address; the API has no authentication")
+    state = ServerState(roms_root, config)
+    state.refresh()
+    if socket_path is not None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix sockets are not available on this platform")
+        if socket_path.is_socket():
+            socket_path.unlink()  # Left behind by a server that did not shut down cleanly
+        return _UnixHTTPServer(os.fspath(socket_path), state, verbose)
+    return _HTTPServer((host, port), state, verbose)
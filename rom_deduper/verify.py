@@ -0,0 +1,285 @@
+"""Keeper integrity checks before removal: CRC32 against a DAT or a zip's own CRCs.
+
+Each group's keeper is hashed in a thread pool (zlib.crc32 releases the GIL on large
+buffers). A keeper that fails is replaced by the best-ranked alternate that verifies; when
+none does, the group is left alone.
+"""
+
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from rom_deduper.actions import DryRunGroup, DryRunReport, _expand_to_remove_orphan_m3u
+from rom_deduper.hashing import CHUNK, DEFAULT_WORKERS, file_crc32
+from rom_deduper.scanner import ROMEntry
+
+VERIFIED = "verified"  # Matches the DAT, or every zip member passed its CRC check
+CORRUPT = "corrupt"  # Known to the DAT under another hash, or a zip CRC failed
+UNKNOWN = "unknown"  # Nothing to compare against (not in the DAT, no DAT for plain files)
+
+
+@dataclass(slots=True)
+class Dat:
+    """ROM hashes from a Logiqx XML DAT (No-Intro, Redump)."""
+
+    hashes: set[tuple[int, int]] = field(default_factory=set)  # (size, crc32)
+    names: set[str] = field(default_factory=set)  # Lowercase ROM file names
+
+    @classmethod
+    def load(cls, path: Path) -> "Dat":
+        """Read every <rom name size crc> element; malformed ones are skipped."""
+        dat = cls()
+        for _, elem in ET.iterparse(path):
+            if elem.tag == "rom":
+                try:
+                    dat.hashes.add((int(elem.get("size", "")), int(elem.get("crc", ""), 16)))
+                except ValueError:
+                    pass
+                else:
+                    dat.names.add(elem.get("name", "").lower())
+            elif elem.tag in ("game", "machine"):
+                elem.clear()
+        return dat
+
+    def check(self, name: str, size: int, crc: int) -> str:
+        if (size, crc) in self.hashes:
+            return VERIFIED
+        return CORRUPT if name.lower() in self.names else UNKNOWN
+
+
+@dataclass(slots=True)
+class WorkerStats:
+    """Files and bytes one worker hashed, and the time it spent hashing them."""
+
+    worker: str
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass(slots=True)
+class KeeperCheck:
+    """Outcome for one group whose keeper was checked."""
+
+    group: DryRunGroup
+    status: str
+    original: ROMEntry  # The keeper the ranker chose
+    replaced: bool = False  # A verified alternate is kept instead
+    skipped: bool = False  # Corrupt keeper and no verified alternate: nothing is removed
+
+
+@dataclass(slots=True)
+class VerifyReport:
+    """Per-group outcomes and per-worker throughput."""
+
+    checks: list[KeeperCheck] = field(default_factory=list)
+    workers: list[WorkerStats] = field(default_factory=list)
+
+    def count(self, status: str) -> int:
+        return sum(1 for c in self.checks if c.status == status)
+
+    @property
+    def replaced(self) -> int:
+        return sum(1 for c in self.checks if c.replaced)
+
+    @property
+    def skipped(self) -> int:
+        return sum(1 for c in self.checks if c.skipped)
+
+
+class _Hasher:
+    """Checks entries, keeping per-thread throughput."""
+
+    def __init__(self, dat: Dat | None) -> None:
+        self.dat = dat
+        self._stats: dict[str, WorkerStats] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> list[WorkerStats]:
+        return sorted(self._stats.values(), key=lambda w: w.worker)
+
+    def _record(self, files: int, nbytes: int, seconds: float) -> None:
+        name = threading.current_thread().name
+        with self._lock:
+            stats = self._stats.setdefault(name, WorkerStats(name))
+            stats.files += files
+            stats.bytes += nbytes
+            stats.seconds += seconds
+
+    def check(self, entry: ROMEntry) -> str:
+        """Status of one entry: a file, a zip, or a game folder (every file directly in it)."""
+        path = os.path.join(entry.directory, entry.name)
+        if entry.extension is None:
+            try:
+                with os.scandir(path) as it:
+                    files = sorted(child.path for child in it if child.is_file())
+            except OSError:
+                return CORRUPT
+            return _combine(self._check_file(f) for f in files)
+        return self._check_file(path)
+
+    def _check_file(self, path: str) -> str:
+        start = time.perf_counter()
+        try:
+            if path.lower().endswith(".zip"):
+                status, nbytes = self._check_zip(path)
+            elif self.dat is None:
+                return UNKNOWN  # Nothing to compare a plain file's CRC against
+            else:
+                nbytes, crc = file_crc32(path)
+                status = self.dat.check(os.path.basename(path), nbytes, crc)
+        except (OSError, zipfile.BadZipFile, EOFError):
+            status, nbytes = CORRUPT, 0
+        self._record(1, nbytes, time.perf_counter() - start)
+        return status
+
+    def _check_zip(self, path: str) -> tuple[str, int]:
+        """Read every member to its end, which makes zipfile check its CRC (BadZipFile on a
+        mismatch); with a DAT, the recorded CRCs must also be known good."""
+        nbytes = 0
+        statuses = []
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                with zf.open(info) as member:
+                    while chunk := member.read(CHUNK):
+                        nbytes += len(chunk)
+                name = os.path.basename(info.filename)
+                statuses.append(
+                    self.dat.check(name, info.file_size, info.CRC) if self.dat else VERIFIED
+                )
+        return _combine(statuses), nbytes
+
+
+def _combine(statuses: Iterable[str]) -> str:
+    """One status for several files: any corrupt file taints all; all verified verifies."""
+    seen = set(statuses)
+    if CORRUPT in seen:
+        return CORRUPT
+    return VERIFIED if seen == {VERIFIED} else UNKNOWN
+
+
+def _alternates(group: DryRunGroup) -> list[list[ROMEntry]]:
+    """Removal candidates as keepable units in rank order: disc sets whole, .m3u left out."""
+    set_of = {id(d): s for s in group.disc_sets for d in s.discs}
+    units: list[list[ROMEntry]] = []
+    emitted: set[int] = set()
+    for entry in group.to_remove:
+        if entry.extension == ".m3u":
+            continue
+        disc_set = set_of.get(id(entry))
+        if disc_set is None:
+            units.append([entry])
+        elif id(disc_set) not in emitted:
+            emitted.add(id(disc_set))
+            units.append(list(disc_set.discs))
+    return units
+
+
+def _keep_instead(group: DryRunGroup, unit: list[ROMEntry]) -> None:
+    """Keep unit instead of the corrupt keeper; the corrupt keeper itself stays in place."""
+    kept = {id(e) for e in unit}
+    rest = [e for e in group.to_remove if id(e) not in kept and e.extension != ".m3u"]
+    group.keeper = unit[0]
+    group.keeper_set = next((s for s in group.disc_sets if id(s.discs[0]) in kept), None)
+    group.to_remove = _expand_to_remove_orphan_m3u(rest)
+    group.disc_sets = [s for s in group.disc_sets if id(s.discs[0]) not in kept]
+
+
+def _keeper_unit(group: DryRunGroup) -> list[ROMEntry]:
+    """The entries kept for group: every disc of the keeper's set, or the keeper alone."""
+    if group.keeper_set is not None:
+        return list(group.keeper_set.discs)
+    return [group.keeper] if group.keeper is not None else []
+
+
+def verify_keepers(
+    report: DryRunReport,
+    *,
+    dat: Dat | None = None,
+    workers: int = DEFAULT_WORKERS,
+) -> VerifyReport:
+    """Check every keeper that has something to remove, adjusting report in place.
+
+    A multi-disc keeper is checked disc by disc, and one corrupt disc makes it corrupt. A
+    corrupt keeper is swapped for the best-ranked alternate that verifies; if there is none,
+    the group's removals are dropped. Keepers that are merely unknown are trusted.
+    """
+    hasher = _Hasher(dat)
+    pairs = [(g, g.keeper) for g in report.groups if g.keeper is not None and g.to_remove]
+    kept = {id(g): _keeper_unit(g) for g, _ in pairs}
+    result = VerifyReport()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="verify") as pool:
+        kept_flat = [e for g, _ in pairs for e in kept[id(g)]]
+        kept_status = dict(zip(map(id, kept_flat), pool.map(hasher.check, kept_flat)))
+        statuses = [_combine(kept_status[id(e)] for e in kept[id(g)]) for g, _ in pairs]
+        corrupt = [g for (g, _), status in zip(pairs, statuses) if status == CORRUPT]
+        # Only groups with a bad keeper pay for hashing their alternates
+        candidates = {id(g): _alternates(g) for g in corrupt}
+        flat = [e for g in corrupt for unit in candidates[id(g)] for e in unit]
+        alt_status = dict(zip(map(id, flat), pool.map(hasher.check, flat)))
+    for (group, keeper), status in zip(pairs, statuses):
+        check = KeeperCheck(group=group, status=status, original=keeper)
+        if status == CORRUPT:
+            for unit in candidates[id(group)]:
+                if all(alt_status[id(e)] == VERIFIED for e in unit):
+                    _keep_instead(group, unit)
+                    check.replaced = True
+                    break
+            else:
+                group.to_remove = []
+                group.disc_sets = []
+                check.skipped = True
+        result.checks.append(check)
+    result.workers = hasher.workers
+    report.groups = [g for g in report.groups if g.to_remove]
+    report.duplicate_groups = len(report.groups)
+    report.total_to_remove = sum(len(g.to_remove) for g in report.groups)
+    return result
+
+
+def format_verify_report(result: VerifyReport, *, quiet: bool = False) -> None:
+    """Print keeper check totals, corrupt keepers and per-worker throughput."""
+    from rich.console import Console
+    from rich.markup import escape
+
+    from rom_deduper.actions import _format_bytes
+
+    console = Console()
+    console.print(
+        f"[bold]Keeper verification[/bold]\n"
+        f"Verified: {result.count(VERIFIED)} | Unknown: {result.count(UNKNOWN)} | "
+        f"Corrupt: {result.count(CORRUPT)} "
+        f"(kept an alternate: {result.replaced}, skipped: {result.skipped})"
+    )
+    for c in result.checks:
+        if c.status != CORRUPT:
+            continue
+        outcome = (
+            f"keeping {escape(c.group.keeper.name)!r}"
+            if c.replaced and c.group.keeper
+            else "group skipped"
+        )
+        console.print(
+            f"  [red]corrupt[/red] [cyan]{c.group.console}[/cyan] "
+            f"{escape(c.original.name)!r}: {outcome}"
+        )
+    if quiet:
+        return
+    for w in result.workers:
+        console.print(
+            f"  [dim]{w.worker}: {w.files} file(s), {_format_bytes(w.bytes)}, "
+            f"{_format_bytes(int(w.bytes_per_sec))}/s[/dim]"
+        )
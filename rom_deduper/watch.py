@@ -0,0 +1,380 @@
+"""Watch mode: keep the duplicate report current as ROMs are added, renamed or removed.
+
+LiveIndex holds what each directory contributed to the scan, so an inotify event in one
+directory re-lists only that directory and re-ranks only the groups it touched. Without
+inotify, stale_directories finds the directories to re-list from their modification times.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from rom_deduper.actions import DryRunReport, _dry_run_groups
+from rom_deduper.config import Config
+from rom_deduper.grouper import GameGroup, group_entries
+from rom_deduper.inotify import IN_Q_OVERFLOW, Inotify
+from rom_deduper.parser import parse_filename
+from rom_deduper.policy import compile_policy
+from rom_deduper.ranker import RankResult, rank_groups
+from rom_deduper.scanner import (
+    IgnoreGlobs,
+    ROMEntry,
+    console_dirs,
+    folder_totals,
+    scan_directory,
+)
+
+REPORT_FILENAME = ".rom-deduper-report.json"
+RACY_NS = 2_000_000_000  # Coarsest directory mtime granularity to allow for (FAT: 2 s)
+
+GroupKey = tuple[str, str]  # (console, normalized base title)
+
+
+@dataclass(slots=True)
+class _Directory:
+    """What one listed directory contributed: its entries (with group keys) and subdirs."""
+
+    console_dir: str
+    console: str
+    entries: list[tuple[GroupKey, ROMEntry]] = field(default_factory=list)
+    subdirs: list[str] = field(default_factory=list)
+    stamp: "tuple[int, int] | None" = None  # (mtime_ns, listed at ns), taken before listing
+    folder: ROMEntry | None = None  # The entry, when this directory is a game folder
+    nested: bool = False  # Below a game folder, so its files count toward that folder
+    totals: tuple[int, int] = (0, 0)  # (bytes, newest mtime) of its own files, see scanner
+
+    @property
+    def holds_files(self) -> bool:
+        """A game folder or below one: directories under it are nested."""
+        return self.folder is not None or self.nested
+
+
+def _stamp(directory: str) -> tuple[int, int] | None:
+    try:
+        return (os.stat(directory).st_mtime_ns, time.time_ns())
+    except OSError:
+        return None
+
+
+class LiveIndex:
+    """Entries, groups and rankings for a ROMs root, refreshed one directory at a time."""
+
+    def __init__(self, roms_root: Path, config: Config) -> None:
+        self.root = os.fspath(roms_root)
+        self.config = config
+        self._ignore = IgnoreGlobs.compile(config.ignore_globs)
+        self._dirs: dict[str, _Directory] = {}
+        self._consoles: dict[str, str] = {}  # console directory -> console
+        self._groups: dict[GroupKey, list[ROMEntry]] = defaultdict(list)
+        self._results: dict[GroupKey, tuple[GameGroup, RankResult]] = {}  # Ranked groups
+        self._dirty: set[GroupKey] = set()
+        self._titles: dict[str, str] = {}  # File name -> normalized base title
+        self._resized: set[str] = set()  # Listed or dropped since the last update
+        self._root_stamp: tuple[int, int] | None = None
+
+    @property
+    def directories(self) -> set[str]:
+        """Every directory the index has listed (the ones to watch), plus the root."""
+        return {self.root, *self._dirs}
+
+    @property
+    def total_files(self) -> int:
+        return sum(len(entries) for entries in self._groups.values())
+
+    def build(self) -> None:
+        """Full scan, replacing any previous state."""
+        self._dirs.clear()
+        self._consoles.clear()
+        self._groups.clear()
+        self._results.clear()
+        self._dirty.clear()
+        self._titles.clear()
+        self._resized.clear()
+        self._root_stamp = _stamp(self.root)
+        for path, console in console_dirs(Path(self.root), self.config):
+            self._consoles[path] = console
+            self._walk(path, path, console)
+
+    def stale_directories(self) -> list[str]:
+        """Directories that may have changed since they were listed: gone, a different
+        mtime, or an mtime so close to the listing that a coarse clock could hide a later
+        change (those are re-listed until they settle, as git does for racy index entries).
+        Costs one stat per directory and no listings."""
+        stale = []
+        stamps = [(self.root, self._root_stamp)]
+        stamps.extend((d, state.stamp) for d, state in self._dirs.items())
+        for directory, stamp in stamps:
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                stale.append(directory)
+                continue
+            if stamp is None or mtime != stamp[0] or mtime >= stamp[1] - RACY_NS:
+                stale.append(directory)
+        return stale
+
+    def refresh(self, directories: Iterable[str]) -> None:
+        """Re-list the given directories; new subtrees are walked, vanished ones dropped."""
+        for directory in sorted(set(directories)):
+            if directory == self.root:
+                self._root_stamp = _stamp(self.root)
+                self._refresh_consoles()
+            elif directory in self._dirs or os.path.dirname(directory) in self._dirs:
+                self._refresh_dir(directory)
+
+    def update(self) -> int:
+        """Re-rank every group touched since the last update. Returns how many were."""
+        self._roll_up()
+        keys = sorted(self._dirty)
+        self._dirty.clear()
+        live = [k for k in keys if self._groups.get(k)]
+        for k in keys:
+            if not self._groups.get(k):
+                self._groups.pop(k, None)
+                self._results.pop(k, None)
+        grouped = group_entries([e for k in live for e in self._groups[k]])
+        by_key = {(g.console, g.base_title): g for g in grouped}
+        groups = [by_key[k] for k in live]
+        results = rank_groups(groups, policy=compile_policy(self.config))
+        for key, group, result in zip(live, groups, results):
+            self._results[key] = (group, result)
+        return len(keys)
+
+    def report(self) -> DryRunReport:
+        """The current dry-run report, with disc sets batched as dry_run batches them."""
+        ranked = [self._results[k] for k in sorted(self._results)]
+        groups = _dry_run_groups(
+            [g for g, _ in ranked], [r for _, r in ranked], [True] * len(ranked)
+        )
+        return DryRunReport(
+            groups=groups,
+            total_files=self.total_files,
+            duplicate_groups=len(groups),
+            total_to_remove=sum(len(g.to_remove) for g in groups),
+        )
+
+    def _walk(self, top: str, console_dir: str, console: str) -> None:
+        """List top and everything below it."""
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            self._list(directory, console_dir, console)
+            stack.extend(reversed(self._dirs[directory].subdirs))
+
+    def _list(self, directory: str, console_dir: str, console: str) -> list[str]:
+        """(Re-)list one directory, replacing its contribution. Returns its previous subdirs."""
+        old = self._dirs.get(directory)
+        if old is not None:
+            self._forget(old)
+        parent = self._dirs.get(os.path.dirname(directory))
+        nested = directory != console_dir and parent is not None and parent.holds_files
+        stamp = _stamp(directory)
+        found, subdirs, _, nbytes, newest = scan_directory(
+            directory, console_dir, console, self._ignore, nested=nested
+        )
+        state = _Directory(
+            console_dir,
+            console,
+            subdirs=subdirs,
+            stamp=stamp,
+            folder=found[0] if found and directory != console_dir else None,
+            nested=nested,
+            totals=(nbytes, newest),
+        )
+        self._resized.add(directory)
+        for entry in found:
+            title = self._titles.get(entry.name)
+            if title is None:
+                title = self._titles[entry.name] = parse_filename(entry.name).base_title_normalized
+            key = (entry.console, title)
+            state.entries.append((key, entry))
+            self._groups[key].append(entry)
+            self._dirty.add(key)
+        self._dirs[directory] = state
+        return old.subdirs if old is not None else []
+
+    def _forget(self, state: _Directory) -> None:
+        """Remove one directory's entries from their groups."""
+        for key, entry in state.entries:
+            members = self._groups.get(key)
+            if members is not None:
+                members[:] = [e for e in members if e is not entry]
+            self._dirty.add(key)
+
+    def _drop(self, directory: str) -> None:
+        """Forget a directory and everything below it."""
+        self._resized.add(os.path.dirname(directory))
+        stack = [directory]
+        while stack:
+            state = self._dirs.pop(stack.pop(), None)
+            if state is not None:
+                self._forget(state)
+                stack.extend(state.subdirs)
+
+    def _refresh_dir(self, directory: str) -> None:
+        state = self._dirs.get(directory)
+        if state is None:
+            parent = self._dirs[os.path.dirname(directory)]
+            console_dir, console = parent.console_dir, parent.console
+        else:
+            console_dir, console = state.console_dir, state.console
+        if not os.path.isdir(directory):
+            self._drop(directory)
+            return
+        was_holding = state is not None and state.holds_files
+        previous = self._list(directory, console_dir, console)
+        current = self._dirs[directory].subdirs
+        for gone in set(previous) - set(current):
+            self._drop(gone)
+        relist = self._dirs[directory].holds_files != was_holding
+        for sub in current:
+            if relist:  # Became or stopped being a game folder: subdirs are statted differently
+                self._drop(sub)
+            if sub not in self._dirs:
+                self._walk(sub, console_dir, console)
+
+    def _roll_up(self) -> None:
+        """Refresh the size and mtime of each game folder whose tree was re-listed."""
+
+        def listing(directory: str) -> tuple[list[str], int, int]:
+            state = self._dirs.get(directory)
+            return (state.subdirs, *state.totals) if state is not None else ([], 0, 0)
+
+        def is_folder(directory: str) -> bool:
+            state = self._dirs.get(directory)
+            return state is not None and state.folder is not None
+
+        folders = set()
+        for directory in self._resized:
+            state = self._dirs.get(directory)
+            while state is not None and state.folder is None and state.nested:
+                directory = os.path.dirname(directory)
+                state = self._dirs.get(directory)
+            if state is not None and state.folder is not None:
+                folders.add(directory)
+        self._resized.clear()
+        for directory in folders:
+            state = self._dirs[directory]
+            key, entry = state.entries[0]
+            totals = folder_totals(directory, listing, is_folder)
+            if (entry.size, entry.mtime_ns) != totals:
+                entry.size, entry.mtime_ns = totals
+                self._dirty.add(key)
+
+    def _refresh_consoles(self) -> None:
+        current = dict(console_dirs(Path(self.root), self.config))
+        for path in set(self._consoles) - set(current):
+            self._drop(path)
+            del self._consoles[path]
+        for path, console in current.items():
+            if path not in self._consoles:
+                self._consoles[path] = console
+                self._walk(path, path, console)
+
+
+def _rel(entry: ROMEntry, root: str) -> str:
+    return os.path.relpath(os.path.join(entry.directory, entry.name), root).replace("\\", "/")
+
+
+def report_json(report: DryRunReport, roms_root: Path) -> dict:
+    """The report as JSON-ready data, paths relative to roms_root."""
+    root = os.fspath(roms_root)
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "total_files": report.total_files,
+        "duplicate_groups": report.duplicate_groups,
+        "total_to_remove": report.total_to_remove,
+        "groups": [
+            {
+                "console": g.console,
+                "base_title": g.base_title,
+                "keeper": _rel(g.keeper, root) if g.keeper else None,
+                "to_remove": [_rel(e, root) for e in g.to_remove],
+                "uncertain": g.uncertain,
+            }
+            for g in report.groups
+        ],
+    }
+
+
+def write_report(report: DryRunReport, path: Path, roms_root: Path) -> None:
+    """Write the report as JSON, replacing the previous file atomically."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(report_json(report, roms_root), indent=2))
+    os.replace(tmp, path)
+
+
+def _sync_watches(inotify: Inotify, wanted: set[str]) -> None:
+    """Watch exactly the wanted directories (ones that vanished are skipped)."""
+    for directory in inotify.watched - wanted:
+        inotify.remove_watch(directory)
+    for directory in wanted - inotify.watched:
+        try:
+            inotify.add_watch(directory)
+        except OSError:
+            continue
+
+
+def watch(
+    roms_root: Path,
+    config: Config,
+    report_path: Path | None = None,
+    *,
+    stop: threading.Event | None = None,
+    debounce: float = 0.5,
+    max_wait: float = 5.0,
+    on_update: Callable[[DryRunReport, int], None] | None = None,
+) -> None:
+    """Scan once, then apply inotify events until stop is set, rewriting the report file.
+
+    Events are batched until debounce seconds pass without a new one, or max_wait seconds
+    after the first, so a long bulk copy still updates the report as it goes. on_update receives
+    the new report and the number of groups re-ranked after the initial scan and after
+    each batch.
+    """
+    roms_root = Path(roms_root)
+    report_path = Path(report_path) if report_path else roms_root / REPORT_FILENAME
+    own_files = {report_path.name, report_path.name + ".tmp"}
+    index = LiveIndex(roms_root, config)
+    with Inotify() as inotify:
+        # Watch before the initial scan so nothing added during it is missed
+        inotify.add_watch(index.root)
+        index.build()
+        _sync_watches(inotify, index.directories)
+        changed = index.update()
+        report = index.report()
+        write_report(report, report_path, roms_root)
+        if on_update is not None:
+            on_update(report, changed)
+
+        while stop is None or not stop.is_set():
+            events = inotify.read(timeout=0.5)
+            if not events:
+                continue
+            deadline = time.monotonic() + max_wait
+            while (left := deadline - time.monotonic()) > 0 and (
+                more := inotify.read(timeout=min(debounce, left))
+            ):
+                events.extend(more)
+            if any(e.mask & IN_Q_OVERFLOW for e in events):
+                index.build()  # Events were lost: rescan everything
+            else:
+                index.refresh(
+                    e.directory
+                    for e in events
+                    if not (e.directory == os.fspath(report_path.parent) and e.name in own_files)
+                )
+            _sync_watches(inotify, index.directories)
+            changed = index.update()
+            if not changed:
+                continue
+            report = index.report()
+            write_report(report, report_path, roms_root)
+            if on_update is not None:
+                on_update(report, changed)
@@ -1,9 +1,13 @@
 """Pytest fixtures and configuration."""
 
+from collections.abc import Callable
 from pathlib import Path
+from typing import Any
 
 import pytest
 
+from rom_deduper.config import Config
+
 
 @pytest.fixture
 def tmp_roms_dir(tmp_path: Path) -> Path:
@@ -19,3 +23,25 @@ def tmp_psx_dir(tmp_roms_dir: Path) -> Path:
     psx = tmp_roms_dir / "psx"
     psx.mkdir()
     return psx
+
+
+@pytest.fixture
+def make_config() -> Callable[..., Config]:
+    """Build a Config with no exclusions, translation patterns or region priority, so
+    tests see every console and the default ranking; kwargs set other fields."""
+
+    def make(**kwargs: Any) -> Config:
+        return Config(
+            exclude_consoles=set(), translation_patterns=[], region_priority=None, **kwargs
+        )
+
+    return make
+
+
+@pytest.fixture
+def psx_library(tmp_psx_dir: Path) -> Path:
+    """A psx directory with one unique title and one USA/Japan duplicate pair."""
+    (tmp_psx_dir / "Alpha (USA).chd").write_bytes(b"x")
+    (tmp_psx_dir / "Beta (USA).chd").write_bytes(b"x")
+    (tmp_psx_dir / "Beta (Japan).chd").write_bytes(b"x")
+    return tmp_psx_dir
@@ -4,7 +4,11 @@ import json
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
+from rom_deduper import actions
 from rom_deduper.actions import apply_removal, dry_run, restore
+from rom_deduper.manifest import Manifest
 
 
 def test_dry_run_returns_report(tmp_roms_dir: Path) -> None:
@@ -77,12 +81,12 @@ def test_apply_removal_creates_manifest(tmp_roms_dir: Path) -> None:
     (psx / "Game (Japan).chd").write_bytes(b"x")
     report = dry_run(tmp_roms_dir)
     apply_removal(tmp_roms_dir, report, hard=False)
-    manifest_path = tmp_roms_dir / "_duplicates_removed" / ".manifest.json"
-    assert manifest_path.exists()
-    data = json.loads(manifest_path.read_text())
-    assert "psx/Game (Japan).chd" in data.values() or any(
-        "Game (Japan)" in v for v in data.values()
-    )
+    with Manifest(tmp_roms_dir / "_duplicates_removed") as manifest:
+        rows = list(manifest.files())
+    assert [(r.dest_rel, r.orig_rel) for r in rows] == [
+        ("_duplicates_removed/psx/Game (Japan).chd", "psx/Game (Japan).chd")
+    ]
+    assert (rows[0].bytes, rows[0].console, rows[0].base_title) == (1, "psx", "game")
 
 
 def test_apply_removal_merge_manifest(tmp_roms_dir: Path) -> None:
@@ -97,9 +101,11 @@ def test_apply_removal_merge_manifest(tmp_roms_dir: Path) -> None:
     (psx / "Other (Japan).chd").write_bytes(b"x")
     report2 = dry_run(tmp_roms_dir)
     apply_removal(tmp_roms_dir, report2, hard=False)
-    manifest_path = tmp_roms_dir / "_duplicates_removed" / ".manifest.json"
-    data = json.loads(manifest_path.read_text())
-    assert len(data) >= 2
+    with Manifest(tmp_roms_dir / "_duplicates_removed") as manifest:
+        rows = list(manifest.files())
+    assert len(rows) == 2
+    # Each apply is its own run
+    assert len({r.run_id for r in rows}) == 2
 
 
 def test_apply_removal_hard_uses_send2trash(tmp_roms_dir: Path) -> None:
@@ -113,12 +119,40 @@ def test_apply_removal_hard_uses_send2trash(tmp_roms_dir: Path) -> None:
     def fake_trash(path: str) -> None:
         Path(path).unlink()
 
-    with patch("rom_deduper.actions.send2trash.send2trash", side_effect=fake_trash) as mock_send:
+    with patch("send2trash.send2trash", side_effect=fake_trash) as mock_send:
         apply_removal(tmp_roms_dir, report, hard=True)
         assert mock_send.call_count >= 1
         assert not (psx / "Game (Japan).chd").exists()
 
 
+def test_apply_removal_moves_disc_set_as_one_batch(tmp_roms_dir: Path, monkeypatch) -> None:
+    """If one disc of a set cannot be staged, the set's other discs are put back."""
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    for region in ("USA", "Japan"):
+        for n in (1, 2):
+            (psx / f"Game ({region}) (Disc {n}).chd").write_bytes(b"x")
+    report = dry_run(tmp_roms_dir)
+    assert [len(g.disc_sets) for g in report.groups] == [1]
+
+    original = Path.rename
+
+    def failing_rename(self: Path, target):
+        if self.name == "Game (Japan) (Disc 2).chd":
+            raise OSError("device busy")
+        return original(self, target)
+
+    monkeypatch.setattr(Path, "rename", failing_rename)
+    with pytest.raises(OSError):
+        apply_removal(tmp_roms_dir, report)
+    assert (psx / "Game (Japan) (Disc 1).chd").exists()
+    assert (psx / "Game (Japan) (Disc 2).chd").exists()
+    monkeypatch.undo()
+    count, _ = apply_removal(tmp_roms_dir, report)
+    assert count == 2
+    assert not (psx / "Game (Japan) (Disc 1).chd").exists()
+
+
 def test_restore_moves_files_back(tmp_roms_dir: Path) -> None:
     """Restore moves files from _duplicates_removed back to originals."""
     psx = tmp_roms_dir / "psx"
@@ -245,3 +279,58 @@ def test_apply_removal_skips_uncertain_when_requested(tmp_roms_dir: Path) -> Non
     count, _ = apply_removal(tmp_roms_dir, report, hard=False, skip_uncertain=True)
     assert count == 0
     assert (psx / "Game (Japan).chd").exists()
+
+
+def _sized_library(roms: Path) -> Path:
+    """Three groups whose duplicates reclaim 300, 200 and 100 bytes."""
+    psx = roms / "psx"
+    psx.mkdir()
+    for title, size in (("Alpha", 100), ("Beta", 300), ("Gamma", 200)):
+        (psx / f"{title} (USA).chd").write_bytes(b"k" * size)
+        (psx / f"{title} (Japan).chd").write_bytes(b"d" * size)
+    return psx
+
+
+def test_apply_removal_free_bytes_takes_largest_savings_first(
+    tmp_roms_dir: Path, monkeypatch
+) -> None:
+    """With free_bytes, the biggest groups go first and apply stops at the target,
+    using scan-time sizes rather than new stats."""
+    psx = _sized_library(tmp_roms_dir)
+    report = dry_run(tmp_roms_dir)
+    monkeypatch.setattr(actions, "_size_of_path", lambda p: pytest.fail("stat at apply time"))
+    count, freed = apply_removal(tmp_roms_dir, report, free_bytes=450)
+    assert (count, freed) == (2, 500)
+    assert (psx / "Alpha (Japan).chd").exists()
+    assert not (psx / "Beta (Japan).chd").exists()
+    assert not (psx / "Gamma (Japan).chd").exists()
+    with Manifest(tmp_roms_dir / "_duplicates_removed") as manifest:
+        assert manifest.total_bytes() == 500
+
+
+def test_apply_removal_free_bytes_respects_skip_uncertain(tmp_roms_dir: Path) -> None:
+    """Uncertain groups are left out before the budget is filled."""
+    psx = _sized_library(tmp_roms_dir)
+    report = dry_run(tmp_roms_dir)
+    next(g for g in report.groups if g.base_title == "beta").uncertain = True
+    count, freed = apply_removal(tmp_roms_dir, report, skip_uncertain=True, free_bytes=150)
+    assert (count, freed) == (1, 200)
+    assert (psx / "Beta (Japan).chd").exists()
+    assert not (psx / "Gamma (Japan).chd").exists()
+
+
+def test_apply_removal_uses_scan_sizes_for_game_folders(tmp_roms_dir: Path, monkeypatch) -> None:
+    """A game folder is selected and recorded at its scan-time tree size, with no walk."""
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    (psx / "Game (USA).chd").write_bytes(b"x")
+    folder = psx / "Game (Japan)"
+    (folder / "extras").mkdir(parents=True)
+    (folder / "game.cue").write_bytes(b"c")
+    (folder / "extras" / "movie.str").write_bytes(b"m" * 100_000)
+    report = dry_run(tmp_roms_dir)
+    monkeypatch.setattr(actions, "_size_of_path", lambda p: pytest.fail("walk at apply time"))
+    count, freed = apply_removal(tmp_roms_dir, report, free_bytes=1)
+    assert (count, freed) == (1, 100_001)
+    with Manifest(tmp_roms_dir / "_duplicates_removed") as manifest:
+        assert manifest.total_bytes() == 100_001
@@ -0,0 +1,97 @@
+"""Tests for the synthetic library generator and benchmark runner."""
+
+import json
+from pathlib import Path
+
+from benchmarks.hashing import METHODS, measure_hashing, write_files
+from benchmarks.run import STAGES, compare, main, run_benchmarks
+from benchmarks.seeks import STAGES as SEEK_STAGES
+from benchmarks.seeks import measure_seeks
+from benchmarks.synth import generate_library
+from rom_deduper.actions import dry_run
+from rom_deduper.scanner import scan
+
+
+def test_generate_library_hits_file_count(tmp_roms_dir: Path) -> None:
+    """Generator writes exactly the requested number of files."""
+    stats = generate_library(tmp_roms_dir, 300, seed=1)
+    on_disk = [p for p in tmp_roms_dir.rglob("*") if p.is_file()]
+    assert stats.files == 300
+    assert len(on_disk) == 300
+
+
+def test_generate_library_is_deterministic(tmp_path: Path) -> None:
+    """Same seed yields the same tree."""
+    generate_library(tmp_path / "a", 200, seed=7)
+    generate_library(tmp_path / "b", 200, seed=7)
+    names_a = sorted(str(p.relative_to(tmp_path / "a")) for p in (tmp_path / "a").rglob("*"))
+    names_b = sorted(str(p.relative_to(tmp_path / "b")) for p in (tmp_path / "b").rglob("*"))
+    assert names_a == names_b
+
+
+def test_generate_library_has_realistic_layouts(tmp_roms_dir: Path) -> None:
+    """Tree contains multi-disc sets, m3u playlists, game folders, zips and sparse CHDs."""
+    stats = generate_library(tmp_roms_dir, 600, seed=3, chd_bytes=1 << 30)
+    assert stats.multi_disc_sets > 0
+    assert stats.m3u_playlists > 0
+    assert stats.game_folders > 0
+    assert stats.zips > 0
+    chd = next(tmp_roms_dir.rglob("*.chd"))
+    assert chd.stat().st_size == 1 << 30
+    assert stats.bytes_apparent > 1 << 30
+
+
+def test_generated_library_has_duplicates(tmp_roms_dir: Path) -> None:
+    """Scanning a generated tree finds entries and duplicate groups."""
+    generate_library(tmp_roms_dir, 300, seed=5)
+    assert len(scan(tmp_roms_dir)) > 0
+    assert dry_run(tmp_roms_dir).duplicate_groups > 0
+
+
+def test_run_benchmarks_times_every_stage(tmp_roms_dir: Path) -> None:
+    """Runner reports a timing for every stage and leaves the tree restored."""
+    generate_library(tmp_roms_dir, 150, seed=2)
+    before = sorted(p.name for p in tmp_roms_dir.rglob("*") if p.is_file())
+    timings = run_benchmarks(tmp_roms_dir, repeat=1)
+    assert set(timings) == set(STAGES)
+    after = sorted(p.name for p in tmp_roms_dir.rglob("*") if p.is_file())
+    assert after == before
+
+
+def test_compare_flags_regressions() -> None:
+    """Stages slower than the allowed ratio are reported."""
+    baseline = {"timings": {"scan": 1.0, "dry_run": 1.0}}
+    assert compare({"scan": 1.2, "dry_run": 3.0}, baseline, 1.5) == [
+        "dry_run: 3.0000s vs baseline 1.0000s"
+    ]
+
+
+def test_main_saves_baseline(tmp_path: Path) -> None:
+    """Runner CLI writes a baseline JSON with timings."""
+    out = tmp_path / "baseline.json"
+    assert main(["--files", "100", "--repeat", "1", "--save-baseline", str(out)]) == 0
+    data = json.loads(out.read_text())
+    assert data["files"] == 100
+    assert set(data["timings"]) == set(STAGES)
+
+
+def test_seek_benchmark_hdd_order_reduces_inode_distance(tmp_roms_dir: Path) -> None:
+    """HDD ordering never jumps further than the default order, and the tree is restored."""
+    generate_library(tmp_roms_dir, 300, seed=4)
+    before = sorted(p.name for p in tmp_roms_dir.rglob("*") if p.is_file())
+    results = measure_seeks(tmp_roms_dir)
+    for stage in SEEK_STAGES:
+        default, hdd = results[stage]["default"], results[stage]["hdd"]
+        assert len(hdd.ops) == len(default.ops) > 0
+        assert hdd.inode_distance <= default.inode_distance
+        assert hdd.dir_switches <= default.dir_switches
+    assert sorted(p.name for p in tmp_roms_dir.rglob("*") if p.is_file()) == before
+
+
+def test_measure_hashing_compares_every_method(tmp_path: Path) -> None:
+    """Every method is timed and traced, and full-file methods agree with read()."""
+    paths = write_files(tmp_path, 2, 300_000)
+    results = measure_hashing(paths, repeat=1, workers=2)
+    assert set(results) == set(METHODS)
+    assert all(r["seconds"] >= 0 for r in results.values())
+    assert results["readinto"]["peak_bytes"] < results["read"]["peak_bytes"]
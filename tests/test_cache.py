@@ -0,0 +1,131 @@
+"""Tests for cache module."""
+
+import os
+import sys
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from rom_deduper import policy
+from rom_deduper.actions import dry_run
+from rom_deduper.cache import CACHE_FILENAME, RankCache
+from rom_deduper.cli import main
+from rom_deduper.config import Config
+
+
+def _make_library(roms: Path) -> Path:
+    psx = roms / "psx"
+    psx.mkdir()
+    for title in ("Alpha", "Beta", "Gamma"):
+        (psx / f"{title} (USA).chd").write_bytes(b"usa")
+        (psx / f"{title} (Japan).chd").write_bytes(b"japan")
+    return psx
+
+
+def _scan_with_cache(roms: Path, config: Config | None = None):
+    cache = RankCache.load(roms)
+    report = dry_run(roms, config=config, cache=cache)
+    cache.save()
+    return report
+
+
+def test_first_run_marks_every_group_changed(tmp_roms_dir: Path) -> None:
+    """With an empty cache, every duplicate group is new and so changed."""
+    _make_library(tmp_roms_dir)
+    report = _scan_with_cache(tmp_roms_dir)
+    assert report.duplicate_groups == 3
+    assert report.changed_groups == 3
+    assert (tmp_roms_dir / CACHE_FILENAME).exists()
+
+
+def test_unchanged_groups_served_from_cache(tmp_roms_dir: Path, monkeypatch) -> None:
+    """A second run over an unchanged tree parses nothing and reports no changes."""
+    _make_library(tmp_roms_dir)
+    first = _scan_with_cache(tmp_roms_dir)
+    calls = []
+    original = policy.parse_filename
+    monkeypatch.setattr(
+        policy, "parse_filename", lambda *a, **k: calls.append(a) or original(*a, **k)
+    )
+    second = _scan_with_cache(tmp_roms_dir)
+    assert calls == []
+    assert second.changed_groups == 0
+    assert [(g.keeper.name if g.keeper else None) for g in second.groups] == [
+        (g.keeper.name if g.keeper else None) for g in first.groups
+    ]
+    assert [[e.name for e in g.to_remove] for g in second.groups] == [
+        [e.name for e in g.to_remove] for g in first.groups
+    ]
+
+
+def test_only_modified_group_is_reranked(tmp_roms_dir: Path) -> None:
+    """Adding a better release to one group changes only that group's decision."""
+    psx = _make_library(tmp_roms_dir)
+    _scan_with_cache(tmp_roms_dir)
+    (psx / "Beta (USA) [!].chd").write_bytes(b"verified")
+    report = _scan_with_cache(tmp_roms_dir)
+    changed = [g.base_title for g in report.groups if g.changed]
+    assert changed == ["beta"]
+
+
+def test_touching_a_file_reranks_but_same_decision_is_unchanged(tmp_roms_dir: Path) -> None:
+    """A new mtime re-ranks the group; an identical decision is not reported as changed."""
+    psx = _make_library(tmp_roms_dir)
+    _scan_with_cache(tmp_roms_dir)
+    target = psx / "Alpha (Japan).chd"
+    st = target.stat()
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    report = _scan_with_cache(tmp_roms_dir)
+    assert report.changed_groups == 0
+
+
+def test_fingerprint_covers_files_nested_in_game_folders(tmp_roms_dir: Path) -> None:
+    """Resizing a file in a game folder's subfolder changes the group fingerprint."""
+    from rom_deduper.cache import fingerprint
+    from rom_deduper.grouper import group_entries
+    from rom_deduper.scanner import scan
+
+    game_dir = tmp_roms_dir / "psx" / "Game (Europe)"
+    (game_dir / "extras").mkdir(parents=True)
+    (game_dir / "game.cue").write_bytes(b"x")
+    (game_dir / "extras" / "big.dat").write_bytes(b"x")
+    (tmp_roms_dir / "psx" / "Game (USA).chd").write_bytes(b"x")
+
+    def digest() -> str:
+        return fingerprint(group_entries(scan(tmp_roms_dir))[0], str(tmp_roms_dir), "policy")
+
+    before = digest()
+    (game_dir / "extras" / "big.dat").write_bytes(b"x" * 100_000)
+    assert digest() != before
+
+
+def test_config_change_invalidates_cache(tmp_roms_dir: Path) -> None:
+    """A different region priority changes the policy digest and every decision."""
+    _make_library(tmp_roms_dir)
+    _scan_with_cache(tmp_roms_dir)
+    config = Config(exclude_consoles=set(), translation_patterns=[], region_priority=["Japan"])
+    report = _scan_with_cache(tmp_roms_dir, config)
+    assert report.changed_groups == 3
+    assert all(g.keeper and "Japan" in g.keeper.name for g in report.groups)
+
+
+def test_corrupt_cache_is_ignored(tmp_roms_dir: Path) -> None:
+    """An unreadable cache file behaves like an empty cache."""
+    _make_library(tmp_roms_dir)
+    (tmp_roms_dir / CACHE_FILENAME).write_text("{not json")
+    assert RankCache.load(tmp_roms_dir).decisions == {}
+    assert _scan_with_cache(tmp_roms_dir).changed_groups == 3
+
+
+def test_cli_scan_changed_only(tmp_roms_dir: Path) -> None:
+    """scan --changed-only lists only groups whose decision changed since the last scan."""
+    psx = _make_library(tmp_roms_dir)
+    main(["scan", str(tmp_roms_dir), "-q"])
+    (psx / "Gamma (Europe).chd").write_bytes(b"europe")
+    buf = StringIO()
+    with patch.object(sys, "stdout", buf):
+        main(["scan", str(tmp_roms_dir), "--changed-only"])
+    out = buf.getvalue()
+    assert "Changed since last scan: 1" in out
+    assert "Gamma (Europe)" in out
+    assert "Alpha (Japan)" not in out
@@ -0,0 +1,68 @@
+"""Tests for CLI startup cost (lazy imports)."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative import time allowed for rom_deduper.cli, in microseconds (-X importtime units).
+# Typical is ~35 ms; an eager import of actions (ranker, policy, scanner) adds ~50 ms.
+IMPORT_BUDGET_US = 75_000
+
+HEAVY_MODULES = ("rich", "send2trash")
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess[str]:
+    """Run code in a fresh interpreter."""
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=REPO_ROOT,
+    )
+
+
+def _imported_modules(code: str) -> set[str]:
+    """Top-level module names loaded after running code in a fresh interpreter."""
+    out = _run(code + "\nimport sys\nprint('\\n'.join(sys.modules))").stdout
+    return {name.split(".")[0] for name in out.split()}
+
+
+def test_cli_import_skips_heavy_modules() -> None:
+    """Importing the CLI does not load rich or send2trash, nor the scan and rank modules."""
+    modules = _imported_modules("import rom_deduper.cli")
+    assert not modules & set(HEAVY_MODULES)
+    out = _run("import sys\nimport rom_deduper.cli\nprint('\\n'.join(sys.modules))").stdout
+    assert not set(out.split()) & {"rom_deduper.actions", "rom_deduper.ranker"}
+
+
+def test_quiet_restore_skips_rich(tmp_path: Path) -> None:
+    """restore -q with nothing staged prints plain text and never loads rich."""
+    code = f"from rom_deduper.cli import main\nmain(['restore', {str(tmp_path)!r}, '-q'])"
+    assert "Restored 0 file(s)" in _run(code).stdout
+    assert not _imported_modules(code) & set(HEAVY_MODULES)
+
+
+def test_cli_help_skips_heavy_modules() -> None:
+    """--help exits before any heavy module is imported."""
+    code = (
+        "from rom_deduper.cli import main\ntry:\n    main(['--help'])\nexcept SystemExit:\n    pass"
+    )
+    modules = _imported_modules(code)
+    assert not modules & set(HEAVY_MODULES)
+
+
+def test_cli_import_time_under_budget() -> None:
+    """Cold import of rom_deduper.cli stays under the startup budget."""
+    stderr = _run("import rom_deduper.cli", "-X", "importtime").stderr
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        if cum.isdigit():
+            cumulative[name] = int(cum)
+    assert "rom_deduper.cli" in cumulative
+    assert cumulative["rom_deduper.cli"] < IMPORT_BUDGET_US
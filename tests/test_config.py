@@ -43,6 +43,29 @@ def test_load_config_explicit_path_overrides_roms_root(tmp_path: pathlib.Path) -
     assert cfg.exclude_consoles == {"explicit"}
 
 
+def test_load_config_reads_console_aliases(tmp_path: pathlib.Path) -> None:
+    """console_aliases load with case-insensitive alias keys."""
+    (tmp_path / "config.json").write_text(
+        json.dumps({"console_aliases": {"MegaDrive": "genesis", "sfc": "snes"}})
+    )
+    cfg = load_config(tmp_path)
+    assert cfg.console_aliases == {"megadrive": "genesis", "sfc": "snes"}
+
+
+def test_load_config_reads_ignore_globs(tmp_path: pathlib.Path) -> None:
+    """ignore_globs load as a list of strings; default is empty."""
+    assert load_config(tmp_path).ignore_globs == []
+    (tmp_path / "config.json").write_text(json.dumps({"ignore_globs": ["media", "*/manuals"]}))
+    assert load_config(tmp_path).ignore_globs == ["media", "*/manuals"]
+
+
+def test_load_config_reads_hdd_order(tmp_path: pathlib.Path) -> None:
+    """hdd_order loads as a bool; default is off."""
+    assert load_config(tmp_path).hdd_order is False
+    (tmp_path / "config.json").write_text(json.dumps({"hdd_order": True}))
+    assert load_config(tmp_path).hdd_order is True
+
+
 def _capture_main(args: list[str]) -> str:
     """Run main with args and return stdout."""
     import sys
@@ -0,0 +1,115 @@
+"""Tests for cross module."""
+
+import sys
+import threading
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from rom_deduper import cross
+from rom_deduper.cli import main
+from rom_deduper.config import Config
+from rom_deduper.cross import find_cross_duplicates
+from rom_deduper.hashing import PARTIAL_BYTES
+from rom_deduper.merkle import HashCache
+
+
+def _write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_finds_same_file_in_two_consoles(tmp_roms_dir: Path) -> None:
+    """A file copied into genesis/ and megadrive/ is reported; same-size different files are not."""
+    _write(tmp_roms_dir / "genesis" / "Sonic (USA).md", b"sonic")
+    _write(tmp_roms_dir / "megadrive" / "Sonic the Hedgehog (World).md", b"sonic")
+    _write(tmp_roms_dir / "megadrive" / "Other (USA).md", b"other")
+    report = find_cross_duplicates([tmp_roms_dir])
+    assert len(report.duplicates) == 1
+    names = sorted(e.name for _, e in report.duplicates[0].copies)
+    assert names == ["Sonic (USA).md", "Sonic the Hedgehog (World).md"]
+    assert report.reclaimable == len(b"sonic")
+
+
+def test_aliased_console_directories_are_still_separate_locations(tmp_roms_dir: Path) -> None:
+    """console_aliases merge grouping, but copies in both directories are still reported."""
+    _write(tmp_roms_dir / "snes" / "Mario (USA).sfc", b"mario")
+    _write(tmp_roms_dir / "sfc" / "Mario World (USA).sfc", b"mario")
+    config = Config(
+        exclude_consoles=set(),
+        translation_patterns=[],
+        region_priority=None,
+        console_aliases={"sfc": "snes"},
+    )
+    assert len(find_cross_duplicates([tmp_roms_dir], [config]).duplicates) == 1
+
+
+def test_finds_same_file_across_roots(tmp_path: Path) -> None:
+    """The same ROM on two library roots is reported; copies within one location are not."""
+    sd, nas = tmp_path / "sd", tmp_path / "nas"
+    big = b"x" * (2 * PARTIAL_BYTES + 10)
+    _write(sd / "psx" / "Game (USA).chd", big)
+    _write(nas / "psx" / "Game (USA).chd", big)
+    _write(nas / "snes" / "A (USA).sfc", b"same")
+    _write(nas / "snes" / "B (USA).sfc", b"same")
+    report = find_cross_duplicates([sd, nas])
+    assert len(report.duplicates) == 1
+    assert sorted(root for root, _ in report.duplicates[0].copies) == [0, 1]
+    assert report.hashed_files == 2
+
+
+def test_same_head_different_tail_is_not_a_duplicate(tmp_roms_dir: Path) -> None:
+    """Files that share their first and last bytes but differ in between are told apart by
+    the full hash."""
+    head, tail = b"h" * PARTIAL_BYTES, b"t" * PARTIAL_BYTES
+    _write(tmp_roms_dir / "psx" / "A (USA).chd", head + b"one" + tail)
+    _write(tmp_roms_dir / "saturn" / "A (USA).chd", head + b"two" + tail)
+    assert find_cross_duplicates([tmp_roms_dir]).duplicates == []
+
+
+def test_full_hashes_are_cached(tmp_path: Path) -> None:
+    """A second run with saved hash caches reads no file in full."""
+    roots = [tmp_path / "a", tmp_path / "b"]
+    for root in roots:
+        _write(root / "psx" / "Game (USA).chd", b"y" * (2 * PARTIAL_BYTES + 1))
+    caches = [HashCache.load(r) for r in roots]
+    assert find_cross_duplicates(roots, caches=caches).hashed_files == 2
+    for c in caches:
+        c.save()
+    report = find_cross_duplicates(roots, caches=[HashCache.load(r) for r in roots])
+    assert report.hashed_files == 0
+    assert len(report.duplicates) == 1
+
+
+def test_each_root_scanned_by_its_own_worker(tmp_path: Path, monkeypatch) -> None:
+    """Roots are scanned concurrently: a blocked root does not stop another from finishing."""
+    slow, fast = tmp_path / "slow", tmp_path / "fast"
+    _write(slow / "psx" / "Game (USA).chd", b"z")
+    _write(fast / "psx" / "Game (USA).chd", b"z")
+    fast_done = threading.Event()
+    original = cross.scan
+
+    def scan(root, config=None):
+        if Path(root) == slow:
+            assert fast_done.wait(timeout=5), "slow root blocked the fast one"
+        entries = original(root, config)
+        if Path(root) == fast:
+            fast_done.set()
+        return entries
+
+    monkeypatch.setattr(cross, "scan", scan)
+    assert len(find_cross_duplicates([slow, fast]).duplicates) == 1
+
+
+def test_cli_cross(tmp_path: Path, monkeypatch) -> None:
+    """The cross command prints duplicate sets across the given roots."""
+    monkeypatch.setenv("COLUMNS", "200")  # Long temp paths would wrap in the table
+    sd, nas = tmp_path / "sd", tmp_path / "nas"
+    _write(sd / "snes" / "Game (USA).sfc", b"rom")
+    _write(nas / "sfc" / "Game (USA).sfc", b"rom")
+    buf = StringIO()
+    with patch.object(sys, "stdout", buf):
+        main(["cross", str(sd), str(nas)])
+    out = buf.getvalue()
+    assert "Duplicate sets: 1" in out
+    assert "Game (USA).sfc" in out
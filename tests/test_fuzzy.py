@@ -0,0 +1,116 @@
+"""Tests for fuzzy module."""
+
+import sys
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from rom_deduper import fuzzy
+from rom_deduper.actions import dry_run
+from rom_deduper.cli import main
+from rom_deduper.fuzzy import canonical_title, merge_fuzzy
+from rom_deduper.grouper import GameGroup, group_entries
+from rom_deduper.scanner import ROMEntry
+
+
+def _groups(console: str, names: list[str]) -> list[GameGroup]:
+    return group_entries([ROMEntry(Path("/roms", console, n), console) for n in names])
+
+
+def test_canonical_title_drops_punctuation() -> None:
+    """Colons, dashes and repeated spaces do not affect the canonical form."""
+    assert canonical_title("castlevania: symphony of the night") == canonical_title(
+        "castlevania - symphony of the night"
+    )
+
+
+def test_punctuation_variants_merge() -> None:
+    """Titles differing only in punctuation or a small typo end up in one group."""
+    groups = _groups(
+        "psx",
+        [
+            "Castlevania - Symphony of the Night (USA).chd",
+            "Castlevania: Symphony of the Night (Japan).chd",
+            "Metal Gear Solid - Special Missions (USA).chd",
+            "Metal Gear Solid Special Misions (Europe).chd",
+        ],
+    )
+    assert len(groups) == 4
+    merged, merges = merge_fuzzy(groups)
+    assert len(merged) == 2
+    assert sorted(len(g.entries) for g in merged) == [2, 2]
+    assert len(merges) == 2
+    assert all(m.console == "psx" and m.similarity >= 0.8 for m in merges)
+
+
+def test_sequels_and_other_consoles_never_merge() -> None:
+    """Differing numbers or roman numerals, and different consoles, stay separate."""
+    groups = _groups("psx", ["Final Fantasy VII (USA).chd", "Final Fantasy VIII (USA).chd"])
+    groups += _groups("psx", ["Tekken 2 (USA).chd", "Tekken 3 (USA).chd"])
+    groups += _groups("snes", ["Castlevania: Symphony of the Night (USA).zip"])
+    groups += _groups("psx", ["Castlevania - Symphony of the Night (USA).chd"])
+    merged, merges = merge_fuzzy(groups)
+    assert len(merged) == len(groups)
+    assert merges == []
+
+
+def test_words_that_look_like_numerals_do_not_block_merges() -> None:
+    """Only a well-formed trailing roman numeral is a sequel marker; "ill", "lil", "civic"
+    and mid-title numerals are ordinary words."""
+    for title in ("ill bleed", "lil monster", "civic racing", "rocky iv the movie"):
+        assert fuzzy._sequel_tokens(title) == ("",)
+    assert fuzzy._sequel_tokens("final fantasy viii") == ("viii",)
+    groups = _groups(
+        "psx",
+        ["Ill Gotten Gains Deluxe (USA).chd", "Il Gotten Gains Deluxe (Europe).chd"],
+    )
+    groups += _groups(
+        "psx", ["Lil Dragon Adventure (USA).chd", "Lill Dragon Adventure (Japan).chd"]
+    )
+    merged, merges = merge_fuzzy(groups)
+    assert len(merged) == 2
+    assert len(merges) == 2
+
+
+def test_candidate_pairs_scale_linearly(monkeypatch) -> None:
+    """Only LSH bucket-mates are verified, so comparisons grow with n, not n**2."""
+    calls = []
+    original = fuzzy._jaccard
+    monkeypatch.setattr(fuzzy, "_jaccard", lambda a, b: calls.append(1) or original(a, b))
+    words = ["Dragon", "Quest", "Star", "Ocean", "Shadow", "Knight", "River", "Blade"]
+    names = [
+        f"{words[i % 8]} {words[i // 8 % 8]} {words[i // 64 % 8]} Saga {i} (USA).chd"
+        for i in range(2000)
+    ]
+    merged, merges = merge_fuzzy(_groups("psx", names))
+    assert len(merged) == 2000
+    assert merges == []
+    assert len(calls) < 20 * 2000  # a pairwise scan would be ~2,000,000
+
+
+def test_dry_run_fuzzy_reports_merges(tmp_roms_dir: Path, make_config) -> None:
+    """dry_run(fuzzy=...) ranks merged groups together and lists the merges."""
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    (psx / "Castlevania - Symphony of the Night (USA).chd").write_bytes(b"x")
+    (psx / "Castlevania: Symphony of the Night (Japan).chd").write_bytes(b"x")
+    assert dry_run(tmp_roms_dir, config=make_config()).duplicate_groups == 0
+    report = dry_run(tmp_roms_dir, config=make_config(), fuzzy=0.8)
+    assert report.duplicate_groups == 1
+    assert report.groups[0].keeper is not None
+    assert "USA" in report.groups[0].keeper.name
+    assert len(report.fuzzy_merges) == 1
+
+
+def test_cli_scan_fuzzy(tmp_roms_dir: Path) -> None:
+    """scan --fuzzy prints the merges it made."""
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    (psx / "Castlevania - Symphony of the Night (USA).chd").write_bytes(b"x")
+    (psx / "Castlevania: Symphony of the Night (Japan).chd").write_bytes(b"x")
+    buf = StringIO()
+    with patch.object(sys, "stdout", buf):
+        main(["scan", str(tmp_roms_dir), "--fuzzy", "--no-cache"])
+    out = buf.getvalue()
+    assert "Fuzzy merges: 1" in out
+    assert "Duplicate groups: 1" in out
@@ -74,6 +74,31 @@ def test_group_multidisk_same_group(tmp_roms_dir: Path) -> None:
     assert len(groups[0].entries) >= 3  # 3 discs + m3u
 
 
+def test_group_builds_disc_sets_per_release(tmp_roms_dir: Path) -> None:
+    """Discs are collected into one ordered set per release variant; m3u is not a disc."""
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    for name in (
+        "Game (USA) (Disc 2).chd",
+        "Game (USA) (Disc 1).chd",
+        "Game (Japan) (Disc 1).chd",
+        "Game (Japan) (Disc 3).chd",
+    ):
+        (psx / name).write_bytes(b"x")
+    (psx / "Game (USA).m3u").write_text("Game (USA) (Disc 1).chd\n")
+    groups = group_entries(scan(tmp_roms_dir))
+    assert len(groups) == 1
+    sets = {s.variant[0]: s for s in groups[0].disc_sets}
+    assert set(sets) == {"USA", "Japan"}
+    assert [e.name for e in sets["USA"].discs] == [
+        "Game (USA) (Disc 1).chd",
+        "Game (USA) (Disc 2).chd",
+    ]
+    assert groups[0].disc_count == 3
+    assert sets["USA"].missing(groups[0].disc_count) == [3]
+    assert sets["Japan"].missing() == [2]
+
+
 def test_group_associates_bin_cue(tmp_roms_dir: Path) -> None:
     """bin and cue with same stem are associated."""
     psx = tmp_roms_dir / "psx"
@@ -0,0 +1,121 @@
+"""Tests for hashing module."""
+
+import hashlib
+import os
+import threading
+import time
+import tracemalloc
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from rom_deduper import hashing
+from rom_deduper.hashing import (
+    EDGES,
+    HEAD,
+    PARTIAL_BYTES,
+    device_limit,
+    file_crc32,
+    file_digest,
+    hash_files,
+    run_per_device,
+)
+
+
+def _data(size: int) -> bytes:
+    return bytes(i * 7 % 251 for i in range(size))
+
+
+def test_file_digest_full_and_partial(tmp_path: Path, monkeypatch) -> None:
+    """Full digests span every chunk; HEAD and EDGES cover only the ends of large files."""
+    monkeypatch.setattr(hashing, "CHUNK", 1000)
+    data = _data(3 * PARTIAL_BYTES + 17)
+    path = tmp_path / "game.bin"
+    path.write_bytes(data)
+    n = PARTIAL_BYTES
+    assert file_digest(str(path)) == hashlib.sha1(data).hexdigest()
+    assert file_digest(str(path), span=HEAD) == hashlib.sha1(data[:n]).hexdigest()
+    assert file_digest(str(path), span=EDGES) == hashlib.sha1(data[:n] + data[-n:]).hexdigest()
+    assert file_digest(str(path), "md5") == hashlib.md5(data).hexdigest()
+
+
+def test_partial_digest_of_small_file_is_full_digest(tmp_path: Path) -> None:
+    """A file no longer than the partial span hashes the same whatever the span."""
+    path = tmp_path / "small.bin"
+    path.write_bytes(_data(PARTIAL_BYTES + 5))
+    full = file_digest(str(path))
+    assert file_digest(str(path), span=EDGES) == full
+    path.write_bytes(b"")
+    assert file_digest(str(path), span=HEAD) == hashlib.sha1(b"").hexdigest()
+
+
+def test_crc32(tmp_path: Path, monkeypatch) -> None:
+    """CRC32 is available as an algorithm and as (size, crc)."""
+    monkeypatch.setattr(hashing, "CHUNK", 7)
+    data = _data(1000)
+    path = tmp_path / "rom.bin"
+    path.write_bytes(data)
+    assert file_crc32(str(path)) == (1000, zlib.crc32(data))
+    assert file_digest(str(path), "crc32") == f"{zlib.crc32(data):08x}"
+
+
+def test_hashing_reuses_one_buffer(tmp_path: Path, monkeypatch) -> None:
+    """After the first call, hashing allocates no chunk-sized buffers."""
+    monkeypatch.setattr(hashing, "CHUNK", 64 * 1024)
+    path = tmp_path / "big.bin"
+    path.write_bytes(os.urandom(2 << 20))
+    file_digest(str(path))
+    tracemalloc.start()
+    file_digest(str(path))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < hashing.CHUNK // 4
+
+
+def test_hash_files_inline_and_pooled(tmp_path: Path, monkeypatch) -> None:
+    """Pooled and in-process hashing agree; unreadable paths are left out."""
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"rom{i}.bin"
+        path.write_bytes(_data(1000 + i))
+        paths.append(str(path))
+    expected = {p: hashlib.sha1(Path(p).read_bytes()).hexdigest() for p in paths}
+    missing = str(tmp_path / "missing.bin")
+    assert hash_files([*paths, missing]) == expected
+    monkeypatch.setattr(hashing, "INLINE_BYTES", 0)
+    assert hash_files([*paths, missing], workers=2) == expected
+    assert hash_files(paths, workers=2, per_device=1, span=EDGES) == expected
+
+
+def test_run_per_device_caps_each_device(tmp_path: Path) -> None:
+    """No device ever has more jobs in flight than its limit, nor the pool more than slots."""
+    queues = {1: deque(f"hdd{i}" for i in range(6)), 2: deque(f"ssd{i}" for i in range(6))}
+    limits = {1: 1, 2: 3}
+    lock = threading.Lock()
+    running = {"hdd": 0, "ssd": 0}
+    peak = {"hdd": 0, "ssd": 0, "all": 0}
+
+    def job(path: str) -> str:
+        dev = path[:3]
+        with lock:
+            running[dev] += 1
+            peak[dev] = max(peak[dev], running[dev])
+            peak["all"] = max(peak["all"], sum(running.values()))
+        time.sleep(0.01)
+        with lock:
+            running[dev] -= 1
+        return path.upper()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = dict(run_per_device(pool, job, queues, limits, slots=3))
+    assert len(results) == 12
+    assert results["ssd5"] == "SSD5"
+    assert peak["hdd"] == 1
+    assert peak["ssd"] <= 3
+    assert peak["all"] <= 3
+
+
+def test_device_limit_defaults_to_workers() -> None:
+    """Devices sysfs does not know (tmpfs, overlay, non-Linux) get the full worker count."""
+    assert device_limit(os.makedev(0, 4095), 6) == 6
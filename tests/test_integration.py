@@ -32,7 +32,7 @@ def test_e2e_scan_apply_restore_flow(tmp_path: pathlib.Path) -> None:
     assert (psx / "Game (Japan).chd").exists()
     assert (psx / "Game (Japan).chd").read_bytes() == b"japan"
     assert not (staging / "Game (Japan).chd").exists()
-    assert not (tmp_path / "_duplicates_removed" / ".manifest.json").exists()
+    assert not (tmp_path / "_duplicates_removed" / ".manifest.sqlite").exists()
 
 
 def test_e2e_apply_hard_removes_files(tmp_path: pathlib.Path) -> None:
@@ -45,7 +45,7 @@ def test_e2e_apply_hard_removes_files(tmp_path: pathlib.Path) -> None:
     def fake_trash(path: str) -> None:
         pathlib.Path(path).unlink()
 
-    with patch("rom_deduper.actions.send2trash.send2trash", side_effect=fake_trash):
+    with patch("send2trash.send2trash", side_effect=fake_trash):
         main(["apply", str(tmp_path), "--hard"])
 
     assert not (psx / "Game (Japan).chd").exists()
@@ -155,13 +155,13 @@ def test_e2e_apply_skip_uncertain_preserves_files(tmp_path: pathlib.Path) -> Non
     (psx / "Game (USA).chd").write_bytes(b"x")
     (psx / "Game (Japan).chd").write_bytes(b"x")
 
-    def dry_run_uncertain(roms_root, config=None):
-        r = dry_run(roms_root, config)
+    def dry_run_uncertain(roms_root, config=None, **kwargs):
+        r = dry_run(roms_root, config, **kwargs)
         if r.groups:
             r.groups[0].uncertain = True
         return r
 
-    with patch("rom_deduper.cli.dry_run", side_effect=dry_run_uncertain):
+    with patch("rom_deduper.actions.dry_run", side_effect=dry_run_uncertain):
         main(["apply", str(tmp_path), "--skip-uncertain"])
     assert (psx / "Game (Japan).chd").exists()
 
@@ -198,3 +198,18 @@ def test_cli_scan_debug_shows_extra_info(tmp_path: pathlib.Path) -> None:
     out = _capture_main(["scan", str(tmp_path), "--debug"])
     assert "Game (USA)" in out or "game" in out.lower()
     assert "debug" in out.lower() or "group" in out.lower() or "console" in out.lower()
+
+
+def test_cli_apply_free_stops_at_target(tmp_path: pathlib.Path) -> None:
+    """apply --free removes the largest duplicates first and leaves the rest."""
+    psx = tmp_path / "psx"
+    psx.mkdir()
+    for title, size in (("Big", 3072), ("Small", 10)):
+        (psx / f"{title} (USA).chd").write_bytes(b"k" * size)
+        (psx / f"{title} (Japan).chd").write_bytes(b"d" * size)
+    out = _capture_main(["apply", str(tmp_path), "--free", "2K", "-v"])
+    assert "Big (Japan)" in out
+    assert "Small (Japan)" not in out
+    assert (psx / "Small (Japan).chd").exists()
+    out = _capture_main(["apply", str(tmp_path), "--free", "1G", "-q"])
+    assert "Only 10 B" in out
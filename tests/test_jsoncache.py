@@ -0,0 +1,24 @@
+"""Tests for jsoncache module."""
+
+from pathlib import Path
+
+from rom_deduper.jsoncache import load_section, save_section
+
+
+def test_section_round_trips(tmp_path: Path) -> None:
+    """A saved section loads back unchanged for the same version."""
+    path = tmp_path / "cache.json"
+    save_section(path, 1, "files", {"psx/a.bin": [1, 2, "abc"]})
+    assert load_section(path, 1, "files") == {"psx/a.bin": [1, 2, "abc"]}
+
+
+def test_unusable_files_load_empty(tmp_path: Path) -> None:
+    """Missing, corrupt, wrongly shaped or other-version files load as an empty section."""
+    path = tmp_path / "cache.json"
+    assert load_section(path, 1, "files") == {}
+    for text in ("{not json", "[1, 2]", '{"version": 1, "files": []}'):
+        path.write_text(text)
+        assert load_section(path, 1, "files") == {}
+    save_section(path, 1, "files", {"a": 1})
+    assert load_section(path, 2, "files") == {}
+    assert load_section(path, 1, "groups") == {}
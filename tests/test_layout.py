@@ -0,0 +1,37 @@
+"""Tests for layout module."""
+
+import os
+from pathlib import Path
+
+from rom_deduper.layout import disk_order, inode_map
+
+
+def test_inode_map_lists_names_once(tmp_path: Path) -> None:
+    """inode_map matches lstat inode numbers; an unreadable directory maps to nothing."""
+    for name in ("b", "a", "c"):
+        (tmp_path / name).write_bytes(b"x")
+    assert inode_map(str(tmp_path)) == {
+        name: os.lstat(tmp_path / name).st_ino for name in ("a", "b", "c")
+    }
+    assert inode_map(str(tmp_path / "missing")) == {}
+
+
+def test_disk_order_groups_directories_then_sorts_by_inode(tmp_path: Path) -> None:
+    """Items are batched per directory (in path order) and inode-ordered within each;
+    missing files go last in their directory."""
+    a, b = tmp_path / "a", tmp_path / "b"
+    a.mkdir()
+    b.mkdir()
+    paths = []
+    for directory in (b, a):
+        for name in ("z", "m", "q"):
+            (directory / name).write_bytes(b"x")
+            paths.append(str(directory / name))
+    paths.append(str(a / "gone"))
+    mixed = [paths[i] for i in (6, 0, 3, 1, 4, 2, 5)]
+    ordered = disk_order(mixed, lambda p: p)
+    assert [os.path.dirname(p) for p in ordered] == [str(a)] * 4 + [str(b)] * 3
+    for directory in (a, b):
+        present = [p for p in ordered if os.path.dirname(p) == str(directory) and os.path.exists(p)]
+        assert [os.lstat(p).st_ino for p in present] == sorted(os.lstat(p).st_ino for p in present)
+    assert ordered[3] == str(a / "gone")
@@ -0,0 +1,264 @@
+"""Tests for manifest module."""
+
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from rom_deduper.actions import apply_removal, dry_run, purge, restore, staging_status
+from rom_deduper.cli import main
+from rom_deduper.manifest import (
+    LEGACY_MANIFEST_FILENAME,
+    LEGACY_RUN_ID,
+    MANIFEST_FILENAME,
+    Manifest,
+    StagedFile,
+)
+
+
+def _row(dest: str, orig: str, run_id: str = "run-1", size: int = 1) -> StagedFile:
+    return StagedFile(dest, orig, size, orig.split("/", 1)[0], "game", 1.0, run_id)
+
+
+def test_add_remove_and_totals(tmp_path: Path) -> None:
+    """Rows are stored with their metadata; re-adding a dest_rel replaces it."""
+    staging = tmp_path / "_duplicates_removed"
+    with Manifest(staging) as manifest:
+        manifest.add([_row("s/psx/A.chd", "psx/A.chd", size=10), _row("s/psx/B.chd", "psx/B.chd")])
+        manifest.add([_row("s/psx/A.chd", "psx/A.chd", size=20)])
+        assert len(manifest) == 2
+        assert manifest.total_bytes() == 21
+        manifest.remove(["s/psx/B.chd"])
+    with Manifest(staging) as manifest:
+        assert [(r.dest_rel, r.bytes, r.run_id) for r in manifest.files()] == [
+            ("s/psx/A.chd", 20, "run-1")
+        ]
+
+
+def test_queries_are_indexed(tmp_path: Path) -> None:
+    """The columns restores and audits select on are indexed."""
+    staging = tmp_path / "_duplicates_removed"
+    with Manifest(staging) as manifest:
+        manifest.add([_row("s/psx/A.chd", "psx/A.chd")])
+    db = sqlite3.connect(staging / MANIFEST_FILENAME)
+    indexed = [row[0] for row in db.execute("SELECT sql FROM sqlite_master WHERE type='index'")]
+    db.close()
+    joined = " ".join(s for s in indexed if s)
+    for column in ("console", "base_title", "run_id", "staged_at", "orig_rel"):
+        assert column in joined
+
+
+def test_empty_manifest_leaves_nothing_behind(tmp_path: Path) -> None:
+    """Closing an empty manifest deletes the database and the bare staging dir."""
+    staging = tmp_path / "_duplicates_removed"
+    Manifest(staging).close()
+    assert not staging.exists()
+
+
+def test_legacy_json_is_imported(tmp_roms_dir: Path) -> None:
+    """A .manifest.json is moved into the database with sizes and consoles, then deleted."""
+    staging = tmp_roms_dir / "_duplicates_removed"
+    (staging / "psx").mkdir(parents=True)
+    (staging / "psx" / "Game (Japan).chd").write_bytes(b"japan")
+    legacy = staging / LEGACY_MANIFEST_FILENAME
+    legacy.write_text(
+        json.dumps({"_duplicates_removed/psx/Game (Japan).chd": "psx/Game (Japan).chd"})
+    )
+    assert Manifest.exists(staging)
+    with Manifest(staging) as manifest:
+        rows = list(manifest.files())
+    assert not legacy.exists()
+    assert [(r.orig_rel, r.bytes, r.console, r.run_id) for r in rows] == [
+        ("psx/Game (Japan).chd", 5, "psx", LEGACY_RUN_ID)
+    ]
+
+
+def test_restore_keeps_only_skipped_rows(tmp_roms_dir: Path) -> None:
+    """Restored rows are dropped; a row skipped on conflict stays for a later restore."""
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    for name in ("A (USA).chd", "A (Japan).chd", "B (USA).chd", "B (Japan).chd"):
+        (psx / name).write_bytes(b"x")
+    apply_removal(tmp_roms_dir, dry_run(tmp_roms_dir))
+    (psx / "B (Japan).chd").write_bytes(b"new")
+    assert restore(tmp_roms_dir) == 1
+    staging = tmp_roms_dir / "_duplicates_removed"
+    with Manifest(staging) as manifest:
+        assert [r.orig_rel for r in manifest.files()] == ["psx/B (Japan).chd"]
+    assert restore(tmp_roms_dir, on_conflict="remove") == 0
+    assert not staging.exists()
+
+
+def test_restore_failure_keeps_manifest_in_step(tmp_roms_dir: Path, monkeypatch) -> None:
+    """Rows moved back before a failed move are dropped; the failed row stays staged."""
+    _stage_library(tmp_roms_dir)
+    rename = Path.rename
+    calls = []
+
+    def failing_rename(self: Path, target):
+        calls.append(self)
+        if len(calls) == 2:
+            raise OSError("disk gone")
+        return rename(self, target)
+
+    monkeypatch.setattr(Path, "rename", failing_rename)
+    with pytest.raises(OSError):
+        restore(tmp_roms_dir)
+    monkeypatch.undo()
+    restored = tmp_roms_dir / calls[0].relative_to(tmp_roms_dir / "_duplicates_removed")
+    assert restored.exists()
+    assert len(_staged(tmp_roms_dir)) == 2
+    assert restored.relative_to(tmp_roms_dir).as_posix() not in _staged(tmp_roms_dir)
+    assert restore(tmp_roms_dir) == 2
+
+
+def _stage_library(roms: Path) -> None:
+    """Stage two PSX titles and one SNES title in separate apply runs."""
+    psx, snes = roms / "psx", roms / "snes"
+    psx.mkdir()
+    snes.mkdir()
+    for name in (
+        "Final Fantasy VII (USA).chd",
+        "Final Fantasy VII (Japan).chd",
+        "The Legend of Dragoon (USA).chd",
+        "The Legend of Dragoon (Japan).chd",
+    ):
+        (psx / name).write_bytes(b"x")
+    apply_removal(roms, dry_run(roms), run_id="run-psx")
+    (snes / "Final Fantasy III (USA).sfc").write_bytes(b"x")
+    (snes / "Final Fantasy III (Japan).sfc").write_bytes(b"x")
+    apply_removal(roms, dry_run(roms), run_id="run-snes")
+
+
+def _staged(roms: Path) -> list[str]:
+    with Manifest(roms / "_duplicates_removed") as manifest:
+        return sorted(r.orig_rel for r in manifest.files())
+
+
+def test_restore_by_console_and_title(tmp_roms_dir: Path) -> None:
+    """Only rows matching every filter are restored; the others stay staged."""
+    _stage_library(tmp_roms_dir)
+    assert restore(tmp_roms_dir, console="psx", title="Final Fantasy*") == 1
+    assert (tmp_roms_dir / "psx" / "Final Fantasy VII (Japan).chd").exists()
+    assert _staged(tmp_roms_dir) == [
+        "psx/The Legend of Dragoon (Japan).chd",
+        "snes/Final Fantasy III (Japan).sfc",
+    ]
+
+
+def test_restore_title_glob_handles_leading_article(tmp_roms_dir: Path) -> None:
+    """Title globs are case-insensitive and match titles with a leading article."""
+    _stage_library(tmp_roms_dir)
+    assert restore(tmp_roms_dir, title="the legend*") == 1
+    assert (tmp_roms_dir / "psx" / "The Legend of Dragoon (Japan).chd").exists()
+
+
+def test_restore_leading_article_glob_requires_the_article(tmp_roms_dir: Path) -> None:
+    """A glob with a leading article selects only titles that have that article."""
+    _stage_library(tmp_roms_dir)
+    nes = tmp_roms_dir / "nes"
+    nes.mkdir()
+    (nes / "Legend of Kage (USA).nes").write_bytes(b"x")
+    (nes / "Legend of Kage (Japan).nes").write_bytes(b"x")
+    apply_removal(tmp_roms_dir, dry_run(tmp_roms_dir), run_id="run-nes")
+    assert restore(tmp_roms_dir, title="The Legend*") == 1
+    assert "nes/Legend of Kage (Japan).nes" in _staged(tmp_roms_dir)
+    assert restore(tmp_roms_dir, title="The *") == 0
+    assert len(_staged(tmp_roms_dir)) == 3
+
+
+def test_restore_by_run_leaves_other_rows_untouched(tmp_roms_dir: Path) -> None:
+    """Restoring one run neither moves nor rewrites the rows of another."""
+    _stage_library(tmp_roms_dir)
+    with Manifest(tmp_roms_dir / "_duplicates_removed") as manifest:
+        before = [r for r in manifest.files() if r.run_id == "run-psx"]
+    assert restore(tmp_roms_dir, run_id="run-snes") == 1
+    with Manifest(tmp_roms_dir / "_duplicates_removed") as manifest:
+        assert list(manifest.files()) == before
+        assert manifest.count(run_id="run-snes") == 0
+
+
+def test_cli_restore_filters(tmp_roms_dir: Path) -> None:
+    """restore --console/--title/--run select rows like the restore() filters."""
+    _stage_library(tmp_roms_dir)
+    main(["restore", str(tmp_roms_dir), "--console", "snes", "--title", "Final*", "-q"])
+    assert _staged(tmp_roms_dir) == [
+        "psx/Final Fantasy VII (Japan).chd",
+        "psx/The Legend of Dragoon (Japan).chd",
+    ]
+    main(["restore", str(tmp_roms_dir), "--run", "run-psx", "-q"])
+    assert not (tmp_roms_dir / "_duplicates_removed").exists()
+
+
+def test_totals_follow_adds_and_removes(tmp_path: Path) -> None:
+    """Per-console totals are kept by the database as rows come and go."""
+    staging = tmp_path / "_duplicates_removed"
+    with Manifest(staging) as manifest:
+        manifest.add(
+            [_row("s/psx/A.chd", "psx/A.chd", size=10), _row("s/snes/B", "snes/B", size=3)]
+        )
+        manifest.add([_row("s/psx/A.chd", "psx/A.chd", size=20)])
+        assert manifest.totals() == [("psx", 1, 20), ("snes", 1, 3)]
+        manifest.remove(["s/snes/B"])
+        assert manifest.totals() == [("psx", 1, 20)]
+        assert (len(manifest), manifest.total_bytes()) == (1, 20)
+
+
+def test_status_does_not_walk_staging(tmp_roms_dir: Path, monkeypatch) -> None:
+    """status answers from recorded sizes without listing the staging tree."""
+    _stage_library(tmp_roms_dir)
+    monkeypatch.setattr(Path, "rglob", lambda *a: pytest.fail("walked staging"))
+    monkeypatch.setattr(os, "scandir", lambda *a: pytest.fail("walked staging"))
+    status = staging_status(tmp_roms_dir)
+    assert (status.files, status.bytes) == (3, 3)
+    assert [c[0] for c in status.consoles] == ["psx", "snes"]
+    assert status.oldest is not None and status.newest is not None
+
+
+def test_purge_deletes_only_expired_files(tmp_roms_dir: Path) -> None:
+    """purge deletes rows staged before the cutoff and prunes the directories it emptied."""
+    _stage_library(tmp_roms_dir)
+    staging = tmp_roms_dir / "_duplicates_removed"
+    with Manifest(staging) as manifest:
+        snes_at = next(manifest.files(run_id="run-snes")).staged_at
+    # Everything staged before the snes run is expired
+    count, nbytes = purge(tmp_roms_dir, older_than=0, now=snes_at)
+    assert (count, nbytes) == (2, 2)
+    assert not (staging / "psx").exists()
+    assert _staged(tmp_roms_dir) == ["snes/Final Fantasy III (Japan).sfc"]
+    assert staging_status(tmp_roms_dir).files == 1
+
+
+def test_purge_everything_removes_staging(tmp_roms_dir: Path) -> None:
+    """Purging every file leaves no staging directory or manifest behind."""
+    _stage_library(tmp_roms_dir)
+    assert purge(tmp_roms_dir, older_than=0, now=time.time() + 1) == (3, 3)
+    assert not (tmp_roms_dir / "_duplicates_removed").exists()
+    assert purge(tmp_roms_dir, older_than=0) == (0, 0)
+
+
+def test_purge_skips_missing_files_in_freed_total(tmp_roms_dir: Path) -> None:
+    """A staged file deleted by hand is dropped from the manifest but not counted as freed."""
+    _stage_library(tmp_roms_dir)
+    staging = tmp_roms_dir / "_duplicates_removed"
+    with Manifest(staging) as manifest:
+        row = next(manifest.files(run_id="run-snes"))
+    (tmp_roms_dir / row.dest_rel).unlink()
+    assert purge(tmp_roms_dir, older_than=0, now=time.time() + 1) == (2, 2)
+    assert not staging.exists()
+
+
+def test_cli_status_and_purge(tmp_roms_dir: Path, capsys) -> None:
+    """status prints totals; purge --older-than keeps files that are newer."""
+    _stage_library(tmp_roms_dir)
+    main(["status", str(tmp_roms_dir)])
+    out = capsys.readouterr().out
+    assert "Files: 3" in out
+    assert "psx" in out
+    main(["purge", str(tmp_roms_dir), "--older-than", "30d", "-q"])
+    assert "Purged 0 file(s)" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        main(["purge", str(tmp_roms_dir), "--older-than", "soon"])
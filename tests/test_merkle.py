@@ -0,0 +1,113 @@
+"""Tests for merkle module."""
+
+import os
+import sys
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from rom_deduper.actions import dry_run
+from rom_deduper.cli import main
+from rom_deduper.merkle import HASH_CACHE_FILENAME, HashCache, folder_digest
+
+
+def _game_folder(parent: Path, name: str, content: bytes = b"track") -> Path:
+    folder = parent / name
+    (folder / "data").mkdir(parents=True)
+    (folder / "game.cue").write_bytes(b"cue")
+    (folder / "game.bin").write_bytes(content)
+    (folder / "data" / "extra.dat").write_bytes(b"extra")
+    return folder
+
+
+def test_folder_digest_ignores_folder_name(tmp_roms_dir: Path) -> None:
+    """Same files under the same relative names digest equal, whatever the folder is called."""
+    pc = tmp_roms_dir / "pc"
+    a = _game_folder(pc, "Alpha")
+    b = _game_folder(pc, "Completely Different")
+    c = _game_folder(pc, "Alpha (Other)", content=b"other")
+    cache = HashCache(tmp_roms_dir / HASH_CACHE_FILENAME)
+    root = str(tmp_roms_dir)
+    da = folder_digest(str(a), root, cache)
+    assert da.digest == folder_digest(str(b), root, cache).digest
+    assert da.digest != folder_digest(str(c), root, cache).digest
+    assert da.files == 3
+    assert da.size == len(b"cue") + len(b"track") + len(b"extra")
+
+
+def test_folder_digest_depends_on_relative_names(tmp_roms_dir: Path) -> None:
+    """Renaming a file inside a folder changes the digest."""
+    folder = _game_folder(tmp_roms_dir / "pc", "Alpha")
+    cache = HashCache(tmp_roms_dir / HASH_CACHE_FILENAME)
+    before = folder_digest(str(folder), str(tmp_roms_dir), cache).digest
+    (folder / "data" / "extra.dat").rename(folder / "data" / "renamed.dat")
+    assert folder_digest(str(folder), str(tmp_roms_dir), cache).digest != before
+
+
+def test_only_changed_files_are_rehashed(tmp_roms_dir: Path) -> None:
+    """A saved cache serves unchanged files; a file with a new mtime is read again."""
+    folder = _game_folder(tmp_roms_dir / "pc", "Alpha")
+    cache = HashCache.load(tmp_roms_dir)
+    first = folder_digest(str(folder), str(tmp_roms_dir), cache)
+    assert cache.hashed == 3
+    cache.save()
+
+    cache = HashCache.load(tmp_roms_dir)
+    assert folder_digest(str(folder), str(tmp_roms_dir), cache) == first
+    assert cache.hashed == 0
+
+    target = folder / "game.bin"
+    st = target.stat()
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    folder_digest(str(folder), str(tmp_roms_dir), cache)
+    assert cache.hashed == 1
+
+
+def test_dry_run_groups_identical_folders(tmp_roms_dir: Path, make_config) -> None:
+    """Identical game folders with different names become one duplicate group."""
+    psx = tmp_roms_dir / "psx"
+    _game_folder(psx, "Game (USA)")
+    _game_folder(psx, "Spiel (Europe)")
+    assert dry_run(tmp_roms_dir, config=make_config()).duplicate_groups == 0
+    cache = HashCache(tmp_roms_dir / HASH_CACHE_FILENAME)
+    report = dry_run(tmp_roms_dir, config=make_config(), folder_hashes=cache)
+    assert report.duplicate_groups == 1
+    assert len(report.folder_matches) == 1
+    assert sorted(report.folder_matches[0].folders) == ["Game (USA)", "Spiel (Europe)"]
+    group = report.groups[0]
+    assert group.keeper is not None and group.keeper.name == "Game (USA)"
+    assert [e.name for e in group.to_remove] == ["Spiel (Europe)"]
+    assert group.to_remove[0].size == len(b"cue") + len(b"track") + len(b"extra")
+
+
+def test_identical_folders_leave_other_entries_in_their_groups(
+    tmp_roms_dir: Path, make_config
+) -> None:
+    """Only the identical folders are grouped together; the other releases of both titles
+    stay in their own groups instead of being ranked against an unrelated keeper."""
+    psx = tmp_roms_dir / "psx"
+    _game_folder(psx, "Game (USA)")
+    _game_folder(psx, "Spiel (Europe)")
+    (psx / "Game (Japan).chd").write_bytes(b"game")
+    (psx / "Spiel (Japan).chd").write_bytes(b"spiel")
+    cache = HashCache(tmp_roms_dir / HASH_CACHE_FILENAME)
+    report = dry_run(tmp_roms_dir, config=make_config(), folder_hashes=cache)
+    assert len(report.folder_matches) == 1
+    assert report.duplicate_groups == 1
+    group = report.groups[0]
+    assert group.keeper is not None and group.keeper.name == "Game (USA)"
+    assert [e.name for e in group.to_remove] == ["Spiel (Europe)"]
+    assert group.base_title.startswith("game [")
+    assert report.total_files == 4
+
+
+def test_cli_scan_hash_folders(tmp_roms_dir: Path) -> None:
+    """scan --hash-folders reports identical folders and writes the hash cache."""
+    psx = tmp_roms_dir / "psx"
+    _game_folder(psx, "Game (USA)")
+    _game_folder(psx, "Spiel (Europe)")
+    buf = StringIO()
+    with patch.object(sys, "stdout", buf):
+        main(["scan", str(tmp_roms_dir), "--hash-folders", "--no-cache"])
+    assert "Identical folders: 1" in buf.getvalue()
+    assert (tmp_roms_dir / HASH_CACHE_FILENAME).exists()
@@ -0,0 +1,197 @@
+"""Tests for pipeline module."""
+
+import time
+import zlib
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.synth import generate_library
+from rom_deduper import pipeline
+from rom_deduper.actions import STAGING_DIR, apply_removal, dry_run
+from rom_deduper.cli import main
+from rom_deduper.config import Config
+from rom_deduper.manifest import Manifest
+from rom_deduper.pipeline import DEFAULT_STAGE_WORKERS, run_pipeline, stage_workers
+from rom_deduper.verify import Dat
+
+
+def _library(root: Path, consoles: int) -> None:
+    for i in range(consoles):
+        console = root / f"console{i:02d}"
+        console.mkdir(parents=True)
+        for title in ("Alpha", "Beta"):
+            for region in ("USA", "Europe", "Japan"):
+                (console / f"{title} ({region}).bin").write_bytes(region.encode())
+
+
+def _tree(root: Path) -> list[str]:
+    return sorted(str(p.relative_to(root)) for p in root.rglob("*") if "manifest" not in p.name)
+
+
+def _split_genesis(root: Path) -> None:
+    """Move every other genesis file to megadrive, splitting titles across directories."""
+    megadrive = root / "megadrive"
+    megadrive.mkdir()
+    for path in sorted((root / "genesis").iterdir())[::2]:
+        path.rename(megadrive / path.name)
+
+
+@pytest.mark.parametrize("aliases", [{}, {"megadrive": "genesis"}])
+def test_pipeline_removes_what_sequential_apply_removes(
+    tmp_path: Path, aliases: dict[str, str]
+) -> None:
+    """Same library, same result: files moved, report totals and manifest rows. Aliased
+    directories are ranked together, as in a sequential scan."""
+    seq, piped = tmp_path / "seq", tmp_path / "piped"
+    generate_library(seq, 800, seed=11)
+    generate_library(piped, 800, seed=11)
+    config = Config.default()
+    if aliases:
+        config.console_aliases = aliases
+        _split_genesis(seq)
+        _split_genesis(piped)
+    report = dry_run(seq, config=config)
+    count, freed = apply_removal(seq, report)
+    result = run_pipeline(piped, config, workers={"scan": 3, "rank": 2, "apply": 2})
+    assert (result.removed, result.bytes_freed) == (count, freed)
+    assert result.report.total_files == report.total_files
+    assert [(g.console, g.base_title) for g in result.report.groups] == [
+        (g.console, g.base_title) for g in report.groups
+    ]
+    assert _tree(piped) == _tree(seq)
+    with Manifest(piped / STAGING_DIR) as manifest:
+        assert len(manifest) == count
+        assert len({r.run_id for r in manifest.files()}) == 1
+
+
+def test_stages_overlap_across_consoles(tmp_roms_dir: Path) -> None:
+    """With slow scans and slow moves, scanning later consoles overlaps moving earlier ones."""
+    _library(tmp_roms_dir, 4)
+    scan_console = pipeline._Pipeline.scan_console
+    stage_batch = pipeline._stage_batch
+
+    def slow_scan(self, item):
+        time.sleep(0.05)
+        scan_console(self, item)
+
+    def slow_move(roms_root, batch):
+        time.sleep(0.02)
+        return stage_batch(roms_root, batch)
+
+    with (
+        patch.object(pipeline._Pipeline, "scan_console", slow_scan),
+        patch.object(pipeline, "_stage_batch", slow_move),
+    ):
+        result = run_pipeline(tmp_roms_dir, workers={"scan": 2, "rank": 1, "apply": 2})
+    assert result.removed == 4 * 4
+    assert result.stages["scan"].items == 4
+    # Sequentially: 4 x 0.05 scanning, then 16 x 0.02 moving
+    assert result.seconds < 0.52 * 0.8
+    assert result.overlap > 1.2
+
+
+def test_queues_bound_how_far_scanning_runs_ahead(tmp_roms_dir: Path) -> None:
+    """A slow mover holds the scanner back instead of the whole library piling up."""
+    _library(tmp_roms_dir, 10)
+    scan_console = pipeline._Pipeline.scan_console
+    stage_batch = pipeline._stage_batch
+    scanned: set[str] = set()
+    applied: set[str] = set()
+    ahead = [0]
+
+    def tracked_scan(self, item):
+        scan_console(self, item)
+        scanned.add(item.console)
+        ahead[0] = max(ahead[0], len(scanned - applied))
+
+    def slow_move(roms_root, batch):
+        time.sleep(0.01)
+        applied.add(batch[0].console)
+        return stage_batch(roms_root, batch)
+
+    with (
+        patch.object(pipeline._Pipeline, "scan_console", tracked_scan),
+        patch.object(pipeline, "_stage_batch", slow_move),
+    ):
+        run_pipeline(tmp_roms_dir, workers={"scan": 1, "rank": 1, "apply": 1}, queue_size=1)
+    # At most: one scanning, one queued, one ranking, one queued, one moving
+    assert len(scanned) == 10
+    assert ahead[0] <= 5
+
+
+def test_failed_move_stops_new_work_and_keeps_manifest(tmp_roms_dir: Path) -> None:
+    """The first error is raised once in-flight work ends; staged files stay recorded."""
+    _library(tmp_roms_dir, 6)
+    stage_batch = pipeline._stage_batch
+
+    def failing(roms_root, batch):
+        if batch[0].console == "console02":
+            raise OSError("device gone")
+        return stage_batch(roms_root, batch)
+
+    with (
+        patch.object(pipeline, "_stage_batch", failing),
+        pytest.raises(OSError, match="device gone"),
+    ):
+        run_pipeline(tmp_roms_dir, workers={"apply": 1}, queue_size=1)
+    missing = [f"{p.parent.name}/{p.name}" for p in (tmp_roms_dir / STAGING_DIR).rglob("*.bin")]
+    assert missing
+    assert not any(n.startswith("console02") for n in missing)
+    with Manifest(tmp_roms_dir / STAGING_DIR) as manifest:
+        assert sorted(r.dest_rel.split("/", 1)[1] for r in manifest.files()) == sorted(missing)
+
+
+def test_pipeline_verify_stage_keeps_verified_alternate(tmp_roms_dir: Path) -> None:
+    """With a DAT, a corrupt keeper is left alone and the verified alternate kept."""
+    gb = tmp_roms_dir / "gb"
+    gb.mkdir()
+    (gb / "Game (USA).gb").write_bytes(b"bad dump")
+    (gb / "Game (Europe).gb").write_bytes(b"good dump")
+    (gb / "Game (Japan).gb").write_bytes(b"hack")
+    dat_path = tmp_roms_dir / "gb.dat"
+    dat_path.write_text(
+        '<datafile><game name="Game (USA)">'
+        f'<rom name="Game (USA).gb" size="9" crc="{zlib.crc32(b"good dump"):08x}"/>'
+        "</game></datafile>"
+    )
+    result = run_pipeline(tmp_roms_dir, dat=Dat.load(dat_path))
+    assert result.verify is not None
+    assert result.verify.replaced == 1
+    assert result.stages["verify"].items == 1
+    assert (gb / "Game (USA).gb").exists()
+    assert (gb / "Game (Europe).gb").exists()
+    assert not (gb / "Game (Japan).gb").exists()
+
+
+def test_pipeline_hard_sends_to_trash(tmp_roms_dir: Path) -> None:
+    """hard mode trashes instead of staging and writes no manifest."""
+    _library(tmp_roms_dir, 2)
+
+    def fake_trash(path: str) -> None:
+        Path(path).unlink()
+
+    with patch("send2trash.send2trash", side_effect=fake_trash):
+        result = run_pipeline(tmp_roms_dir, hard=True)
+    assert result.removed == 8
+    assert not (tmp_roms_dir / STAGING_DIR).exists()
+
+
+def test_stage_workers_from_config() -> None:
+    """config.pipeline_workers overrides known stages; counts are at least 1."""
+    config = Config.default()
+    config.pipeline_workers = {"apply": 6, "scan": 0, "bogus": 3}
+    workers = stage_workers(config)
+    assert workers == {**DEFAULT_STAGE_WORKERS, "apply": 6, "scan": 1}
+
+
+def test_cli_apply_pipeline(tmp_roms_dir: Path, capsys) -> None:
+    """apply --pipeline removes duplicates and, verbose, reports stage timing."""
+    _library(tmp_roms_dir, 2)
+    main(["apply", str(tmp_roms_dir), "--pipeline", "-v"])
+    out = capsys.readouterr().out
+    assert "Removed 8 duplicate(s)" in out
+    assert "Pipeline:" in out
+    with pytest.raises(SystemExit):
+        main(["apply", str(tmp_roms_dir), "--pipeline", "--free", "1G"])
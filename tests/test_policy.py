@@ -0,0 +1,96 @@
+"""Tests for policy module."""
+
+import json
+from pathlib import Path
+
+from rom_deduper.config import Config, load_config
+from rom_deduper.grouper import group_entries
+from rom_deduper.policy import compile_policy
+from rom_deduper.ranker import rank_groups
+from rom_deduper.scanner import scan
+
+
+def _keepers(roms: Path, config: Config) -> dict[tuple[str, str], str]:
+    groups = group_entries(scan(roms))
+    return {
+        (g.console, g.base_title): r.keeper.name
+        for g, r in zip(groups, rank_groups(groups, config))
+        if r.keeper
+    }
+
+
+def test_compile_policy_is_cached_per_config(make_config) -> None:
+    """A Config compiles its policy once; later calls return the same object."""
+    config = make_config()
+    assert compile_policy(config) is compile_policy(config)
+    assert compile_policy(None) is compile_policy(None)
+
+
+def test_compile_policy_follows_config_changes(make_config) -> None:
+    """Changing ranking settings on the same Config recompiles; other fields do not."""
+    config = make_config()
+    config.region_priority = ["USA", "Japan"]
+    first = compile_policy(config)
+    config.hdd_order = True
+    assert compile_policy(config) is first
+
+    config.region_priority = ["Japan", "USA"]
+    policy = compile_policy(config)
+    assert policy is not first
+    assert policy.region_scores["Japan"] > policy.region_scores["USA"]
+
+    config.console_overrides["psx"] = {"region_priority": ["USA"]}  # Mutated in place
+    assert compile_policy(config).for_console("psx") is not policy
+
+
+def test_policy_precomputes_lookup_tables() -> None:
+    """Region priority and translation patterns are compiled into the policy."""
+    config = Config(
+        exclude_consoles=set(),
+        translation_patterns=[r"\(CustomTL\)"],
+        region_priority=["Japan", "USA"],
+    )
+    policy = compile_policy(config)
+    assert policy.region_scores["Japan"] > policy.region_scores["USA"]
+    assert policy.translation_patterns[0].pattern == r"\(CustomTL\)"
+    assert policy.parse("Game (Japan) (CustomTL).chd").has_translation
+
+
+def test_format_preference_overrides_default(tmp_roms_dir: Path, make_config) -> None:
+    """format_preference ranks listed extensions first, in order."""
+    genesis = tmp_roms_dir / "genesis"
+    genesis.mkdir()
+    (genesis / "Game (USA).md").write_bytes(b"x")
+    (genesis / "Game (USA).bin").write_bytes(b"x")
+    assert _keepers(tmp_roms_dir, make_config())[("genesis", "game")] == "Game (USA).md"
+    config = make_config(format_preference=[".bin", ".md"])
+    assert _keepers(tmp_roms_dir, config)[("genesis", "game")] == "Game (USA).bin"
+
+
+def test_console_override_applies_only_to_that_console(tmp_roms_dir: Path, make_config) -> None:
+    """console_overrides change ranking for one console and leave the others alone."""
+    for console in ("psx", "snes"):
+        d = tmp_roms_dir / console
+        d.mkdir()
+        (d / "Game (USA).zip").write_bytes(b"x")
+        (d / "Game (Japan).zip").write_bytes(b"x")
+    config = make_config(console_overrides={"psx": {"region_priority": ["Japan", "USA"]}})
+    keepers = _keepers(tmp_roms_dir, config)
+    assert keepers[("psx", "game")] == "Game (Japan).zip"
+    assert keepers[("snes", "game")] == "Game (USA).zip"
+
+
+def test_load_config_reads_policy_settings(tmp_path: Path) -> None:
+    """format_preference and console_overrides load from config.json."""
+    (tmp_path / "config.json").write_text(
+        json.dumps(
+            {
+                "format_preference": [".chd", ".cue"],
+                "console_overrides": {"PSX": {"region_priority": ["Europe"]}},
+            }
+        )
+    )
+    config = load_config(tmp_path)
+    assert config.format_preference == [".chd", ".cue"]
+    assert config.console_overrides == {"psx": {"region_priority": ["Europe"]}}
+    assert compile_policy(config).for_console("psx").region_scores["Europe"] == 100
@@ -0,0 +1,73 @@
+"""Tests for progress module."""
+
+from io import StringIO
+from pathlib import Path
+
+from rich.console import Console
+
+from rom_deduper.actions import apply_removal, dry_run, restore
+from rom_deduper.progress import Progress, RichProgress, StageStats
+
+
+class _Recorder(Progress):
+    """Progress that records every hook call."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.events: list[tuple[str, str, str | None]] = []
+
+    def on_start(self, stats: StageStats) -> None:
+        self.events.append(("start", stats.stage, None))
+
+    def on_update(self, stats: StageStats) -> None:
+        self.events.append(("update", stats.stage, stats.console))
+
+    def on_finish(self, stats: StageStats) -> None:
+        self.events.append(("finish", stats.stage, None))
+
+
+def _make_dupes(roms: Path) -> None:
+    psx = roms / "psx"
+    psx.mkdir()
+    (psx / "Game (USA).chd").write_bytes(b"usa")
+    (psx / "Game (Japan).chd").write_bytes(b"japan")
+
+
+def test_stage_stats_rates_and_eta() -> None:
+    """StageStats derives files/sec, bytes/sec and ETA from totals and elapsed time."""
+    stats = StageStats(stage="apply", total=10, files=5, bytes=500, started=0.0, finished=2.0)
+    assert stats.files_per_sec == 2.5
+    assert stats.bytes_per_sec == 250
+    assert stats.eta == 2.0
+    assert StageStats(stage="scan").eta is None
+
+
+def test_progress_reports_every_stage(tmp_roms_dir: Path) -> None:
+    """dry_run, apply_removal and restore report start/update/finish per stage."""
+    _make_dupes(tmp_roms_dir)
+    progress = _Recorder()
+    report = dry_run(tmp_roms_dir, progress=progress)
+    apply_removal(tmp_roms_dir, report, progress=progress)
+    restore(tmp_roms_dir, progress=progress)
+    for stage in ("scan", "rank", "apply", "restore"):
+        assert ("start", stage, None) in progress.events
+        assert ("update", stage, "psx") in progress.events
+        assert ("finish", stage, None) in progress.events
+    assert progress.stages["scan"].files == 2
+    assert progress.stages["apply"].files == 1
+    assert progress.stages["apply"].bytes == len(b"japan")
+    assert progress.stages["restore"].bytes == len(b"japan")
+
+
+def test_rich_progress_renders_throughput(tmp_roms_dir: Path) -> None:
+    """RichProgress draws a bar per stage with the current console and files/sec."""
+    _make_dupes(tmp_roms_dir)
+    buf = StringIO()
+    console = Console(file=buf, force_terminal=True, width=120)
+    with RichProgress(console, transient=False) as progress:
+        dry_run(tmp_roms_dir, progress=progress)
+    out = buf.getvalue()
+    assert "Scan" in out
+    assert "Rank" in out
+    assert "psx" in out
+    assert "files/s" in out
@@ -2,6 +2,8 @@
 
 from pathlib import Path
 
+import pytest
+
 from rom_deduper.config import Config
 from rom_deduper.grouper import group_entries
 from rom_deduper.parser import parse_filename
@@ -151,6 +153,43 @@ def test_rank_removes_worse_region_discs_keeps_best_set(tmp_roms_dir: Path) -> N
     assert len(result.to_remove) == 2  # Japan Disc 1 and Disc 2
 
 
+def test_rank_prefers_complete_disc_set(tmp_roms_dir: Path) -> None:
+    """A complete set beats a better-region set that is missing a disc."""
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    (psx / "Saga (USA) (Disc 1).chd").write_bytes(b"u1")
+    for n in (1, 2):
+        (psx / f"Saga (Europe) (Disc {n}).chd").write_bytes(b"e")
+    result = rank_group(group_entries(scan(tmp_roms_dir))[0])
+    assert result.keeper is not None
+    assert result.keeper.name == "Saga (Europe) (Disc 1).chd"
+    assert [e.name for e in result.to_remove] == ["Saga (USA) (Disc 1).chd"]
+    assert not result.uncertain
+
+
+def test_rank_complete_sets_with_different_disc_counts(tmp_roms_dir: Path) -> None:
+    """A complete set is not made partial by a release with more discs: region decides."""
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    for n in (1, 2):
+        (psx / f"Saga (USA) (Disc {n}).chd").write_bytes(b"u")
+    for n in (1, 2, 3):
+        (psx / f"Saga (Japan) (Disc {n}).chd").write_bytes(b"j")
+    (psx / "Saga (Europe) (Disc 1).chd").write_bytes(b"e")
+    (psx / "Saga (Europe) (Disc 3).chd").write_bytes(b"e")
+    result = rank_group(group_entries(scan(tmp_roms_dir))[0])
+    assert result.keeper is not None
+    assert result.keeper.name == "Saga (USA) (Disc 1).chd"
+    assert [e.name for e in result.to_remove] == [
+        "Saga (Japan) (Disc 1).chd",
+        "Saga (Japan) (Disc 2).chd",
+        "Saga (Japan) (Disc 3).chd",
+        "Saga (Europe) (Disc 1).chd",
+        "Saga (Europe) (Disc 3).chd",
+    ]
+    assert not result.uncertain
+
+
 def test_rank_never_removes_m3u_playlists(tmp_roms_dir: Path) -> None:
     """m3u files are playlists, not ROMs — never put them in to_remove."""
     psx = tmp_roms_dir / "psx"
@@ -183,3 +222,129 @@ def test_rank_region_priority_override(tmp_roms_dir: Path) -> None:
     result = rank_group(groups[0], config=config)
     assert result.keeper is not None
     assert "Japan" in str(result.keeper.path)
+
+
+def _result_names(result) -> tuple:
+    keeper = result.keeper.name if result.keeper else None
+    return (keeper, [e.name for e in result.to_remove], result.uncertain)
+
+
+def _oracle(group) -> tuple:
+    """Rank one group by a plain per-unit sort, independent of the columnar batch code.
+
+    Units are disc sets (scored by their first disc, sized by all discs, marked incomplete
+    when missing a disc below their highest, or a lone Disc 1) and the remaining entries;
+    ties keep scan order.
+    """
+    from rom_deduper.policy import compile_policy
+
+    if len(group.entries) < 2:
+        return (group.entries[0].name, [], False)
+    policy = compile_policy(None).for_console(group.console)
+    units = []
+    in_set = set()
+    for disc_set in group.disc_sets:
+        head = policy.key(disc_set.discs[0], policy.parse(disc_set.discs[0].name))
+        size = sum(policy.key(d, policy.parse(d.name))[-1] for d in disc_set.discs)
+        top = max(disc_set.numbers)
+        complete = int(top > 1 and set(disc_set.numbers) == set(range(1, top + 1)))
+        units.append(((complete, *head[:-1], size), list(disc_set.discs)))
+        in_set.update(id(d) for d in disc_set.discs)
+    for entry in group.entries:
+        if id(entry) not in in_set:
+            units.append(((1, *policy.key(entry, policy.parse(entry.name))), [entry]))
+    units.sort(key=lambda u: u[0], reverse=True)
+    removed = [
+        e.name for _, members in units[1:] for e in members if (e.extension or "").lower() != ".m3u"
+    ]
+    uncertain = units[1][0] == units[0][0]
+    return (units[0][1][0].name, removed, uncertain)
+
+
+def _mixed_library(roms: Path) -> None:
+    psx = roms / "psx"
+    psx.mkdir()
+    for name in (
+        "Saga (Japan) (Disc 1).chd",
+        "Saga (Japan) (Disc 2).chd",
+        "Saga (Europe) (Disc 1).chd",
+        "Saga (USA) (Disc 1).chd",
+        "Saga (USA) (Disc 2).chd",
+        "Saga (USA).m3u",
+        "Quest (Japan).chd",
+        "Quest (USA).bin",
+        "Quest (USA).chd",
+    ):
+        (psx / name).write_bytes(b"x")
+    snes = roms / "snes"
+    snes.mkdir()
+    for name in ("Other (USA).sfc", "Other (USA) (Rev 1).sfc", "Other (Japan).sfc"):
+        (snes / name).write_bytes(b"x")
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_rank_groups_mixed_groups(tmp_roms_dir: Path, monkeypatch, use_numpy: bool) -> None:
+    """Hand-checked keepers for sets, partial sets, formats, versions and playlists, on both
+    the numpy lexsort path and the array fallback."""
+    from rom_deduper import ranker
+
+    if use_numpy and ranker._numpy() is None:
+        pytest.skip("numpy not installed")
+    if not use_numpy:
+        monkeypatch.setattr(ranker, "_numpy", lambda: None)
+    _mixed_library(tmp_roms_dir)
+    groups = group_entries(scan(tmp_roms_dir))
+    results = {g.base_title: _result_names(r) for g, r in zip(groups, ranker.rank_groups(groups))}
+    assert results["saga"] == (
+        "Saga (USA) (Disc 1).chd",
+        [
+            "Saga (Japan) (Disc 1).chd",
+            "Saga (Japan) (Disc 2).chd",
+            "Saga (Europe) (Disc 1).chd",
+        ],
+        False,
+    )
+    assert results["quest"] == ("Quest (USA).chd", ["Quest (USA).bin", "Quest (Japan).chd"], False)
+    assert results["other"] == (
+        "Other (USA) (Rev 1).sfc",
+        ["Other (USA).sfc", "Other (Japan).sfc"],
+        False,
+    )
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_rank_groups_matches_oracle(tmp_roms_dir: Path, monkeypatch, use_numpy: bool) -> None:
+    """Batch ranking agrees with a plain per-group sort on a synthetic library, on both
+    the numpy lexsort path and the array fallback."""
+    from benchmarks.synth import generate_library
+    from rom_deduper import ranker
+
+    if use_numpy and ranker._numpy() is None:
+        pytest.skip("numpy not installed")
+    if not use_numpy:
+        monkeypatch.setattr(ranker, "_numpy", lambda: None)
+    generate_library(tmp_roms_dir, 400, seed=4)
+    groups = group_entries(scan(tmp_roms_dir))
+    batch = ranker.rank_groups(groups)
+    assert len(batch) == len(groups)
+    assert [_result_names(r) for r in batch] == [_oracle(g) for g in groups]
+
+
+def test_rank_groups_flags_ties_per_group(tmp_roms_dir: Path) -> None:
+    """Tie detection runs per group: only the tied group is uncertain."""
+    from rom_deduper.ranker import rank_groups
+
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    (psx / "Tied (USA).chd").write_bytes(b"x")
+    (psx / "Tied (U).chd").write_bytes(b"x")
+    (psx / "Clear (USA).chd").write_bytes(b"x")
+    (psx / "Clear (Japan).chd").write_bytes(b"x")
+    (psx / "Single (USA).chd").write_bytes(b"x")
+    groups = group_entries(scan(tmp_roms_dir))
+    results = {g.base_title: r for g, r in zip(groups, rank_groups(groups))}
+    assert results["tied"].uncertain
+    assert not results["clear"].uncertain
+    assert results["clear"].keeper is not None
+    assert "USA" in results["clear"].keeper.name
+    assert results["single"].to_remove == []
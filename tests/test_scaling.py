@@ -0,0 +1,139 @@
+"""Scaling tests: operation-count budgets over generated trees of increasing size.
+
+Counters instead of wall-clock time, so these never flake on a slow CI runner.
+"""
+
+import os
+import pathlib
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from benchmarks.synth import generate_library
+from rom_deduper import grouper, policy, ranker
+from rom_deduper.actions import (
+    STAGING_DIR,
+    _expand_to_remove_orphan_m3u,
+    apply_removal,
+    dry_run,
+    restore,
+)
+from rom_deduper.grouper import group_entries
+from rom_deduper.manifest import Manifest
+from rom_deduper.scanner import ROMEntry, scan
+
+SIZES = (100, 400)
+
+
+class _Counter:
+    """Wrap a callable and count its calls."""
+
+    def __init__(self, fn: Callable[..., Any]) -> None:
+        self.fn = fn
+        self.calls = 0
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        self.calls += 1
+        return self.fn(*args, **kwargs)
+
+
+def _count_dirs(root: Path) -> int:
+    """Number of directories under root, root included."""
+    return 1 + sum(len(dirs) for _, dirs, _ in os.walk(root))
+
+
+@pytest.mark.parametrize("files", SIZES)
+def test_scan_lists_each_directory_once(tmp_path: Path, files: int, monkeypatch) -> None:
+    """scan issues one directory listing per directory: O(dirs), never O(files x dir size)."""
+    roms = tmp_path / "ROMs"
+    generate_library(roms, files, seed=files)
+    dirs = _count_dirs(roms)
+    scandir = _Counter(os.scandir)
+    listdir = _Counter(os.listdir)
+    monkeypatch.setattr(os, "scandir", scandir)
+    monkeypatch.setattr(os, "listdir", listdir)
+    scan(roms)
+    assert scandir.calls + listdir.calls <= dirs
+
+
+@pytest.mark.parametrize("files", SIZES)
+def test_group_entries_parses_each_name_once(tmp_path: Path, files: int, monkeypatch) -> None:
+    """group_entries calls parse_filename exactly once per entry."""
+    roms = tmp_path / "ROMs"
+    generate_library(roms, files, seed=files)
+    entries = scan(roms)
+    parse = _Counter(grouper.parse_filename)
+    monkeypatch.setattr(grouper, "parse_filename", parse)
+    group_entries(entries)
+    assert parse.calls == len(entries)
+
+
+@pytest.mark.parametrize("files", SIZES)
+def test_ranking_parses_each_name_at_most_once(tmp_path: Path, files: int, monkeypatch) -> None:
+    """rank_group parses each entry of a multi-entry group once, not once per comparison."""
+    roms = tmp_path / "ROMs"
+    generate_library(roms, files, seed=files)
+    entries = scan(roms)
+    groups = group_entries(entries)
+    parse = _Counter(policy.parse_filename)
+    monkeypatch.setattr(policy, "parse_filename", parse)
+    for g in groups:
+        ranker.rank_group(g)
+    assert parse.calls <= len(entries)
+
+
+@pytest.mark.parametrize("files", SIZES)
+def test_dry_run_stats_are_linear(tmp_path: Path, files: int, monkeypatch) -> None:
+    """dry_run performs a bounded number of stat calls per entry."""
+    roms = tmp_path / "ROMs"
+    generate_library(roms, files, seed=files)
+    n = len(scan(roms))
+    stat = _Counter(os.stat)
+    monkeypatch.setattr(os, "stat", stat)
+    dry_run(roms)
+    assert stat.calls <= 8 * n
+
+
+@pytest.mark.parametrize("n", (50, 200))
+def test_expand_orphan_m3u_is_linear(tmp_path: Path, n: int, monkeypatch) -> None:
+    """_expand_to_remove_orphan_m3u does O(group size) path comparisons."""
+    psx = tmp_path / "psx"
+    psx.mkdir()
+    entries = []
+    for i in range(n):
+        chd = psx / f"Game {i} (Japan).chd"
+        chd.write_bytes(b"x")
+        (psx / f"Game {i} (Japan).m3u").write_text(f"{chd.name}\n")
+        entries.append(ROMEntry(path=chd, console="psx", extension=".chd"))
+    eq = _Counter(pathlib.PurePath.__eq__)
+    monkeypatch.setattr(pathlib.PurePath, "__eq__", lambda self, other: eq(self, other))
+    expanded = _expand_to_remove_orphan_m3u(entries)
+    assert len(expanded) == 2 * n
+    assert eq.calls <= 4 * n
+
+
+@pytest.mark.parametrize("files", SIZES)
+def test_selective_restore_prunes_only_touched_dirs(
+    tmp_path: Path, files: int, monkeypatch
+) -> None:
+    """Restoring one console lists no directory and tries rmdir only on directories it
+    emptied and their ancestors, however large the rest of the staging area is."""
+    roms = tmp_path / "ROMs"
+    generate_library(roms, files, seed=files)
+    apply_removal(roms, dry_run(roms))
+    with Manifest(roms / STAGING_DIR) as manifest:
+        console, restored, _ = min(manifest.totals(), key=lambda t: t[1])
+        parents = {(roms / r.dest_rel).parent for r in manifest.files(console=console)}
+    ancestors = {a for p in parents for a in (p, *p.parents) if roms / STAGING_DIR in a.parents}
+    scandir = _Counter(os.scandir)
+    listdir = _Counter(os.listdir)
+    rmdir = _Counter(os.rmdir)
+    monkeypatch.setattr(os, "scandir", scandir)
+    monkeypatch.setattr(os, "listdir", listdir)
+    monkeypatch.setattr(os, "rmdir", rmdir)
+    assert restore(roms, console=console) == restored
+    assert scandir.calls + listdir.calls == 0
+    assert rmdir.calls <= len(ancestors) + 1  # + the staging root when it empties
+    assert not (roms / STAGING_DIR / console).exists()
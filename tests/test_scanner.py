@@ -1,5 +1,6 @@
 """Tests for scanner module."""
 
+import os
 from pathlib import Path
 
 from rom_deduper.config import Config
@@ -105,6 +106,26 @@ def test_scan_includes_game_folders_as_units(tmp_roms_dir: Path) -> None:
     assert any("Thrill Kill" in str(e.path) for e in entries)
 
 
+def test_scan_game_folder_size_covers_its_whole_tree(tmp_roms_dir: Path) -> None:
+    """A game folder's size and mtime include files in its subfolders; a nested game folder
+    is an entry of its own and is not counted twice."""
+    game_dir = tmp_roms_dir / "psx" / "Game (USA)"
+    (game_dir / "extras" / "video").mkdir(parents=True)
+    (game_dir / "game.cue").write_bytes(b"c" * 10)
+    (game_dir / "extras" / "video" / "intro.str").write_bytes(b"v" * 1000)
+    (game_dir / "Bonus Disc").mkdir()
+    (game_dir / "Bonus Disc" / "bonus.bin").write_bytes(b"b" * 500)
+    entries = {e.name: e for e in scan(tmp_roms_dir)}
+    assert entries["Game (USA)"].size == 1010
+    assert entries["Bonus Disc"].size == 500
+
+    intro = game_dir / "extras" / "video" / "intro.str"
+    st = intro.stat()
+    os.utime(intro, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    entries = {e.name: e for e in scan(tmp_roms_dir)}
+    assert entries["Game (USA)"].mtime_ns == st.st_mtime_ns + 10**9
+
+
 def test_scan_uses_config_exclude_consoles(tmp_roms_dir: Path) -> None:
     """Scanner uses config exclude_consoles when provided."""
     psx = tmp_roms_dir / "psx"
@@ -117,3 +138,142 @@ def test_scan_uses_config_exclude_consoles(tmp_roms_dir: Path) -> None:
     result = scan(tmp_roms_dir, config=config)
     assert not any(e.console == "psx" for e in result)
     assert any(e.console == "genesis" for e in result)
+
+
+def test_scan_canonicalizes_console_aliases(tmp_roms_dir: Path) -> None:
+    """console_aliases map alias directories onto one console, which groups them together."""
+    from rom_deduper.grouper import group_entries
+    from rom_deduper.ranker import rank_groups
+
+    (tmp_roms_dir / "genesis").mkdir()
+    (tmp_roms_dir / "megadrive").mkdir()
+    (tmp_roms_dir / "genesis" / "Sonic (USA).md").write_bytes(b"usa")
+    (tmp_roms_dir / "megadrive" / "Sonic (Europe).md").write_bytes(b"eur")
+    config = Config(
+        exclude_consoles=set(),
+        translation_patterns=[],
+        region_priority=None,
+        console_aliases={"megadrive": "genesis"},
+    )
+    entries = scan(tmp_roms_dir, config=config)
+    assert {e.console for e in entries} == {"genesis"}
+    groups = group_entries(entries)
+    assert len(groups) == 1
+    result = rank_groups(groups, config)[0]
+    assert result.keeper is not None and result.keeper.name == "Sonic (USA).md"
+    assert [e.path for e in result.to_remove] == [tmp_roms_dir / "megadrive" / "Sonic (Europe).md"]
+
+
+def test_scan_excludes_alias_of_excluded_console(tmp_roms_dir: Path) -> None:
+    """An alias of an excluded console is excluded too."""
+    (tmp_roms_dir / "laserdisc").mkdir()
+    (tmp_roms_dir / "laserdisc" / "Game.zip").write_bytes(b"x")
+    config = Config(
+        exclude_consoles={"daphne"},
+        translation_patterns=[],
+        region_priority=None,
+        console_aliases={"laserdisc": "daphne"},
+    )
+    assert scan(tmp_roms_dir, config=config) == []
+
+
+def test_scan_ignore_globs_prune_subtrees(tmp_roms_dir: Path, monkeypatch) -> None:
+    """Ignored directories are never listed; name globs match at any depth, path globs by path."""
+    import os
+
+    from rom_deduper import scanner
+
+    psx = tmp_roms_dir / "psx"
+    (psx / "Media" / "boxart").mkdir(parents=True)
+    (psx / "Media" / "boxart" / "Game.zip").write_bytes(b"x")
+    (psx / "Game (USA)" / "manuals").mkdir(parents=True)
+    (psx / "Game (USA)" / "game.cue").write_bytes(b"x")
+    (psx / "Game (USA)" / "manuals" / "Manual.zip").write_bytes(b"x")
+    (psx / "Extras").mkdir()
+    (psx / "Extras" / "Bonus.zip").write_bytes(b"x")
+    (psx / "Game (Japan).chd").write_bytes(b"x")
+    (psx / "Game (Japan) (Beta).chd").write_bytes(b"x")
+
+    listed: list[str] = []
+    original = os.scandir
+
+    def scandir(path):
+        listed.append(os.fspath(path))
+        return original(path)
+
+    monkeypatch.setattr(scanner.os, "scandir", scandir)
+    config = Config(
+        exclude_consoles=set(),
+        translation_patterns=[],
+        region_priority=None,
+        ignore_globs=["media", "*/manuals", "*(Beta)*"],
+    )
+    entries = scan(tmp_roms_dir, config=config)
+    assert sorted(e.name for e in entries) == ["Extras", "Game (Japan).chd", "Game (USA)"]
+    assert not any("Media" in p or "manuals" in p for p in listed)
+
+
+def test_rom_entry_path_round_trips(tmp_roms_dir: Path) -> None:
+    """ROMEntry built from a Path exposes the same path, name and directory."""
+    from rom_deduper.scanner import ROMEntry
+
+    path = tmp_roms_dir / "psx" / "Game (USA).chd"
+    entry = ROMEntry(path=path, console="psx", extension=".chd")
+    assert entry.path == path
+    assert entry.name == "Game (USA).chd"
+    assert entry.directory == str(tmp_roms_dir / "psx")
+    assert entry == ROMEntry(path=path, console="psx", extension=".chd")
+
+
+def test_scan_entries_share_interned_strings(tmp_roms_dir: Path) -> None:
+    """Entries in one folder share a single directory and console string object."""
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    for region in ("USA", "Europe", "Japan"):
+        (psx / f"Game ({region}).chd").write_bytes(b"x")
+    entries = scan(tmp_roms_dir)
+    assert len({id(e.directory) for e in entries}) == 1
+    assert len({id(e.console) for e in entries}) == 1
+    assert not hasattr(entries[0], "__dict__")
+
+
+def test_scan_memory_per_entry_under_budget(tmp_roms_dir: Path) -> None:
+    """A scanned entry (record, name string, list slot) stays under 256 bytes."""
+    import tracemalloc
+
+    from benchmarks.synth import generate_library
+
+    generate_library(tmp_roms_dir, 2000, seed=11)
+    tracemalloc.start()
+    try:
+        entries = scan(tmp_roms_dir)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert current / len(entries) < 256
+
+
+def test_scan_hdd_order_stats_by_inode_with_same_result(tmp_roms_dir: Path, monkeypatch) -> None:
+    """With hdd_order, files are statted in inode order; entries come back unchanged."""
+    import os
+
+    from benchmarks.synth import generate_library
+    from rom_deduper import scanner
+
+    generate_library(tmp_roms_dir, 300, seed=9)
+    config = Config.default()
+    default = [(e.directory, e.name, e.size) for e in scan(tmp_roms_dir, config)]
+    statted: list[tuple[str, int]] = []
+    original = scanner._stat
+
+    def traced(f: "os.DirEntry[str]") -> tuple[int, int]:
+        statted.append((os.path.dirname(f.path), f.inode()))
+        return original(f)
+
+    monkeypatch.setattr(scanner, "_stat", traced)
+    config.hdd_order = True
+    assert [(e.directory, e.name, e.size) for e in scan(tmp_roms_dir, config)] == default
+    by_dir: dict[str, list[int]] = {}
+    for directory, inode in statted:
+        by_dir.setdefault(directory, []).append(inode)
+    assert all(inodes == sorted(inodes) for inodes in by_dir.values())
@@ -0,0 +1,203 @@
+"""Tests for serve module."""
+
+import http.client
+import json
+import os
+import socket
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from rom_deduper import watch as watch_module
+from rom_deduper.actions import STAGING_DIR
+from rom_deduper.cli import main
+from rom_deduper.config import Config
+from rom_deduper.serve import make_server
+
+
+@pytest.fixture
+def library(tmp_roms_dir: Path, psx_library: Path) -> Path:
+    """psx_library plus a snes duplicate pair; returns the psx directory."""
+    snes = tmp_roms_dir / "snes"
+    snes.mkdir()
+    (snes / "Gamma (USA).sfc").write_bytes(b"x")
+    (snes / "Gamma (Europe).sfc").write_bytes(b"x")
+    return psx_library
+
+
+@pytest.fixture
+def config(make_config) -> Config:
+    return make_config()
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str) -> None:
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+@contextmanager
+def _serving(roms: Path, config: Config, socket_path: Path | None = None) -> Iterator:
+    """A server on an ephemeral port (or socket_path) and a request function for it."""
+    server = make_server(roms, config, port=0, socket_path=socket_path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    def request(
+        method: str, path: str, body: dict | None = None, headers: dict | None = None
+    ) -> tuple[int, dict]:
+        if socket_path is not None:
+            conn = _UnixConnection(str(socket_path))
+        else:
+            conn = http.client.HTTPConnection(server.url.removeprefix("http://"), timeout=10)
+        if method == "POST":
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        try:
+            payload = json.dumps(body) if body is not None else None
+            conn.request(method, path, body=payload, headers=headers or {})
+            response = conn.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            conn.close()
+
+    try:
+        yield request
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+def test_report_served_from_warm_index(tmp_roms_dir: Path, config: Config, library: Path) -> None:
+    """GET /report answers from memory, optionally filtered by console."""
+    with _serving(tmp_roms_dir, config) as request:
+        status, data = request("GET", "/report")
+        assert status == 200
+        assert data["duplicate_groups"] == 2
+        assert data["total_to_remove"] == 2
+        assert "elapsed_ms" in data
+        status, data = request("GET", "/report?console=SNES")
+        assert [g["base_title"] for g in data["groups"]] == ["gamma"]
+
+
+def test_scan_relists_only_changed_directories(
+    tmp_roms_dir: Path, monkeypatch, config: Config, library: Path
+) -> None:
+    """POST /scan stats every directory but re-lists only the ones whose mtime moved."""
+    monkeypatch.setattr(watch_module, "RACY_NS", 0)
+    psx = library
+    with _serving(tmp_roms_dir, config) as request:
+        status, data = request("POST", "/scan")
+        assert status == 200
+        assert data["refresh"] == {"relisted": 0, "reranked": 0}
+
+        (psx / "Alpha (Japan).chd").write_bytes(b"x")
+        st = psx.stat()
+        os.utime(psx, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        status, data = request("POST", "/scan")
+        assert data["refresh"] == {"relisted": 1, "reranked": 2}
+        assert data["duplicate_groups"] == 3
+
+        status, data = request("POST", "/refresh", {"full": True})
+        assert status == 200
+        assert data["relisted"] == 3
+
+
+def test_apply_and_restore(tmp_roms_dir: Path, config: Config, library: Path) -> None:
+    """POST /apply stages duplicates and /restore puts them back, each leaving the index
+    current."""
+    psx = library
+    with _serving(tmp_roms_dir, config) as request:
+        status, data = request("POST", "/apply", {"skip_uncertain": False})
+        assert status == 200
+        assert data["removed"] == 2
+        assert data["run_id"]
+        assert not (psx / "Beta (Japan).chd").exists()
+        assert (tmp_roms_dir / STAGING_DIR / "psx" / "Beta (Japan).chd").exists()
+        assert request("GET", "/report")[1]["duplicate_groups"] == 0
+        assert request("GET", "/status")[1]["files"] == 2
+
+        status, data = request("POST", "/restore", {"console": "psx"})
+        assert status == 200
+        assert data["restored"] == 1
+        assert (psx / "Beta (Japan).chd").exists()
+        assert request("GET", "/report")[1]["duplicate_groups"] == 1
+
+
+def test_errors_are_json(tmp_roms_dir: Path, config: Config, library: Path) -> None:
+    """Unknown routes, bad JSON and bad arguments come back as JSON errors."""
+    with _serving(tmp_roms_dir, config) as request:
+        status, data = request("GET", "/nope")
+        assert status == 404
+        assert "error" in data
+        assert request("POST", "/report")[0] == 404
+        assert request("POST", "/apply", {"free_bytes": "lots"})[0] == 400
+        assert request("POST", "/apply", {"free_bytes": True})[0] == 400
+        assert request("POST", "/restore", {"on_conflict": "merge"})[0] == 400
+        assert request("POST", "/refresh", {"directories": "psx"})[0] == 400
+        status, data = request("POST", "/apply", [])  # type: ignore[arg-type]
+        assert status == 400
+        assert data["error"] == "request body must be a JSON object"
+
+
+def test_refresh_directories_stay_under_the_root(
+    tmp_roms_dir: Path, config: Config, library: Path
+) -> None:
+    """Client directories are normalized; any that leave the ROMs root are refused."""
+    with _serving(tmp_roms_dir, config) as request:
+        total = request("GET", "/report")[1]["total_files"]
+        status, data = request("POST", "/refresh", {"directories": ["snes/", "./psx"]})
+        assert (status, data["relisted"]) == (200, 2)
+        assert request("GET", "/report")[1]["total_files"] == total
+        for outside in ("..", "snes/../../etc", "/etc"):
+            status, data = request("POST", "/refresh", {"directories": [outside]})
+            assert status == 400
+            assert "not under the ROMs root" in data["error"]
+
+
+def test_requests_a_web_page_could_send_are_refused(
+    tmp_roms_dir: Path, config: Config, library: Path
+) -> None:
+    """An Origin header, a non-JSON POST or a foreign Host is refused before any work."""
+    psx = library
+    with _serving(tmp_roms_dir, config) as request:
+        origin = {"Origin": "http://example.com"}
+        assert request("GET", "/report", headers=origin)[0] == 403
+        assert request("POST", "/apply", {}, headers=origin)[0] == 403
+        form = {"Content-Type": "text/plain"}
+        assert request("POST", "/apply", {}, headers=form)[0] == 415
+        assert request("GET", "/report", headers={"Host": "evil.example:8765"})[0] == 403
+        assert (psx / "Beta (Japan).chd").exists()
+        assert request("GET", "/report", headers={"Host": "localhost"})[0] == 403
+        status, _ = request("POST", "/scan", headers={"Content-Type": "application/json; x=y"})
+        assert status == 200
+
+
+def test_only_loopback_hosts_are_served(
+    tmp_roms_dir: Path, capsys, config: Config, library: Path
+) -> None:
+    """A non-loopback address is refused: the API has no authentication."""
+    with pytest.raises(ValueError, match="not a loopback address"):
+        make_server(tmp_roms_dir, config, host="0.0.0.0", port=0)
+    with pytest.raises(SystemExit) as exc:
+        main(["serve", str(tmp_roms_dir), "--host", "0.0.0.0", "--port", "0"])
+    assert exc.value.code == 1
+    assert "not a loopback address" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets only")
+def test_unix_socket(tmp_roms_dir: Path, tmp_path: Path, config: Config, library: Path) -> None:
+    """The same API over a Unix socket, which is removed on close."""
+    socket_path = tmp_path / "rom-deduper.sock"
+    with _serving(tmp_roms_dir, config, socket_path) as request:
+        status, data = request("GET", "/report")
+        assert status == 200
+        assert data["duplicate_groups"] == 2
+    assert not socket_path.exists()
@@ -0,0 +1,156 @@
+"""Tests for verify module."""
+
+import zipfile
+import zlib
+from pathlib import Path
+
+import pytest
+
+from rom_deduper.actions import apply_removal, dry_run
+from rom_deduper.cli import main
+from rom_deduper.verify import CORRUPT, UNKNOWN, VERIFIED, Dat, verify_keepers
+
+
+def _zip(path: Path, member: str, data: bytes, *, corrupt: bool = False) -> None:
+    """Write a stored (uncompressed) zip; corrupt flips a data byte after the CRC is written."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr(member, data)
+    if corrupt:
+        raw = path.read_bytes()
+        i = raw.index(data)
+        path.write_bytes(raw[:i] + bytes([data[0] ^ 0xFF]) + raw[i + 1 :])
+
+
+def _dat(path: Path, roms: list[tuple[str, bytes]]) -> Path:
+    lines = ['<?xml version="1.0"?>', "<datafile>"]
+    for name, data in roms:
+        crc = f"{zlib.crc32(data):08x}"
+        lines.append(
+            f'<game name="{name}"><rom name="{name}" size="{len(data)}" crc="{crc}"/></game>'
+        )
+    lines.append("</datafile>")
+    path.write_text("\n".join(lines))
+    return path
+
+
+def test_dat_check(tmp_path: Path) -> None:
+    """A DAT verifies known hashes, flags known names with other hashes, ignores the rest."""
+    dat = Dat.load(_dat(tmp_path / "snes.dat", [("Game (USA).sfc", b"good")]))
+    crc = zlib.crc32(b"good")
+    assert dat.check("renamed.sfc", 4, crc) == VERIFIED
+    assert dat.check("game (usa).sfc", 3, zlib.crc32(b"bad")) == CORRUPT
+    assert dat.check("Other (USA).sfc", 3, zlib.crc32(b"bad")) == UNKNOWN
+
+
+def test_corrupt_zip_keeper_is_swapped_for_verified_alternate(tmp_roms_dir: Path) -> None:
+    """A keeper failing its zip CRC stays put; the best verified alternate is kept instead."""
+    snes = tmp_roms_dir / "snes"
+    snes.mkdir()
+    _zip(snes / "Game (USA).zip", "Game (USA).sfc", b"u" * 64, corrupt=True)
+    _zip(snes / "Game (Europe).zip", "Game (Europe).sfc", b"e" * 64)
+    _zip(snes / "Game (Japan).zip", "Game (Japan).sfc", b"j" * 64)
+    report = dry_run(tmp_roms_dir)
+    assert report.groups[0].keeper is not None
+    assert report.groups[0].keeper.name == "Game (USA).zip"
+    result = verify_keepers(report, workers=2)
+    check = result.checks[0]
+    assert (check.status, check.replaced) == (CORRUPT, True)
+    group = report.groups[0]
+    assert group.keeper is not None
+    assert group.keeper.name == "Game (Europe).zip"
+    assert [e.name for e in group.to_remove] == ["Game (Japan).zip"]
+    apply_removal(tmp_roms_dir, report)
+    assert (snes / "Game (USA).zip").exists()
+    assert (snes / "Game (Europe).zip").exists()
+    assert not (snes / "Game (Japan).zip").exists()
+
+
+def test_corrupt_keeper_without_verified_alternate_skips_group(tmp_roms_dir: Path) -> None:
+    """With a DAT, unknown alternates are not good enough: the group is dropped."""
+    gb = tmp_roms_dir / "gb"
+    gb.mkdir()
+    (gb / "Game (USA).gb").write_bytes(b"bad dump")
+    (gb / "Game (Japan).gb").write_bytes(b"hack")
+    dat = Dat.load(_dat(tmp_roms_dir / "gb.dat", [("Game (USA).gb", b"good dump")]))
+    report = dry_run(tmp_roms_dir)
+    result = verify_keepers(report, dat=dat)
+    assert (result.count(CORRUPT), result.skipped) == (1, 1)
+    assert report.groups == []
+    assert report.total_to_remove == 0
+
+
+def test_verified_and_unknown_keepers_are_untouched(tmp_roms_dir: Path) -> None:
+    """Keepers that verify, or have nothing to check against, keep the ranker's plan;
+    every byte hashed is attributed to a worker."""
+    gb, nes = tmp_roms_dir / "gb", tmp_roms_dir / "nes"
+    gb.mkdir()
+    nes.mkdir()
+    (gb / "Game (USA).gb").write_bytes(b"good dump")
+    (gb / "Game (Japan).gb").write_bytes(b"x")
+    (nes / "Other (USA).nes").write_bytes(b"nes dump")
+    (nes / "Other (Japan).nes").write_bytes(b"x")
+    dat = Dat.load(_dat(tmp_roms_dir / "gb.dat", [("Game (USA).gb", b"good dump")]))
+    report = dry_run(tmp_roms_dir)
+    plan = [(g.keeper, list(g.to_remove)) for g in report.groups]
+    result = verify_keepers(report, dat=dat, workers=2)
+    assert sorted(c.status for c in result.checks) == [UNKNOWN, VERIFIED]
+    assert [(g.keeper, g.to_remove) for g in report.groups] == plan
+    assert sum(w.bytes for w in result.workers) == len(b"good dump") + len(b"nes dump")
+    assert all(w.worker.startswith("verify") for w in result.workers)
+
+
+def test_plain_files_are_not_hashed_without_a_dat(tmp_roms_dir: Path) -> None:
+    """With no DAT a plain file has nothing to compare against: it is unknown, unread."""
+    gb = tmp_roms_dir / "gb"
+    gb.mkdir()
+    (gb / "Game (USA).gb").write_bytes(b"dump")
+    (gb / "Game (Japan).gb").write_bytes(b"x")
+    result = verify_keepers(dry_run(tmp_roms_dir))
+    assert [c.status for c in result.checks] == [UNKNOWN]
+    assert result.workers == []
+
+
+def test_every_disc_of_a_keeper_set_is_checked(tmp_roms_dir: Path) -> None:
+    """A corrupt second disc fails the whole keeper set; the best verified set is kept
+    instead, and the corrupt set stays in place."""
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    good = []
+    for region in ("USA", "Europe", "Japan"):
+        for n in (1, 2):
+            name = f"Game ({region}) (Disc {n}).bin"
+            data = f"{region} {n}".encode()
+            (psx / name).write_bytes(b"bad" if (region, n) == ("USA", 2) else data)
+            good.append((name, data))
+    dat = Dat.load(_dat(tmp_roms_dir / "psx.dat", good))
+    report = dry_run(tmp_roms_dir)
+    group = report.groups[0]
+    assert group.keeper is not None
+    assert group.keeper.name == "Game (USA) (Disc 1).bin"
+    result = verify_keepers(report, dat=dat)
+    assert (result.checks[0].status, result.checks[0].replaced) == (CORRUPT, True)
+    assert group.keeper is not None
+    assert group.keeper.name == "Game (Europe) (Disc 1).bin"
+    assert group.keeper_set is not None
+    assert sorted(e.name for e in group.to_remove) == [
+        "Game (Japan) (Disc 1).bin",
+        "Game (Japan) (Disc 2).bin",
+    ]
+
+
+def test_cli_apply_verify_keeper(tmp_roms_dir: Path, capsys) -> None:
+    """apply --dat verifies keepers, reports per-worker throughput, and protects the group."""
+    gb = tmp_roms_dir / "gb"
+    gb.mkdir()
+    (gb / "Game (USA).gb").write_bytes(b"bad dump")
+    (gb / "Game (Japan).gb").write_bytes(b"good dump")
+    dat = _dat(tmp_roms_dir / "gb.dat", [("Game (USA).gb", b"good dump")])
+    main(["apply", str(tmp_roms_dir), "--dat", str(dat)])
+    out = capsys.readouterr().out
+    assert "Corrupt: 1" in out
+    assert "verify" in out
+    # The Japanese dump matches the DAT's hash, so it is kept and the bad USA dump stays too
+    assert (gb / "Game (USA).gb").exists()
+    assert (gb / "Game (Japan).gb").exists()
+    with pytest.raises(SystemExit):
+        main(["apply", str(tmp_roms_dir), "--dat", str(tmp_roms_dir / "missing.dat")])
@@ -0,0 +1,249 @@
+"""Tests for watch and inotify modules."""
+
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from rom_deduper import watch as watch_module
+from rom_deduper.actions import _removal_batches, dry_run
+from rom_deduper.inotify import IN_CREATE, Inotify, available
+from rom_deduper.scanner import scan
+from rom_deduper.watch import REPORT_FILENAME, LiveIndex, watch
+
+needs_inotify = pytest.mark.skipif(not available(), reason="inotify is Linux-only")
+
+
+def _summary(report) -> list[tuple[str, str, str | None, list[str]]]:
+    return [
+        (
+            g.console,
+            g.base_title,
+            g.keeper.name if g.keeper else None,
+            [e.name for e in g.to_remove],
+        )
+        for g in report.groups
+    ]
+
+
+def test_live_index_matches_dry_run(tmp_roms_dir: Path, make_config, psx_library: Path) -> None:
+    """After a build, the live report equals a fresh dry run."""
+    index = LiveIndex(tmp_roms_dir, make_config())
+    index.build()
+    index.update()
+    assert _summary(index.report()) == _summary(dry_run(tmp_roms_dir, config=make_config()))
+
+
+def test_live_report_batches_disc_sets_like_dry_run(tmp_roms_dir: Path, make_config) -> None:
+    """Each multi-disc set is one removal batch, exactly as in a dry run."""
+    psx = tmp_roms_dir / "psx"
+    psx.mkdir()
+    for region in ("USA", "Japan"):
+        for n in (1, 2):
+            (psx / f"Game ({region}) (Disc {n}).chd").write_bytes(b"x")
+    index = LiveIndex(tmp_roms_dir, make_config())
+    index.build()
+    index.update()
+
+    def batches(report) -> list[list[str]]:
+        return [[e.name for e in b] for g in report.groups for b in _removal_batches(g)]
+
+    assert batches(index.report()) == [["Game (Japan) (Disc 1).chd", "Game (Japan) (Disc 2).chd"]]
+    assert batches(index.report()) == batches(dry_run(tmp_roms_dir, config=make_config()))
+    assert index.report().groups[0].keeper_set is not None
+
+
+def test_refresh_relists_only_the_changed_directory(
+    tmp_roms_dir: Path, monkeypatch, make_config, psx_library: Path
+) -> None:
+    """A new file re-lists its directory and re-ranks only its own group."""
+    psx = psx_library
+    snes = tmp_roms_dir / "snes"
+    snes.mkdir()
+    (snes / "Gamma (USA).sfc").write_bytes(b"x")
+    index = LiveIndex(tmp_roms_dir, make_config())
+    index.build()
+    index.update()
+
+    listed: list[str] = []
+    original = watch_module.scan_directory
+    monkeypatch.setattr(
+        watch_module,
+        "scan_directory",
+        lambda d, *a, **k: listed.append(d) or original(d, *a, **k),
+    )
+    (psx / "Alpha (Japan).chd").write_bytes(b"x")
+    index.refresh([str(psx)])
+    assert listed == [str(psx)]
+    # Re-listing psx touches its two groups; snes is untouched, and one grouping pass
+    # covers both
+    calls = []
+    grouper = watch_module.group_entries
+    monkeypatch.setattr(watch_module, "group_entries", lambda e: calls.append(len(e)) or grouper(e))
+    assert index.update() == 2
+    assert calls == [4]
+    assert _summary(index.report()) == _summary(dry_run(tmp_roms_dir, config=make_config()))
+
+
+def test_refresh_handles_new_and_removed_folders(
+    tmp_roms_dir: Path, make_config, psx_library: Path
+) -> None:
+    """New subtrees are walked and vanished ones dropped, including new consoles."""
+    psx = psx_library
+    index = LiveIndex(tmp_roms_dir, make_config())
+    index.build()
+    index.update()
+
+    folder = psx / "Beta (Europe)"
+    folder.mkdir()
+    (folder / "beta.cue").write_bytes(b"x")
+    index.refresh([str(psx)])
+    saturn = tmp_roms_dir / "saturn"
+    saturn.mkdir()
+    (saturn / "Delta (USA).chd").write_bytes(b"x")
+    (saturn / "Delta (Japan).chd").write_bytes(b"x")
+    index.refresh([str(tmp_roms_dir)])
+    index.update()
+    assert str(folder) in index.directories
+    assert _summary(index.report()) == _summary(dry_run(tmp_roms_dir, config=make_config()))
+
+    shutil.rmtree(folder)
+    (psx / "Beta (Japan).chd").unlink()
+    index.refresh([str(psx)])
+    index.update()
+    assert str(folder) not in index.directories
+    assert _summary(index.report()) == _summary(dry_run(tmp_roms_dir, config=make_config()))
+
+
+def test_game_folder_size_follows_nested_changes(
+    tmp_roms_dir: Path, make_config, psx_library: Path
+) -> None:
+    """Re-listing a directory inside a game folder updates the folder entry's size."""
+    psx = psx_library
+    extras = psx / "Beta (Europe)" / "extras"
+    extras.mkdir(parents=True)
+    (psx / "Beta (Europe)" / "beta.cue").write_bytes(b"x")
+    index = LiveIndex(tmp_roms_dir, make_config())
+    index.build()
+    index.update()
+
+    def folder_size(entries) -> int:
+        return next(e.size for e in entries if e.name == "Beta (Europe)")
+
+    (extras / "movie.str").write_bytes(b"m" * 2000)
+    index.refresh([str(extras)])
+    assert index.update() == 1
+    live = [e for g in index.report().groups for e in [g.keeper, *g.to_remove] if e]
+    assert folder_size(live) == 2001
+    assert folder_size(live) == folder_size(scan(tmp_roms_dir))
+
+
+def test_stale_directories_by_mtime(
+    tmp_roms_dir: Path, monkeypatch, make_config, psx_library: Path
+) -> None:
+    """Only directories whose mtime moved are stale; racy ones stay stale until they settle."""
+    psx = psx_library
+    snes = tmp_roms_dir / "snes"
+    snes.mkdir()
+    index = LiveIndex(tmp_roms_dir, make_config())
+    index.build()
+    # Listed within RACY_NS of their last change: a coarse clock could hide the next one
+    assert set(index.stale_directories()) == {str(tmp_roms_dir), str(psx), str(snes)}
+
+    monkeypatch.setattr(watch_module, "RACY_NS", 0)
+    index.build()
+    assert index.stale_directories() == []
+    (psx / "Alpha (USA).chd").write_bytes(b"yy")  # Contents only: no directory mtime change
+    assert index.stale_directories() == []
+    (psx / "Alpha (Japan).chd").write_bytes(b"x")
+    st = psx.stat()
+    os.utime(psx, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    shutil.rmtree(snes)  # Also moves the root's mtime
+    assert set(index.stale_directories()) == {str(tmp_roms_dir), str(psx), str(snes)}
+
+
+@needs_inotify
+def test_inotify_reports_created_file(tmp_path: Path) -> None:
+    """The ctypes binding delivers a create event for a new file in a watched directory."""
+    with Inotify() as inotify:
+        inotify.add_watch(str(tmp_path))
+        (tmp_path / "Game (USA).chd").write_bytes(b"x")
+        events = inotify.read(timeout=2)
+    assert any(e.name == "Game (USA).chd" and e.mask & IN_CREATE for e in events)
+    assert all(e.directory == str(tmp_path) for e in events)
+
+
+@needs_inotify
+def test_watch_rewrites_report_on_change(
+    tmp_roms_dir: Path, make_config, psx_library: Path
+) -> None:
+    """watch writes the initial report, then an updated one after a ROM is added."""
+    psx = psx_library
+    updates: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=watch,
+        args=(tmp_roms_dir, make_config()),
+        kwargs={"stop": stop, "debounce": 0.1, "on_update": lambda r, n: updates.put(r)},
+    )
+    thread.start()
+    try:
+        assert updates.get(timeout=5).duplicate_groups == 1
+        (psx / "Alpha (Japan).chd").write_bytes(b"x")
+        assert updates.get(timeout=5).duplicate_groups == 2
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+    data = json.loads((tmp_roms_dir / REPORT_FILENAME).read_text())
+    assert data["duplicate_groups"] == 2
+    assert "psx/Alpha (Japan).chd" in [p for g in data["groups"] for p in g["to_remove"]]
+
+
+@needs_inotify
+def test_watch_updates_during_a_continuous_copy(
+    tmp_roms_dir: Path, make_config, psx_library: Path
+) -> None:
+    """Events that never pause for debounce are still applied every max_wait seconds."""
+    psx = psx_library
+    updates: queue.Queue = queue.Queue()
+    stop = threading.Event()
+    copying = threading.Event()
+    thread = threading.Thread(
+        target=watch,
+        args=(tmp_roms_dir, make_config()),
+        kwargs={
+            "stop": stop,
+            "debounce": 1.0,
+            "max_wait": 0.3,
+            "on_update": lambda r, n: updates.put(r),
+        },
+    )
+
+    def copy() -> None:
+        for i in range(200):
+            if not copying.is_set():
+                return
+            (psx / f"Copy {i} (USA).chd").write_bytes(b"x")
+            (psx / f"Copy {i} (Japan).chd").write_bytes(b"x")
+            time.sleep(0.02)
+
+    thread.start()
+    try:
+        updates.get(timeout=5)
+        copying.set()
+        writer = threading.Thread(target=copy)
+        writer.start()
+        # Writes arrive every 20 ms, well inside debounce: only max_wait can end a batch
+        assert updates.get(timeout=2).duplicate_groups > 1
+        assert writer.is_alive()
+        copying.clear()
+        writer.join(timeout=5)
+    finally:
+        copying.clear()
+        stop.set()
+        thread.join(timeout=5)